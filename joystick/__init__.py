@@ -25,6 +25,7 @@
 ###############################################################################
 
 import os
+import sys
 
 _PATH = os.path.dirname(os.path.abspath(__file__))
 _PATH = _PATH.split(os.path.sep)[:-1]
@@ -36,12 +37,70 @@ try:
 except:
     __doc__ = ""
 
+from . import core, joystick, deco, pool, source, ingest, history, spill, \
+    resample, stats, trigger, render
 from .core import *
-from .graph import *
-from .graphmulti import *
-from .scatter import *
-from .image import *
-from .text import *
 from .joystick import *
 from .deco import *
+from .pool import *
+from .source import *
+from .ingest import *
+from .history import *
+from .spill import *
+from .resample import *
+from .stats import *
+from .trigger import *
+from .render import *
 from ._version import __version__, __major__, __minor__, __micro__
+
+
+# frames are imported at first use, as they load matplotlib and tkinter
+_LAZY_FRAMES = {'Graph': 'graph',
+                'GraphMulti': 'graphmulti',
+                'Scatter': 'scatter',
+                'Image': 'image',
+                'Text': 'text',
+                'Histogram': 'histogram',
+                'Waterfall': 'waterfall',
+                'Spectrum': 'spectrum',
+                'Persistence': 'persistence'}
+
+__all__ = core.__all__ + joystick.__all__ + deco.__all__ + pool.__all__ \
+          + source.__all__ + ingest.__all__ + history.__all__ \
+          + spill.__all__ + resample.__all__ \
+          + stats.__all__ + trigger.__all__ + render.__all__ \
+          + sorted(_LAZY_FRAMES)
+
+
+def __getattr__(name):
+    """
+    Lazy import of the frames and of submodules (python >= 3.7)
+    """
+    import importlib
+    if name in _LAZY_FRAMES:
+        return getattr(importlib.import_module('.' + _LAZY_FRAMES[name],
+                                               __name__), name)
+    if not name.startswith('_'):
+        try:
+            return importlib.import_module('.' + name, __name__)
+        except ImportError:
+            pass
+    raise AttributeError("module {!r} has no attribute "\
+                         "{!r}".format(__name__, name))
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_FRAMES))
+
+
+# no module-level __getattr__ before python 3.7, import everything now
+if sys.version_info < (3, 7):
+    from .graph import *
+    from .graphmulti import *
+    from .scatter import *
+    from .image import *
+    from .text import *
+    from .histogram import *
+    from .waterfall import *
+    from .spectrum import *
+    from .persistence import *
@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+###############################################################################
+#  
+#  JOYSTICK - Real-time plotting and logging while console controlling
+#  Copyright (C) 2016  Guillaume Schworer
+#  
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#  
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#  
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#  
+#  For any information, bug report, idea, donation, hug, beer, please contact
+#    guillaume.schworer@gmail.com
+#
+###############################################################################
+
+# python >= 3.5 only, imported by deco_async_loop at run-time
+import asyncio
+from threading import Thread, Lock
+import traceback
+
+
+__all__ = ['get_async_loop', 'run_async_loop']
+
+
+_ASYNC_LOOP = None
+_ASYNC_LOCK = Lock()
+
+
+def get_async_loop():
+    """
+    Returns the asyncio event loop shared by all methods decorated with
+    :py:func:`~joystick.deco.deco_async_loop`. It runs forever in its
+    own daemon-thread, next to the Tk windows, and is created at first
+    call
+    """
+    global _ASYNC_LOOP
+    with _ASYNC_LOCK:
+        if _ASYNC_LOOP is None:
+            _ASYNC_LOOP = asyncio.new_event_loop()
+            loopy = Thread(target=_ASYNC_LOOP.run_forever)
+            loopy.daemon = True
+            loopy.start()
+    return _ASYNC_LOOP
+
+
+async def _looping(obj, func, wait_time):
+    """
+    The looping coroutine
+    """
+    try:
+        while obj.running:  # cf joystick class
+            await func(obj)  # finally awaiting some stuff
+            # always yields, a loop without wait_time shall not starve
+            # the other coroutines
+            await asyncio.sleep(wait_time or 0)
+    except asyncio.CancelledError:
+        raise
+    except Exception:
+        traceback.print_exc()
+
+
+def run_async_loop(obj, func, wait_time=None):
+    """
+    Schedules the coroutine function ``func(obj)`` to be awaited in
+    an infinite loop on the shared event loop, every ``wait_time``
+    seconds, as long as ``obj.running`` is ``True``.
+    Returns a ``concurrent.futures.Future``, cancelling it cancels the
+    coroutine wherever it is awaiting
+    """
+    return asyncio.run_coroutine_threadsafe(_looping(obj, func, wait_time),
+                                            get_async_loop())
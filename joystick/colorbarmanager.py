@@ -43,6 +43,13 @@ class ColorbarManager(object):
         vmin, vmax = kwargs.pop('vmin'), kwargs.pop('vmax')
         self._vmin = float(vmin) if vmin is not None else None
         self._vmax = float(vmax) if vmax is not None else None
+        # relative change of auto-scaled bounds below which the colors
+        # are not re-computed
+        self._ctol = abs(float(kwargs.pop('ctol', 0.)))
+        self.autoscale = kwargs.pop('autoscale', 'exact')
+        self._nsample = max(int(kwargs.pop('nsample', 10000)), 1)
+        self._percentiles = tuple(kwargs.pop('percentiles', (1., 99.))[:2])
+        self._smoothing = min(max(float(kwargs.pop('smoothing', 0.)), 0.), 1.)
         if vmin is None and vmax is None:
             vmin, vmax = 0, 1  # can't define minmax yet
         elif vmin is None:
@@ -99,12 +106,21 @@ class ColorbarManager(object):
         else:
             self._vmax = float(value)
         self._set_norm(self._norm.vmin, value)
+        self._update_scalarmappable()
         if not (self.running and self._mummy_running):
             self.show()
 
     def _set_norm(self, vmin, vmax):
+        """
+        Applies the colorbar bounds, only if they changed. Returns
+        ``True`` if they did
+        """
+        if self._plot.norm is self._norm and self._norm.vmin == vmin \
+                and self._norm.vmax == vmax:
+            return False
         self._norm = matplotlibpyplotNormalize(vmin, vmax)
         self._plot.set_norm(self._norm)
+        return True
 
     def _update_scalarmappable(self):
         if hasattr(self._plot, 'update_scalarmappable'):
@@ -132,6 +148,80 @@ class ColorbarManager(object):
         if not (self.running and self._mummy_running):
             self.show()
 
+    @property
+    def autoscale(self):
+        """
+        The policy to auto-scale the colorbar bounds, in
+        ``core.AUTOSCALE_POLICIES``: ``'exact'`` min/max of the data,
+        ``'subsample'`` min/max of a strided subsample, ``'percentile'``
+        percentiles of a subsample (robust to hot pixels)
+        """
+        return self._autoscale
+
+    @autoscale.setter
+    def autoscale(self, value):
+        value = str(value).lower()
+        if value not in core.AUTOSCALE_POLICIES:
+            raise ValueError("'autoscale' shall be in {}"\
+                             .format(core.AUTOSCALE_POLICIES))
+        self._autoscale = value
+
+    def _subsample(self, colors):
+        """
+        Returns about nsample finite values of colors, taken with a
+        stride along each axis
+        """
+        colors = np.asarray(colors)
+        step = int(np.ceil((colors.size/float(self._nsample))
+                           **(1./max(colors.ndim, 1))))
+        if step > 1:
+            colors = colors[(slice(None, None, step),)*colors.ndim]
+        colors = colors.ravel()
+        return colors[np.isfinite(colors)]
+
+    def _auto_bounds(self, colors):
+        """
+        Returns the (min, max) colorbar bounds of the data, given the
+        auto-scaling policy
+        """
+        if self._autoscale == 'exact':
+            # nan values (e.g. rows not yet filled) are not displayed
+            colors = np.asarray(colors)
+            if colors.dtype.kind == 'f':
+                if np.isnan(colors).all():
+                    return self._norm.vmin, self._norm.vmax
+                return np.nanmin(colors), np.nanmax(colors)
+            return colors.min(), colors.max()
+        sub = self._subsample(colors)
+        if sub.size == 0:
+            return self._norm.vmin, self._norm.vmax
+        lo, hi = sub.min(), sub.max()
+        if self._autoscale == 'subsample' or hi == lo:
+            return lo, hi
+        return tuple(self._hist_percentile(sub, lo, hi, p)
+                     for p in self._percentiles)
+
+    @staticmethod
+    def _hist_percentile(sub, lo, hi, p, nbins=1024):
+        """
+        Returns the p-percentile of sub (values in [lo, hi]) from its
+        cumulative histogram, zoomed on the bin found (a few times at
+        most) in case of far outliers
+        """
+        target = p*0.01*sub.size
+        for ith in range(4):
+            if hi <= lo or sub.size <= 1:
+                break
+            idx = np.minimum(((sub - lo)*(nbins/(hi - lo))).astype(int),
+                             nbins - 1)
+            cum = np.cumsum(np.bincount(idx, minlength=nbins))
+            ibin = min(int(np.searchsorted(cum, target)), nbins - 1)
+            target -= cum[ibin-1] if ibin > 0 else 0
+            width = (hi - lo)/nbins
+            lo, hi = lo + ibin*width, lo + (ibin + 1)*width
+            sub = sub[idx == ibin]
+        return 0.5*(lo + hi) if p not in (0, 100) else (lo if p == 0 else hi)
+
     def _scale_colors(self):
         """
         Does the color scaling
@@ -142,6 +232,19 @@ class ColorbarManager(object):
         colors = self.get_data()
         if (np.size(colors) if colors is not None else 0) == 0:
             return
-        vmin = colors.min() if self._vmin is None else self._norm.vmin
-        vmax = colors.max() if self._vmax is None else self._norm.vmax
-        self._set_norm(vmin, vmax)
+        vmin, vmax = self._auto_bounds(colors)
+        if self._smoothing > 0:
+            # exponential smoothing of the bounds over time
+            vmin = self._smoothing*self._norm.vmin \
+                        + (1 - self._smoothing)*vmin
+            vmax = self._smoothing*self._norm.vmax \
+                        + (1 - self._smoothing)*vmax
+        vmin = vmin if self._vmin is None else self._norm.vmin
+        vmax = vmax if self._vmax is None else self._norm.vmax
+        if self._ctol > 0:
+            tol = self._ctol*(self._norm.vmax - self._norm.vmin)
+            if abs(vmin - self._norm.vmin) <= tol \
+                    and abs(vmax - self._norm.vmax) <= tol:
+                return
+        if self._set_norm(vmin, vmax):
+            self._update_scalarmappable()
@@ -24,21 +24,20 @@
 #
 ###############################################################################
 
-import matplotlib as mat
-mat.use('TkAgg')
-from matplotlib import lines
-import matplotlib.cm
-from matplotlib.pyplot import Normalize as matplotlibpyplotNormalize
-try:
-    import Tkinter as tkinter
-except ImportError:
-    import tkinter
+import sys
+import functools
 import time
+import weakref
 import numpy as np
-from collections import Iterable
+try:
+    from collections.abc import Iterable
+except ImportError:
+    from collections import Iterable
+# matplotlib and tkinter are only imported when a frame first needs
+# them, see _load_backend
 
 
-__all__ = ['add_datapoint']
+__all__ = ['add_datapoint', 'UniformX']
 
 
 # available methods for callit decoration in Joystick class
@@ -48,6 +47,24 @@ CALLIT_FRAME_METH = ['init', 'start', 'stop', 'exit', 'update']
 
 CALLITDECO = "_callit"
 INFINITELOOPDECO = "_infinite_loop"
+PROCESSLOOPDECO = "_process_loop"
+ASYNCLOOPDECO = "_async_loop"
+
+# full-queue policies of the thread pool behind deco_thread_it
+POOL_POLICIES = ['block', 'drop', 'reject']
+
+POOL_MAX_WORKERS = 8
+
+POOL_MAX_QUEUE = 256
+
+# dtypes of the binary ingestion protocol, by code
+INGEST_DTYPES = ['f8', 'f4', 'i8', 'i4', 'i2', 'i1', 'u8', 'u4', 'u2', 'u1']
+
+# color auto-scaling policies of the colorbar-frames
+AUTOSCALE_POLICIES = ['exact', 'subsample', 'percentile']
+
+# where the figures of the frames are rasterized
+RENDER_MODES = ['tk', 'thread', 'process']
 
 BASICMULTIFMT = ['bs-', 'gs-', 'rs-', 'cs-', 'ms-', 'ys-', 'bo--', 'go--',
                  'ro--', 'co--', 'mo--', 'yo--']
@@ -62,12 +79,23 @@ __doc__ = """Here are some useful constants:
              .. py:data:: CALLIT_FRAME_METH
 
                 = ['init', 'start', 'stop', 'exit', 'update']
-          """
 
+             .. py:data:: POOL_POLICIES
 
-LINEKWARGS = set([item[4:] \
-                for item in mat.lines.Line2D.__dict__.keys() \
-                if 'set_' in item] + ['alpha', 'label'])
+                = ['block', 'drop', 'reject']
+
+             .. py:data:: INGEST_DTYPES
+
+                = ['f8', 'f4', 'i8', 'i4', 'i2', 'i1', 'u8', 'u4', 'u2', 'u1']
+
+             .. py:data:: AUTOSCALE_POLICIES
+
+                = ['exact', 'subsample', 'percentile']
+
+             .. py:data:: RENDER_MODES
+
+                = ['tk', 'thread', 'process']
+          """
 
 
 TKKWARGS = set(['background', 'borderwidth', 'cursor', 'exportselection', 'font',
@@ -90,16 +118,65 @@ AXKWARGS = set(['adjustable', 'agg_filter', 'alpha', 'anchor', 'animated',
             'xticks', 'ybound', 'ylabel', 'ylim', 'ymargin', 'yscale',
             'yticklabels', 'yticks', 'zorder'])
 
-SCATKWARGS = set([item[4:] \
+_BACKEND = {}
+
+
+def _load_backend():
+    """
+    Imports matplotlib with the TkAgg backend, and tkinter, at first
+    call only. Returns a dict of the loaded modules and tables
+    """
+    if 'mat' not in _BACKEND:
+        import matplotlib as mat
+        mat.use('TkAgg')
+        import matplotlib.lines
+        import matplotlib.collections
+        import matplotlib.axes
+        import matplotlib.patches
+        import matplotlib.image
+        import matplotlib.text
+        import matplotlib.cm
+        import matplotlib.colors
+        import matplotlib.transforms
+        import matplotlib.figure
+        import matplotlib.backends.backend_agg
+        import matplotlib.backends.backend_tkagg
+        from matplotlib.colors import Normalize
+        try:
+            import Tkinter as tkinter
+        except ImportError:
+            import tkinter
+        _BACKEND['LINEKWARGS'] = set([item[4:] \
+                for item in mat.lines.Line2D.__dict__.keys() \
+                if 'set_' in item] + ['alpha', 'label'])
+        _BACKEND['SCATKWARGS'] = set([item[4:] \
                 for item in mat.collections.Collection.__dict__.keys() \
                 if 'set_' in item] + ['marker', 'verts', 'label'])
+        _BACKEND['matplotlibpyplotNormalize'] = Normalize
+        _BACKEND['tkinter'] = tkinter
+        # set last, as it flags the dict as complete
+        _BACKEND['mat'] = mat
+    return _BACKEND
+
+
+def __getattr__(name):
+    """
+    Lazy access to mat, tkinter, matplotlibpyplotNormalize, LINEKWARGS
+    and SCATKWARGS (python >= 3.7)
+    """
+    if name in ['mat', 'tkinter', 'matplotlibpyplotNormalize',
+                'LINEKWARGS', 'SCATKWARGS']:
+        return _load_backend()[name]
+    raise AttributeError("module {!r} has no attribute "\
+                         "{!r}".format(__name__, name))
+
 
 def cm_bounds_to_norm(cm_bounds, data=None):
     cmin = float(cm_bounds[0]) if cm_bounds[0] is not None \
                else (np.min(data) if data is not None else 0)
     cmax = float(cm_bounds[1]) if cm_bounds[1] is not None \
                else (np.max(data) if data is not None else cmin+1)
-    return matplotlibpyplotNormalize(cmin, cmax)
+    return _load_backend()['matplotlibpyplotNormalize'](cmin, cmax)
 
 
 def get_ith(v, ith):
@@ -117,10 +194,11 @@ def colorbar(cmap="jet", cm_bounds=(0, 1)):
     cb = plt.colorbar(mappable)
     if arr is given, forces cm_min and cm_max to min-max of the arr
     """
+    mat = _load_backend()['mat']
     if isinstance(cmap, str):
         cmap = mat.cm.get_cmap(cmap)
     cmin, cmax = list(map(float, cm_bounds[:2]))
-    norm = matplotlibpyplotNormalize(cmin, cmax)
+    norm = _load_backend()['matplotlibpyplotNormalize'](cmin, cmax)
     mappable = mat.cm.ScalarMappable(cmap=cmap, norm=norm)
     mappable._A = []
     return cmap, norm, mappable
@@ -131,14 +209,14 @@ def scatkwargs(kwargs, ith=None):
     Returns a copy of kwargs that contains only keys existing
     to scatter
     """
-    return extract_kwargs(kwargs, SCATKWARGS, ith=ith)
+    return extract_kwargs(kwargs, _load_backend()['SCATKWARGS'], ith=ith)
 
 def linekwargs(kwargs, ith=None):
     """
     Returns a copy of kwargs that contains only keys existing
     to lines
     """
-    return extract_kwargs(kwargs, LINEKWARGS, ith=ith)
+    return extract_kwargs(kwargs, _load_backend()['LINEKWARGS'], ith=ith)
 
 def axkwargs(kwargs, ith=None):
     """
@@ -172,12 +250,16 @@ def extract_kwargs(kwargs, ll, ith=None):
 def callmthd(obj, methodstr, **kwargs):
     """
     Calls obj.'methodstr' after having tests that it exists and that
-    it is callable
+    it is callable. ``methodstr`` may also be a list of method names,
+    or of already bound methods as given by
+    :py:func:`~joystick.core.extract_callit_bound`
     """
     if isinstance(methodstr, (tuple, list)):
         ret = []
         for item in methodstr:
-            if callable(getattr(obj, item, None)):
+            if not isinstance(item, str):  # already bound
+                ret.append(item(**kwargs))
+            elif callable(getattr(obj, item, None)):
                 ret.append(getattr(obj, item)(**kwargs))
         return ret
     else:
@@ -185,6 +267,10 @@ def callmthd(obj, methodstr, **kwargs):
             return getattr(obj, methodstr)(**kwargs)
 
 
+# cache of the callit tables, {(class, fct): (list_before, list_after)}
+_CALLIT_TABLES = {}
+
+
 def extract_callit(obj, fct):
     """
     Give an object and an expected method name fct.
@@ -192,19 +278,53 @@ def extract_callit(obj, fct):
     that match obj._callit.'before_fct' and
     obj._callit.'after_fct'.
     Useful for callit decorator
+
+    The tables are built at first call for each class and fct, given
+    that the decorated functions are all recorded at class-definition
+    """
+    key = (type(obj), fct.lower())
+    if key not in _CALLIT_TABLES:
+        after = []
+        before = []
+        if hasattr(obj, CALLITDECO):
+            for k, v in getattr(obj, CALLITDECO).__dict__.items():
+                if fct.lower() != k[k.find('_')+1:].lower():
+                    continue
+                prefix = k.split('_')[0].lower()
+                if prefix == 'after':
+                    after += v
+                elif prefix == 'before':
+                    before += v
+        _CALLIT_TABLES[key] = (tuple(before), tuple(after))
+    before, after = _CALLIT_TABLES[key]
+    return list(before), list(after)
+
+
+def bind_methods(obj, methodstrs):
+    """
+    Returns the list of the obj methods named in methodstrs, skipping
+    those that do not exist or are not callable
+    """
+    ret = []
+    for item in methodstrs:
+        meth = getattr(obj, item, None)
+        if callable(meth):
+            ret.append(meth)
+    return ret
+
+
+def extract_callit_bound(obj, fct):
+    """
+    Same as :py:func:`~joystick.core.extract_callit` but returns
+    lists of bound methods, cached on obj, such that calling them with
+    :py:func:`~joystick.core.callmthd` costs no name resolution.
+    Useful for callit decorated methods called at high frequency
     """
-    after = []
-    before = []
-    if hasattr(obj, CALLITDECO):
-        for k, v in getattr(obj, CALLITDECO).__dict__.items():
-            if fct.lower() != k[k.find('_')+1:].lower():
-                continue
-            prefix = k.split('_')[0].lower()
-            if prefix == 'after':
-                after += v
-            elif prefix == 'before':
-                before += v
-    return before, after
+    cache = obj.__dict__.setdefault('_callit_bound', {})
+    if fct not in cache:
+        before, after = extract_callit(obj, fct)
+        cache[fct] = (bind_methods(obj, before), bind_methods(obj, after))
+    return cache[fct]
 
 
 def get_infinite_loop_fcts(obj):
@@ -217,17 +337,136 @@ def get_infinite_loop_fcts(obj):
         return []
 
 
+def get_process_loop_fcts(obj):
+    """
+    Returns a list of all functions decorated with the
+    process_loop decorator
+    """
+    if hasattr(obj, PROCESSLOOPDECO):
+        return getattr(obj, PROCESSLOOPDECO).fcts
+    return []
+
+
+def get_async_loop_fcts(obj):
+    """
+    Returns a list of all functions decorated with the
+    async_loop decorator
+    """
+    if hasattr(obj, ASYNCLOOPDECO):
+        return getattr(obj, ASYNCLOOPDECO).fcts
+    return []
+
+
+def is_buffer(ar):
+    """
+    Returns ``True`` if ar is a buffer object appended in place (e.g. a
+    :py:class:`~joystick.spill.SpillBuffer`) rather than a numpy vector
+    """
+    return hasattr(ar, 'add_datapoint')
+
+
 def add_datapoint(ar, ar2, xnptsmax=None):
     """
     Concatenates ar2 at the end of ar. ar2 can either be a int/float or
     1-dim vectors. Cuts the vector to xnptsmax elements.
+    If ar is a buffer object with an add_datapoint method (e.g. a
+    :py:class:`~joystick.spill.SpillBuffer`), ar2 is appended to it in
+    place; such buffers record without limit and xnptsmax must then be
+    ``None``.
     """
-    if xnptsmax is None:
+    if is_buffer(ar):
+        if xnptsmax is not None:
+            raise ValueError("xnptsmax does not apply to {}, it shall be "\
+                             "None".format(type(ar).__name__))
+        return ar.add_datapoint(ar2)
+    elif xnptsmax is None:
         return np.r_[ar, ar2]
     else:
         return np.r_[ar[-int(xnptsmax)+np.size(ar2):], ar2]
 
 
+def window_start(x, span):
+    """
+    Returns the index of the first element of the increasing vector x
+    that is within span of its last element, by binary search
+    """
+    if isinstance(x, UniformX):
+        raise TypeError("use UniformX.window_start")
+    if np.size(x) == 0:
+        return 0
+    return int(np.searchsorted(x, x[-1] - span))
+
+
+# storage arrays of the vectors returned by add_xydatapoint, by id:
+# (weak reference to the storage, index of the end of its data)
+_TAILS = {}
+
+
+def _append_tail(ar, ar2):
+    """
+    Returns ar with ar2 appended, as a view on a storage array of
+    doubling capacity: ar2 is written in place after ar if ar is the
+    last vector returned for its storage, such that appending costs
+    O(len(ar2)). When the storage is full, the data is moved back to its
+    start if the dropped data at its start (before ar) is larger than
+    ar, or else copied to a storage twice as large
+    """
+    ar = np.asarray(ar)
+    ar2 = np.atleast_1d(np.asarray(ar2)).ravel()
+    dtype = np.result_type(ar, ar2)
+    n, k = ar.size, ar2.size
+    base = ar.base
+    entry = _TAILS.get(id(base)) if base is not None else None
+    if entry is not None and entry[0]() is base and ar.ndim == 1 \
+            and base.dtype == dtype and (n == 0 or ar.strides[0] == \
+                                         dtype.itemsize):
+        start = (ar.__array_interface__['data'][0]
+                 - base.__array_interface__['data'][0]) // dtype.itemsize
+        if start + n == entry[1]:
+            if start + n + k > base.size and start >= n \
+                    and n + k <= base.size:
+                # compaction in place
+                base[:n] = ar
+                start = 0
+            if start + n + k <= base.size:
+                base[start+n:start+n+k] = ar2
+                _TAILS[id(base)] = (entry[0], start+n+k)
+                return base[start:start+n+k]
+    base = np.empty(max(2*(n+k), 16), dtype=dtype)
+    base[:n] = ar
+    base[n:n+k] = ar2
+    key = id(base)
+    _TAILS[key] = (weakref.ref(base, lambda ref: _TAILS.pop(key, None)),
+                   n+k)
+    return base[:n+k]
+
+
+def add_xydatapoint(x, y, new_x, new_y, span=None, xnptsmax=None):
+    """
+    Concatenates new_x and new_y at the end of the x and y vectors
+    (x increasing). Drops the data older than span from the last x
+    value, if span is not None, or else cuts the vectors to xnptsmax
+    elements.
+    The vectors returned are views on larger arrays, to which the next
+    call appends in place: give them back as x and y, and copy them to
+    keep them aside. Appending and dropping data then cost O(len(new_x))
+    (amortized), as the kept data is only moved when the array is full.
+    Returns the (x, y) vectors
+    """
+    if is_buffer(x) or is_buffer(y):
+        x = add_datapoint(x, new_x)
+        y = add_datapoint(y, new_y)
+    else:
+        x = _append_tail(x, new_x)
+        y = _append_tail(y, new_y)
+    if span is not None:
+        start = window_start(x, span)
+        return x[start:], y[start:]
+    elif xnptsmax is not None:
+        return x[-int(xnptsmax):], y[-int(xnptsmax):]
+    return x, y
+
+
 def timestamp():
     """
     time.time()
@@ -246,6 +485,67 @@ def append(obj, attr, v):
         setattr(obj, attr, [v])
 
 
+def locked(func):
+    """
+    Decorator of the frame methods modifying the figure: they run
+    holding the lock of the frame, so that the figure is never drawn
+    half-updated (see ``render`` parameter of
+    :py:class:`~joystick.frame.Frame`)
+    """
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return func(self, *args, **kwargs)
+    return wrapper
+
+
+# no module-level __getattr__ before python 3.7, load everything now
+if sys.version_info < (3, 7):
+    globals().update(_load_backend())
+
+
+class UniformX(object):
+    def __init__(self, start=0., step=1.):
+        """
+        Describes the x-axis of fixed-rate data, i.e. x = start + i*step
+        for the i-th data-point, to be given in place of the x vector to
+        graph-frames' ``set_xydata``. Only the x values of the displayed
+        data-points are then generated, and the x bounds are computed
+        in closed form.
+
+        Args:
+          * start (float) [optional]: the x value of the first point
+          * step (float) [optional]: the x interval between two points
+        """
+        self.start = float(start)
+        self.step = float(step)
+
+    def __repr__(self):
+        return "UniformX(start={}, step={})".format(self.start, self.step)
+
+    def values(self, i0, i1):
+        """
+        Returns the x values of the data-points i0 to i1 (excluded)
+        """
+        return self.start + self.step*np.arange(i0, i1)
+
+    def extent(self, i0, i1):
+        """
+        Returns the (min, max) x values of the data-points i0 to i1
+        (excluded)
+        """
+        a = self.start + self.step*i0
+        b = self.start + self.step*(i1-1)
+        return min(a, b), max(a, b)
+
+    def window_start(self, n, span):
+        """
+        Returns the index of the first of n data-points that is within
+        span of the last one
+        """
+        return max(n - 1 - int(np.floor(abs(span/self.step))), 0)
+
+
 class font:
     white = '\033[97m'
     black = '\033[38;5;16m'
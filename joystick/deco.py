@@ -29,8 +29,11 @@ import time
 from functools import wraps
 
 from . import core
+from .pool import get_thread_pool, Future
+from .process import ProcessLoop
 
-__all__ = ['deco_infinite_loop', 'deco_thread_it', 'deco_callit']
+__all__ = ['deco_infinite_loop', 'deco_process_loop', 'deco_async_loop',
+           'deco_thread_it', 'deco_callit']
 
 
 def deco_infinite_loop(wait_time=0.5):
@@ -91,25 +94,174 @@ def deco_infinite_loop(wait_time=0.5):
     return infinite_loop_static
 
 
-def deco_thread_it(func):
+def deco_process_loop(wait_time=0.5, shape=1, dtype=float, callback=None,
+                      nslots=2, copy=True):
     """
-    This decorator creates a daemon-thread to wrap the decotared
-    function into a separate thread that is started at the call
-    of the function (not with simulation start)
+    This decorator is the child-process alternative to
+    :py:func:`~joystick.deco.deco_infinite_loop`, for heavy
+    acquisition or processing loops (FFTs, fits, etc) that would
+    otherwise compete for the GIL with the frames updating.
+
+    The decorated function is called in an infinite loop every
+    `wait_time` seconds in a child process, from the joystick.start()
+    method until the joystick.stop() or joystick.exit() methods.
+    It does not receive ``self``, but a shared-memory numpy array of
+    shape ``shape`` and type ``dtype``, that it shall fill in place. It
+    may return the number of valid elements along the last axis of
+    that array, or ``None`` if it is fully valid.
+
+    The data is then handed over to the joystick method named
+    ``callback``, in the parent process, e.g. to push it to a frame
+    with ``set_xydata``.
+
+    It must be initialized at run-time before use:
+
+    >>> class yuhu(joystick.Joystick):
+    >>>     _process_loop = joystick.deco_process_loop()
+    >>>     ...
+
+    It then can be used normally (within a class definition):
+
+    >>> @_process_loop(wait_time=0.1, shape=(2, 1024), callback='_got_fft')
+    >>> def fft_task(out):
+    >>>     sig = acquire_some_signal()
+    >>>     out[0] = np.fft.rfftfreq(2046)
+    >>>     out[1] = np.abs(np.fft.rfft(sig, 2046))
+    >>>
+    >>> def _got_fft(self, data):
+    >>>     self.mygraph.set_xydata(data[0], data[1])
+
+    The joystick class must be importable (defined at module-level)
+    on platforms that do not fork new processes.
+    See :py:class:`~joystick.process.ProcessLoop` for the parameters.
+    """
+    # just a layer to get a memory copy of the decorator at run-time
+    def process_loop_static(wait_time=wait_time, shape=shape, dtype=dtype,
+                            callback=callback, nslots=nslots, copy=copy):
+        # the top-level decorator, with defaulted parameters
+        if not isinstance(callback, str):
+            raise ValueError("'callback' parameter shall be the name of a "\
+                             "method")
+        def func_decorator(func):
+            # the actual decorator
+            name = getattr(func, 'func_name', getattr(func, '__name__', None))
+            @wraps(func)
+            def func_wrapper(self):
+                # the wrapper, to get pretty docstrings
+                # register the child process and start it
+                loopy = ProcessLoop(self, name, callback=callback,
+                                    shape=shape, dtype=dtype, nslots=nslots,
+                                    wait_time=wait_time, copy=copy)
+                core.append(self, '_process_loops', loopy)
+                loopy.start()
+            # what the child process will actually call
+            func_wrapper._process_target = func
+            # at class-definition, this adds the function name in the
+            # top-level decorator
+            core.append(process_loop_static, 'fcts', name)
+            return func_wrapper
+        return func_decorator
+    return process_loop_static
+
+
+def deco_async_loop(wait_time=None):
+    """
+    This decorator is the asyncio alternative to
+    :py:func:`~joystick.deco.deco_infinite_loop`, for ``async def``
+    methods reading I/O sources (sockets, subprocess pipes, etc).
+    All decorated coroutines are awaited on a single event loop running
+    in one daemon-thread, such that hundreds of sources cost no more
+    than one thread.
+
+    The decorated coroutine is awaited in an infinite loop every
+    `wait_time` seconds (or immediately again if ``None``) from the
+    joystick.start() method, as long as the joystick.running attribute
+    is True. It is cancelled, wherever it is awaiting, by the
+    joystick.stop() and joystick.exit() methods.
+
+    Requires python >= 3.5. It must be initialized at run-time before
+    use:
+
+    >>> class yuhu(joystick.Joystick):
+    >>>     _async_loop = joystick.deco_async_loop()
+    >>>     ...
+
+    It then can be used normally (within a class definition):
+
+    >>> @_async_loop()
+    >>> async def read_socket(self):
+    >>>     line = await self.reader.readline()
+    >>>     self.mytext.add_text(line.decode())
+    """
+    # just a layer to get a memory copy of the decorator at run-time
+    def async_loop_static(wait_time=wait_time):  # in sec
+        # the top-level decorator, with defaulted wait_time
+        def func_decorator(func):
+            # the actual decorator
+            @wraps(func)
+            def func_wrapper(self):
+                # the wrapper, to get pretty docstrings
+                # python 3.5+ syntax, import only when needed
+                from .asyncloop import run_async_loop
+                # schedule the coroutine and register its future
+                task = run_async_loop(self, func, wait_time)
+                core.append(self, '_async_tasks', task)
+            # at class-definition, this adds the function name in the
+            # top-level decorator
+            core.append(async_loop_static,
+                        'fcts',
+                        getattr(func,
+                                'func_name',
+                                getattr(func, '__name__', None)))
+            return func_wrapper
+        return func_decorator
+    return async_loop_static
+
+
+def deco_thread_it(func=None, pool=None, policy=None):
+    """
+    This decorator wraps the decorated function such that it runs in
+    a separate daemon-thread, started at the call of the function
+    (not with simulation start). The threads are taken from a shared
+    and size-bounded :py:class:`~joystick.pool.ThreadPool`, such that
+    calling the function in a loop does not spawn thousands of threads.
+
+    The call returns a ``concurrent.futures.Future`` to wait on or
+    cancel the work.
 
     >>> @joystick.deco_thread_it
     >>> def wait_and_print(txt, wait_time=0.5):
     >>>     time.sleep(wait_time)
     >>>     print("Hey, btw: {}".format(txt))
+
+    Args:
+      * pool (ThreadPool or None) [optional]: the pool to run the
+        function in, default is :py:func:`~joystick.pool.get_thread_pool`
+      * policy (str or None) [optional]: overrides the full-queue policy
+        of the pool, see :py:data:`~joystick.core.POOL_POLICIES`
+
+    >>> @joystick.deco_thread_it(policy='drop')
+    >>> def refresh_status(self):
+    >>>     ...
     """
-    @wraps(func)
-    def func_wrapper(*args, **kwargs):
-        # the wrapper, to get pretty docstrings
-        # register the Thread and start it
-        loopy = Thread(target=func, args=args, kwargs=kwargs)
-        loopy.daemon = True
-        loopy.start()
-    return func_wrapper
+    def func_decorator(func):
+        # the actual decorator
+        @wraps(func)
+        def func_wrapper(*args, **kwargs):
+            # the wrapper, to get pretty docstrings
+            if pool is None and Future is None:
+                # no futures available, fall back on a bare Thread
+                loopy = Thread(target=func, args=args, kwargs=kwargs)
+                loopy.daemon = True
+                loopy.start()
+                return
+            thepool = get_thread_pool() if pool is None else pool
+            return thepool._submit(func, args, kwargs, policy=policy)
+        return func_wrapper
+    # used as @deco_thread_it, without parenthesis
+    if func is not None:
+        return func_decorator(func)
+    return func_decorator
 
 
 def deco_callit(when='after', fct="init"):
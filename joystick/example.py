@@ -87,7 +87,8 @@ class test(jk.Joystick):
         # prepare the time axis
         t = np.round(self.xdata-self._t0, 1)
         # push new data to the graph
-        self.mygraph.set_xydata([t, t], [self.ydata, 1-self.ydata**2])
+        # both lines share the same time axis
+        self.mygraph.set_xydata(t, [self.ydata, 1-self.ydata**2])
         self.myscatter.set_xydata(self.ydata, self.ydata**2, c=self.ydata)
 
     @_callit('before', 'exit')
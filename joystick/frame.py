@@ -24,9 +24,12 @@
 #
 ###############################################################################
 
+from threading import RLock
+
 from . import core
 tkinter = core.tkinter
 np = core.np
+from .render import ThreadRenderer, ProcessRenderer
 
 
 __all__ = ['Frame']
@@ -34,7 +37,7 @@ __all__ = ['Frame']
 
 class Frame(object):
     def __init__(self, name, freq_up, pos=(50, 50), size=(400, 400),
-                 screen_relative=False, **kwargs):
+                 screen_relative=False, render='tk', **kwargs):
         """
         Initialises a frame, a base-class used to contain a e.g.
         :py:class:`~joystick.graph.Graph` or :py:class:`~joystick.text.Text`.
@@ -50,6 +53,12 @@ class Frame(object):
           * screen_relative (bool) [optional]: set to ``True`` to give
             ``pos`` and ``size`` as a % of the screen size, or ``False``
             to give then as pixels
+          * render (str) [optional]: where the figure of the frame is
+            rasterized, in ``core.RENDER_MODES``: ``'tk'`` in the Tk
+            thread, ``'thread'`` in a background thread, ``'process'``
+            in a worker process of the
+            :py:func:`~joystick.render.get_render_farm`; the Tk thread
+            then only copies the finished pixels to the screen
 
         Kwargs:
           * Will be passed to the optional custom methods decorated
@@ -61,7 +70,11 @@ class Frame(object):
         kwargs['pos'] = pos
         kwargs['size'] = size
         kwargs['screen_relative'] = screen_relative
+        kwargs['render'] = render
         self._kwargs = kwargs
+        # held while the figure is modified or drawn
+        self._lock = RLock()
+        self._renderer = None
         super(Frame, self).__init__()
         # main simu not running
         self._mummy_running = False
@@ -69,6 +82,7 @@ class Frame(object):
         self._init_frame(**self._kwargs)
 
     _extract_callit = core.extract_callit
+    _extract_callit_bound = core.extract_callit_bound
     _callmthd = core.callmthd
 
     def _init_frame(self, **kwargs):
@@ -78,6 +92,7 @@ class Frame(object):
         before, after = self._extract_callit('init')
         self._callmthd(before, **kwargs)
         self.freq_up = float(kwargs.pop('freq_up'))
+        self.render = kwargs.pop('render')
         self._running = True and not self._mummy_running
         self._visible = True
         self._window = tkinter.Tk()
@@ -93,6 +108,55 @@ class Frame(object):
         self._window.geometry("{}x{}+{}+{}".format(*(size + pos)))
         self._callmthd(after, **kwargs)
 
+    @property
+    def render(self):
+        """
+        Where the figure of the frame is rasterized, in
+        ``core.RENDER_MODES``. Changes apply at (re)initialization
+        """
+        return self._render
+
+    @render.setter
+    def render(self, value):
+        value = str(value).lower()
+        if value not in core.RENDER_MODES:
+            raise ValueError("'render' shall be in {}"\
+                             .format(core.RENDER_MODES))
+        self._render = value
+
+    def _init_renderer(self):
+        """
+        Starts the rendering thread of the canvas if necessary, once
+        the canvas is created. The drawings asked by Tk itself (e.g.
+        on resize or expose) also hold the lock of the frame
+        """
+        self._stop_renderer()
+        draw = self._canvas.draw
+        lock = self._lock
+
+        def locked_draw(*args, **kwargs):
+            with lock:
+                return draw(*args, **kwargs)
+        self._canvas.draw = locked_draw
+        if self._render == 'thread':
+            self._renderer = ThreadRenderer(self._canvas, self._lock)
+        elif self._render == 'process':
+            self._renderer = ProcessRenderer(self._canvas, self._lock)
+
+    def _stop_renderer(self):
+        if self._renderer is not None:
+            self._renderer.stop()
+            self._renderer = None
+
+    def _draw(self):
+        """
+        Draws the canvas, or asks the rendering thread to
+        """
+        if self._renderer is None:
+            self._canvas.draw()
+        else:
+            self._renderer.request()
+
     @property
     def visible(self):
         """
@@ -173,12 +237,25 @@ class Frame(object):
         """
         if self._mummy_running and self.running and self._freq_up is not None:
             self._window.after(int(1000./self.freq_up), self._update_loop)
-            before, after = self._extract_callit('update')
+            before, after = self._extract_callit_bound('update')
             self._callmthd(before)
-            self._callmthd(self._preupdate_fcts)
+            with self._lock:
+                self._callmthd(self._get_preupdate_bound())
             self._callmthd(after)
             self.show()
 
+    def _get_preupdate_bound(self):
+        """
+        Returns the methods listed in _preupdate_fcts as bound methods,
+        rebinds them only if the list changed
+        """
+        names, bound = getattr(self, '_preupdate_bound', (None, None))
+        if names != self._preupdate_fcts:
+            names = list(self._preupdate_fcts)
+            bound = core.bind_methods(self, names)
+            self._preupdate_bound = (names, bound)
+        return bound
+
     def start(self, **kwargs):
         """
         Starts updating the frame, even if already running
@@ -208,6 +285,7 @@ class Frame(object):
         before, after = self._extract_callit('exit')
         self._callmthd(before, **kwargs)
         self.stop()
+        self._stop_renderer()
         self._window.destroy()
         self._visible = False
         self._callmthd(after, **kwargs)
@@ -30,6 +30,9 @@ tkinter = core.tkinter
 FigureCanvasTkAgg = core.mat.backends.backend_tkagg.FigureCanvasTkAgg
 np = core.np
 from .frame import Frame
+from .history import TieredHistory
+from .stats import RollingStats
+from .trigger import Trigger
 
 
 __all__ = ['Graph']
@@ -40,7 +43,8 @@ class Graph(Frame):
                  screen_relative=False, xnpts=30, fmt="ro-", bgcol='w',
                  axrect=(0.1, 0.1, 0.9, 0.9), grid='k',
                  xylim=(None, None, None, None), xnptsmax=50, axmargin=(1.1, 1.1),
-                 **kwargs):
+                 history=None, xwindow=None, xretention=None, stats=None,
+                 nsigma=3., trigger=None, **kwargs):
         """
         Initialises a graph-frame. Use :py:func:`~joystick.graph.Graph.set_xydata` and
         :py:func:`~joystick.graphGraph.get_xydata` to set and get the x- and y-data of the
@@ -76,10 +80,37 @@ class Graph(Frame):
           * axmargin (tuple of 2 floats) [optional]: a expand factor to
             increase the (x, y) axes limits when they are automatically
             calculated from the data (i.e. some xylim is ``None``)
+          * history (int, TieredHistory or None) [optional]: if not
+            ``None``, keeps a multi-resolution history of the data added
+            with :py:func:`~joystick.graph.Graph.add_history`, of
+            ``history`` full-resolution points, or as given by a
+            :py:class:`~joystick.history.TieredHistory`. The graph then
+            shows the history whenever the x-axis limits are fixed, see
+            :py:func:`~joystick.graph.Graph.xylim`
+          * xwindow (float or None) [optional]: if not ``None``, only the
+            data-points with x within ``xwindow`` of the last x value are
+            plotted (x must be increasing), instead of the last ``xnpts``
+          * xretention (float or None) [optional]: if not ``None``,
+            :py:func:`~joystick.graph.Graph.add_xydatapoint` drops the
+            data-points with x older than ``xretention`` from the last x
+            value, instead of keeping the last ``xnptsmax``
+          * stats (int or None) [optional]: if not ``None``, shows the
+            rolling mean and a band of +/- ``nsigma`` standard deviations
+            over the last ``stats`` data-points added with
+            :py:func:`~joystick.graph.Graph.add_stats`
+          * nsigma (float) [optional]: the half-width of the statistics
+            band, in standard deviations
+          * trigger (Trigger or None) [optional]: if not ``None``, the
+            graph shows the triggered sweeps of the data pushed with
+            :py:func:`~joystick.graph.Graph.add_triggered`, see
+            :py:class:`~joystick.trigger.Trigger`
 
         Kwargs:
           * Any non-abbreviated parameter accepted by ``figure.add_axes``
             (eg. ``xlabel``, ``ylabel``, ``title``, ``aspect``) and ``plt.plot``
+          * render (str): ``'thread'`` or ``'process'`` to rasterize the
+            figure in a background thread or in a worker process, see
+            :py:class:`~joystick.frame.Frame`
           * Will be passed to the optional custom methods decorated
             with :py:func:`~joystick.deco.deco_callit`
         """
@@ -96,11 +127,18 @@ class Graph(Frame):
         kwargs['xylim'] = xylim
         kwargs['xnptsmax'] = xnptsmax
         kwargs['axmargin'] = axmargin
+        kwargs['history'] = history
+        kwargs['xwindow'] = xwindow
+        kwargs['xretention'] = xretention
+        kwargs['stats'] = stats
+        kwargs['nsigma'] = nsigma
+        kwargs['trigger'] = trigger
         self._minmini = 1e-2
         self._kwargs = kwargs
         # call mummy init
         super(Graph, self).__init__(**self._kwargs)
-        self._preupdate_fcts += ['_scale_axes']
+        self._preupdate_fcts += ['_pull_history', '_push_stats',
+                                 '_scale_axes']
         # call ya own init
         self._init_base(**self._kwargs)
 
@@ -113,6 +151,9 @@ class Graph(Frame):
         self._init_basic_graph(**kwargs)
         self._plot, = self.ax.plot(0, 0, kwargs.pop('fmt'),
                                   **core.linekwargs(kwargs))
+        self._init_history(kwargs.pop('history'), nlines=1)
+        self._init_stats(kwargs.pop('stats'), kwargs.pop('nsigma'), nlines=1)
+        self._trigger = kwargs.pop('trigger')
         self._scale_axes(force=True)
         self._callmthd(after, **kwargs)
 
@@ -121,6 +162,10 @@ class Graph(Frame):
         self._axmargin = tuple(map(abs, kwargs.pop('axmargin')[:2]))
         self._xnpts = int(kwargs.pop('xnpts'))
         self._xnptsmax = max(int(kwargs.pop('xnptsmax')), self.xnpts)
+        self.xwindow = kwargs.pop('xwindow')
+        # x (min, max) of each line if known in closed form
+        self._xextent = {}
+        self.xretention = kwargs.pop('xretention')
         axrect = tuple(kwargs.pop('axrect')[:4])
         self._fig = core.mat.figure.Figure()
         self.ax = self._fig.add_axes(axrect[:2] + (axrect[2]-axrect[0],
@@ -128,6 +173,7 @@ class Graph(Frame):
                                      **core.axkwargs(kwargs))
         self._canvas = FigureCanvasTkAgg(self._fig, master=self._window)
         self._canvas.show()
+        self._init_renderer()
         self._canvas.get_tk_widget().pack(side=tkinter.TOP,
                                           fill=tkinter.BOTH,
                                           expand=True)
@@ -143,13 +189,212 @@ class Graph(Frame):
         if grid not in [None, False]:
             self.ax.grid(color=grid, lw=1)
 
+    def _init_history(self, history, nlines=1):
+        """
+        Creates the multi-resolution history of each line, keeps the
+        existing one on reinit
+        """
+        if getattr(self, '_history', None) is not None:
+            return
+        if history is None:
+            self._history = None
+        elif isinstance(history, TieredHistory):
+            self._history = [history] + [history.empty_like()
+                                         for ith in range(nlines-1)]
+        else:
+            self._history = [TieredHistory(nfull=int(history))
+                             for ith in range(nlines)]
+
+    def add_history(self, x, y, ln=None):
+        """
+        Appends data-points to the multi-resolution history (requires
+        the ``history`` parameter at initialization).
+        Give x and y as numbers or numpy 1d-vectors, or, for several
+        lines and ``ln`` left ``None``, as lists of those (len= number
+        of lines). If ``ln`` is an integer (i.e. line-index), only the
+        history of this line is appended.
+        """
+        if getattr(self, '_history', None) is None:
+            print("{}No history, see 'history' parameter{}" \
+            .format(core.font.red, core.font.normal))
+            return
+        if ln is not None:
+            self._history[int(ln)].append(x, y)
+        elif len(self._history) == 1:
+            self._history[0].append(x, y)
+        else:
+            for ith, hist in enumerate(self._history):
+                hist.append(x[ith], y[ith])
+
+    def _pull_history(self):
+        """
+        Shows the history tier matching the x-axis limits, if these are
+        fixed
+        """
+        if getattr(self, '_history', None) is None or not self.visible:
+            return
+        xmin, xmax = self.xylim[:2]
+        if xmin is None or xmax is None:
+            return
+        # two points per pixel column is as good as it gets
+        npts = 2*self._canvas.get_width_height()[0]
+        for ith, hist in enumerate(self._history):
+            x, y = hist.view(xmin, xmax, npts=npts)
+            self.ax.lines[ith].set_data(x, y)
+            self._xextent[ith] = None
+
+    def _init_stats(self, stats, nsigma, nlines=1):
+        """
+        Creates the rolling statistics of each line, keeps the existing
+        ones on reinit, and their mean-lines
+        """
+        self._nsigma = float(nsigma)
+        if stats is None:
+            self._stats = None
+            return
+        if getattr(self, '_stats', None) is None:
+            self._stats = [RollingStats(stats) for ith in range(nlines)]
+            self._stats_data = [(np.empty(0),)*3 for ith in range(nlines)]
+        self._bands = [None]*nlines
+        self._meanlines = [self.ax.plot([], [], '--', lw=1,
+                                color=self.ax.lines[ith].get_color())[0]
+                           for ith in range(nlines)]
+        self._stats_dirty = True
+
+    def add_stats(self, x, y, ln=None):
+        """
+        Appends data-points to the rolling statistics (requires the
+        ``stats`` parameter at initialization), only the new data-points
+        are processed.
+        Give x and y as numbers or numpy 1d-vectors, or, for several
+        lines and ``ln`` left ``None``, as lists of those (len= number
+        of lines); x can also be a single vector shared by all lines.
+        If ``ln`` is an integer (i.e. line-index), only the statistics
+        of this line are appended.
+        """
+        if getattr(self, '_stats', None) is None:
+            print("{}No statistics, see 'stats' parameter{}" \
+            .format(core.font.red, core.font.normal))
+            return
+        if ln is not None:
+            self._append_stats(int(ln), x, y)
+        elif len(self._stats) == 1:
+            self._append_stats(0, x, y)
+        else:
+            shared = isinstance(x, np.ndarray) or np.ndim(x) == 0
+            for ith in range(len(self._stats)):
+                self._append_stats(ith, x if shared else x[ith], y[ith])
+
+    def _append_stats(self, ith, x, y):
+        mean, std = self._stats[ith].append(y)
+        oldx, oldmean, oldstd = self._stats_data[ith]
+        x = np.r_[oldx, x]
+        if self.xretention is not None:
+            start = core.window_start(x, self.xretention)
+        else:
+            start = max(x.size - self.xnptsmax, 0)
+        self._stats_data[ith] = (x[start:], np.r_[oldmean, mean][start:],
+                                 np.r_[oldstd, std][start:])
+        self._stats_dirty = True
+
+    def _push_stats(self):
+        """
+        Updates the mean-lines and the vertices of the bands in place
+        """
+        if getattr(self, '_stats', None) is None or not self.visible \
+                or not self._stats_dirty:
+            return
+        for ith, (x, mean, std) in enumerate(self._stats_data):
+            sl = self._visible_slice(x)
+            x, mean, std = x[sl], mean[sl], std[sl]
+            self._meanlines[ith].set_data(x, mean)
+            if x.size > 0:
+                self._set_band(ith, x, mean - self._nsigma*std,
+                               mean + self._nsigma*std)
+        self._stats_dirty = False
+
+    def _set_band(self, ith, x, low, high):
+        """
+        Writes the band polygon of the ith line in place: upper edge
+        forward then lower edge backward, padded with the last point up
+        to the capacity of the polygon. The polygon is only re-created
+        when the capacity is exceeded
+        """
+        n = x.size
+        band = self._bands[ith]
+        cap = 0 if band is None else (len(band.get_path().vertices) - 1)//2
+        if n > cap:
+            if band is not None:
+                band.remove()
+            cap = max(2*n, self.xnpts or 0)
+            band, = self.ax.fill(np.zeros(2*cap+1), np.zeros(2*cap+1),
+                                 color=self.ax.lines[ith].get_color(),
+                                 alpha=0.25, lw=0)
+            self._bands[ith] = band
+        v = band.get_path().vertices
+        pad = cap - n
+        v[:n, 0] = x
+        v[:n, 1] = high
+        v[n:cap] = x[-1], high[-1]
+        v[cap:cap+pad] = x[-1], low[-1]
+        v[cap+pad:2*cap, 0] = x[::-1]
+        v[cap+pad:2*cap, 1] = low[::-1]
+        v[2*cap:] = v[0]
+        band.stale = True
+
+    @property
+    def trigger(self):
+        """
+        The :py:class:`~joystick.trigger.Trigger` of the graph, or
+        ``None``. Read-only.
+        """
+        return getattr(self, '_trigger', None)
+
+    @trigger.setter
+    def trigger(self, value):
+        print("Read-only.")
+
+    @core.locked
+    def add_triggered(self, values):
+        """
+        Pushes new samples (number or vector) through the trigger
+        (requires the ``trigger`` parameter at initialization) and shows
+        the last sweep they complete, if any. Returns all the sweeps
+        completed, as a 2d-array of shape (n, npts)
+        """
+        if self.trigger is None:
+            print("{}No trigger, see 'trigger' parameter{}" \
+            .format(core.font.red, core.font.normal))
+            return
+        sweeps = self.trigger.push(values)
+        if sweeps.shape[0] > 0 and self.visible:
+            t = self.trigger.time
+            self._plot.set_data(t, sweeps[-1])
+            self._xextent[0] = (t[0], t[-1])
+        return sweeps
+
     def add_datapoint(self, data=None, new_data=None, data1=None, data2=None):
         if data is None and data1 is not None and new_data is None\
                 and data2 is not None:
             print("DEPRECATION: use data and new_data keyword instead of "\
                   "data1 and data2")
             data, new_data = data1, data2
-        return core.add_datapoint(data, new_data, xnptsmax=self.xnptsmax)
+        # buffer objects record without limit
+        return core.add_datapoint(data, new_data,
+                    xnptsmax=None if core.is_buffer(data) else self.xnptsmax)
+
+    def add_xydatapoint(self, x, y, new_x, new_y):
+        """
+        Concatenates new_x and new_y at the end of the x and y vectors,
+        and drops the data-points older than
+        :py:func:`~joystick.graph.Graph.xretention` if not ``None``, or
+        keeps the last :py:func:`~joystick.graph.Graph.xnptsmax`.
+        Returns the (x, y) vectors, appended in place at the next call,
+        see :py:func:`~joystick.core.add_xydatapoint`
+        """
+        return core.add_xydatapoint(x, y, new_x, new_y,
+                                    span=self.xretention,
+                                    xnptsmax=self.xnptsmax)
 
     def reinit(self, **kwargs):
         """
@@ -170,7 +415,7 @@ class Graph(Frame):
         Updates the graph
         """
         if self.visible:
-            self._canvas.draw()
+            self._draw()
 
     @property
     def xnptsmax(self):
@@ -210,19 +455,89 @@ class Graph(Frame):
             print("{}Invalid value. Must be 1--{}{}" \
             .format(core.font.red, self.xnptsmax, core.font.normal))
 
+    @property
+    def xwindow(self):
+        """
+        The x-span of data-points to be plotted, counted back from the
+        last x value; overrides :py:func:`~joystick.graph.Graph.xnpts`.
+        If ``None``, ``xnpts`` applies.
+        """
+        return self._xwindow
+
+    @xwindow.setter
+    def xwindow(self, value):
+        self._xwindow = None if value is None else abs(float(value))
+
+    @property
+    def xretention(self):
+        """
+        The x-span of data-points to be kept by
+        :py:func:`~joystick.graph.Graph.add_xydatapoint`, counted back
+        from the last x value; overrides
+        :py:func:`~joystick.graph.Graph.xnptsmax`.
+        If ``None``, ``xnptsmax`` applies.
+        """
+        return self._xretention
+
+    @xretention.setter
+    def xretention(self, value):
+        self._xretention = None if value is None else abs(float(value))
+
+    def _visible_slice(self, x, n=None, y=None):
+        """
+        Returns the slice of the data to be displayed, given xwindow or
+        xnpts. If x is a :py:class:`~joystick.core.UniformX`, n is the
+        number of data-points and the slice is explicit. y is only
+        checked for being a buffer object
+        """
+        if isinstance(x, core.UniformX):
+            if self.xwindow is not None:
+                return slice(x.window_start(n, self.xwindow), n)
+            elif self.xnpts is not None:
+                return slice(max(n - self.xnpts, 0), n)
+            return slice(0, n)
+        if self.xwindow is not None:
+            if hasattr(x, 'time_index'):  # e.g. SpillBuffer
+                return slice(x.time_index(x[-1] - self.xwindow), None)
+            return slice(core.window_start(x, self.xwindow), None)
+        elif self.xnpts is not None:
+            return slice(-self.xnpts, None)
+        elif core.is_buffer(x) or core.is_buffer(y):
+            # not the whole disk-backed buffer: the last xnptsmax
+            # data-points or those kept in memory
+            n = self.xnptsmax or getattr(x if core.is_buffer(x) else y,
+                                         'hot', None)
+            if n is not None:
+                return slice(-int(n), None)
+        return slice(None)
+
+    def _visible_xy(self, x, y):
+        """
+        Returns the x and y data to be displayed, and their x (min, max)
+        if known in closed form (i.e. x is a
+        :py:class:`~joystick.core.UniformX`), else ``None``
+        """
+        if isinstance(x, core.UniformX):
+            n = np.size(y)
+            sl = self._visible_slice(x, n)
+            extent = x.extent(sl.start, n) if n > sl.start else None
+            return x.values(sl.start, n), y[sl], extent
+        sl = self._visible_slice(x, y=y)
+        return x[sl], y[sl], None
+
+    @core.locked
     def set_xydata(self, x, y):
         """
         Sets the x and y data of the graph.
         Give x and y vectors as numpy arrays; only the last
-        :py:func:`~joystick.graph.Graph.xnpts` data-points will be displayed
+        :py:func:`~joystick.graph.Graph.xnpts` data-points (or those
+        within :py:func:`~joystick.graph.Graph.xwindow`) will be displayed.
+        For fixed-rate data, x can be a :py:class:`~joystick.core.UniformX`
         """
         if self.visible:
-            if self.xnpts is not None:
-                self._plot.set_xdata(x[-self.xnpts:])
-                self._plot.set_ydata(y[-self.xnpts:])
-            else:
-                self._plot.set_xdata(x)
-                self._plot.set_ydata(y)
+            x, y, self._xextent[0] = self._visible_xy(x, y)
+            self._plot.set_xdata(x)
+            self._plot.set_ydata(y)
 
     def get_xydata(self):
         """
@@ -240,6 +555,9 @@ class Graph(Frame):
         # if no data on the graph, just return None
         if (0 if x is None else x.size) == 0 or (0 if y is None else y.size) == 0:
             return None
+        # closed form for uniform x
+        if self._xextent.get(0) is not None:
+            return self._xextent[0] + (np.min(y), np.max(y))
         return np.min(x), np.max(x), np.min(y), np.max(y)
 
     @property
@@ -40,7 +40,8 @@ class GraphMulti(Graph):
                  lbls=None, legend=2, fmt=None, bgcol='w',
                  axrect=(0.1, 0.1, 0.9, 0.9), grid='k',
                  xylim=(None, None, None, None), xnptsmax=50, axmargin=(1.1, 1.1),
-                  **kwargs):
+                 history=None, xwindow=None, xretention=None, stats=None,
+                 nsigma=3., **kwargs):
         """
         Initialises a graph-frame. Use :py:func:`~joystick.graph.Graph.set_xydata` and
         :py:func:`~joystick.graphGraph.get_xydata` to set and get the x- and y-data of the
@@ -83,6 +84,18 @@ class GraphMulti(Graph):
           * axmargin (tuple of 2 floats) [optional]: a expand factor to
             increase the (x, y) axes limits when they are automatically
             calculated from the data (i.e. some xylim is ``None``)
+          * history (int, TieredHistory or None) [optional]: if not
+            ``None``, keeps a multi-resolution history of each line, see
+            :py:class:`~joystick.graph.Graph`
+          * xwindow (float or None) [optional]: the x-span of data-points
+            to be plotted, see :py:class:`~joystick.graph.Graph`
+          * xretention (float or None) [optional]: the x-span of
+            data-points to be kept, see :py:class:`~joystick.graph.Graph`
+          * stats (int or None) [optional]: the number of data-points of
+            the rolling statistics of each line, see
+            :py:class:`~joystick.graph.Graph`
+          * nsigma (float) [optional]: the half-width of the statistics
+            bands, in standard deviations
 
         Kwargs:
           * Any parameter accepted by ``plt.figure.add_axes`` (eg. ``xlabel``,
@@ -104,7 +117,9 @@ class GraphMulti(Graph):
         super(GraphMulti, self).__init__(name=name, freq_up=freq_up, pos=pos,
                  size=size, screen_relative=screen_relative, xnpts=xnpts,
                  fmt=fmt, bgcol=bgcol, axrect=axrect, grid=grid, xylim=xylim,
-                 xnptsmax=xnptsmax, axmargin=axmargin, **kwargs)
+                 xnptsmax=xnptsmax, axmargin=axmargin, history=history,
+                 xwindow=xwindow, xretention=xretention, stats=stats,
+                 nsigma=nsigma, **kwargs)
 
     def _init_base(self, **kwargs):
         """
@@ -127,6 +142,9 @@ class GraphMulti(Graph):
                          **core.linekwargs(kwargs, ith)))
             if self.numbering:
                 self._add_text(ith, 0, 0)
+        self._init_history(kwargs.pop('history'), nlines=self.nlines)
+        self._init_stats(kwargs.pop('stats'), kwargs.pop('nsigma'),
+                         nlines=self.nlines)
         self._scale_axes(force=True)
         self.legend(self._legend is not False, loc=self._legend)
         self._callmthd(after, **kwargs)
@@ -179,7 +197,7 @@ class GraphMulti(Graph):
             if lbls != []:
                 self.lbls = lbls
             loc = self._legend if loc is None else int(loc)
-            self.ax.legend(self.ax.lines, self.lbls, loc=loc)
+            self.ax.legend(self.ax.lines[:self.nlines], self.lbls, loc=loc)
         elif self.ax.legend_ is not None:
             self.ax.legend_.remove()
         self.show()
@@ -208,12 +226,13 @@ class GraphMulti(Graph):
             return
         self._numbering = bool(value)
         if self._numbering:
-            for ith, l in enumerate(self.ax.lines):
+            for ith, l in enumerate(self.ax.lines[:self.nlines]):
                 self._add_text(ith)
         else:
             for ith in range(self.nlines):
                 self.ax.texts.pop(0)
 
+    @core.locked
     def set_xydata(self, x, y, ln=None):
         """
         Sets the x and y data of the graph.
@@ -224,32 +243,63 @@ class GraphMulti(Graph):
         If ``ln`` is an integer (i.e. line-index), only this line will
         be updated x and y shall be numpy 1d-vectors.
 
+        For fixed-rate data, any x can be a
+        :py:class:`~joystick.core.UniformX`.
+
+        If all lines share the same x-axis, give x as a single numpy
+        1d-vector (or :py:class:`~joystick.core.UniformX`) and y as a
+        (:py:func:`~joystick.graph.GraphMulti.nlines`, npts) numpy array:
+        the x-axis is then sliced and scanned once for all lines.
+
         For each line, only the last :py:func:`~joystick.graph.GraphMulti.xnpts`
-        data-points will be displayed
+        data-points (or those within :py:func:`~joystick.graph.Graph.xwindow`)
+        will be displayed
         """
         if not self.visible:
             return
         if ln is not None:
             self._set_data_and_text(ith=int(ln), x=x, y=y)
+        elif isinstance(x, core.UniformX) or \
+                (isinstance(x, np.ndarray) and x.ndim == 1):
+            self._set_shared_data(x=x, y=y)
         else:
-            for ith, l in enumerate(self.ax.lines):
+            for ith, l in enumerate(self.ax.lines[:self.nlines]):
                 self._set_data_and_text(ith=ith, x=x[ith], y=y[ith])
-                        
+
+    def _set_shared_data(self, x, y):
+        """
+        set data of all lines sharing the same x-axis
+        """
+        y = np.asarray(y)
+        if isinstance(x, core.UniformX):
+            n = y.shape[1]
+            sl = self._visible_slice(x, n)
+            xs = x.values(sl.start, n)
+            extent = x.extent(sl.start, n) if n > sl.start else None
+        else:
+            sl = self._visible_slice(x)
+            xs = x[sl]
+            extent = (xs.min(), xs.max()) if xs.size > 0 else None
+        for ith in range(self.nlines):
+            self._set_line(ith, xs, y[ith, sl], extent)
+
     def _set_data_and_text(self, ith, x, y):
         """
         set data and move text box if necessary of the ith line
         """
-        if self.xnpts is not None:
-            self.ax.lines[ith].set_xdata(x[-self.xnpts:])
-            self.ax.lines[ith].set_ydata(y[-self.xnpts:])
-        else:
-            self.ax.lines[ith].set_xdata(x)
-            self.ax.lines[ith].set_ydata(y)
+        self._set_line(ith, *self._visible_xy(x, y))
+
+    def _set_line(self, ith, x, y, extent=None):
+        """
+        set the displayed data of the ith line, with its x (min, max) if
+        already known, and move its text box if necessary
+        """
+        self._xextent[ith] = extent
+        self.ax.lines[ith].set_xdata(x)
+        self.ax.lines[ith].set_ydata(y)
         if self.numbering:
-            idx = -self.xnpts\
-                  if (np.size(x) >= self.xnpts and self.xnpts is not None)\
-                  else 0
-            xybox= (x[idx], y[idx])\
+            # first displayed data-point
+            xybox= (x[0], y[0])\
                    if np.size(x) > 0 and np.size(y) > 0\
                    else (0, 0)
             self.ax.texts[ith].set_position(xybox)
@@ -263,8 +313,8 @@ class GraphMulti(Graph):
             return (self.ax.lines[int(ln)].get_xdata(),
                     self.ax.lines[int(ln)].get_ydata())
         else:
-            return ([l.get_xdata() for l in self.ax.lines],
-                    [l.get_ydata() for l in self.ax.lines])
+            return ([l.get_xdata() for l in self.ax.lines[:self.nlines]],
+                    [l.get_ydata() for l in self.ax.lines[:self.nlines]])
 
     def _get_xydata_minmax(self):
         """
@@ -273,6 +323,11 @@ class GraphMulti(Graph):
         x, y = self.get_xydata()
         if (0 if x is None else np.size(x)) == 0 or (0 if y is None else np.size(y)) == 0:
             return self.get_xylim()
-        x = np.concatenate(x)
         y = np.concatenate(y)
+        extents = [self._xextent.get(ith) for ith in range(self.nlines)]
+        # closed form for uniform x
+        if all(item is not None for item in extents):
+            return min(item[0] for item in extents), \
+                   max(item[1] for item in extents), y.min(), y.max()
+        x = np.concatenate(x)
         return x.min(), x.max(), y.min(), y.max()
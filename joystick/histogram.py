@@ -0,0 +1,305 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+###############################################################################
+#  
+#  JOYSTICK - Real-time plotting and logging while console controlling
+#  Copyright (C) 2016  Guillaume Schworer
+#  
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#  
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#  
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#  
+#  For any information, bug report, idea, donation, hug, beer, please contact
+#    guillaume.schworer@gmail.com
+#
+###############################################################################
+
+from . import core
+np = core.np
+time = core.time
+from .graph import Graph
+
+
+__all__ = ['Histogram']
+
+
+class Histogram(Graph):
+    def __init__(self, name, freq_up=1, pos=(50, 50), size=(400, 400),
+                 screen_relative=False, bins=50, hrange=(0., 1.),
+                 decay=None, window=None, color='b', edgecolor=None,
+                 bgcol='w', axrect=(0.1, 0.1, 0.9, 0.9), grid='k',
+                 xylim=(None, None, 0., None), axmargin=(1., 1.1),
+                 **kwargs):
+        """
+        Initialises a histogram-frame. The bin counts are updated
+        incrementally with :py:func:`~joystick.histogram.Histogram.add_data`
+        as batches of values arrive, the cost of an update depends on
+        the size of the batch and not on the number of values already
+        counted.
+
+        Args:
+          * name (str): the frame name
+          * freq_up (float or None): the frequency of update of the frame,
+            between 1e-3 and 1e3 Hz, or ``None`` for no update
+          * pos (px or %) [optional]: left-top corner position of the
+            frame, see ``screen_relative``
+          * size (px or %) [optional]: width-height dimension of the
+            frame, see ``screen_relative``
+          * screen_relative (bool) [optional]: set to ``True`` to give
+            ``pos`` and ``size`` as a % of the screen size, or ``False``
+            to give then as pixels
+          * bins (int or vector) [optional]: the number of bins spread
+            evenly over ``hrange``, or the increasing bin edges
+          * hrange (tuple of 2 floats) [optional]: the (min, max) range
+            of the bins if ``bins`` is an integer
+          * decay (float or None) [optional]: if not ``None``, the
+            half-life (seconds) of the counts, for an exponentially
+            fading histogram
+          * window (int or None) [optional]: if not ``None``, only the
+            last ``window`` values are counted (sliding window)
+          * color (color) [optional]: the color of the bars
+          * edgecolor (color or None) [optional]: the color of the bars
+            outline
+          * bgcol (color) [optional]: the background color of the graph
+          * axrect (list of 4 floats) [optional]: the axes bounds (l,b,w,h)
+            as in ``plt.figure.add_axes(rect=(l,b,w,h))``
+          * grid (color or None) [optional]: the grid color, or no grid if
+            ``None``
+          * xylim (list of 4 floats or None) [optional]: the values of the
+            axes limits (xmin, xmax, ymin, ymax), where any value can take
+            ``None`` to be recalculated according to the data at each update
+          * axmargin (tuple of 2 floats) [optional]: a expand factor to
+            increase the (x, y) axes limits when they are automatically
+            calculated from the data (i.e. some xylim is ``None``)
+
+        Kwargs:
+          * Any non-abbreviated parameter accepted by ``figure.add_axes``
+            (eg. ``xlabel``, ``ylabel``, ``title``, ``aspect``)
+          * Will be passed to the optional custom methods decorated
+            with :py:func:`~joystick.deco.deco_callit`
+        """
+        if decay is not None and window is not None:
+            raise ValueError("'decay' and 'window' parameters cannot be "\
+                             "used together")
+        kwargs['bins'] = bins
+        kwargs['hrange'] = hrange
+        kwargs['decay'] = decay
+        kwargs['window'] = window
+        kwargs['color'] = color
+        kwargs['edgecolor'] = edgecolor
+        self._kwargs = kwargs
+        super(Histogram, self).__init__(name=name, freq_up=freq_up,
+                 pos=pos, size=size, screen_relative=screen_relative,
+                 xnpts=1, bgcol=bgcol, axrect=axrect, grid=grid,
+                 xylim=xylim, xnptsmax=1, axmargin=axmargin,
+                 **self._kwargs)
+        self._preupdate_fcts.insert(0, '_push_counts')
+
+    def _init_base(self, **kwargs):
+        """
+        Separate function from __init__ for re-initialization purpose
+        """
+        before, after = self._extract_callit('init')
+        self._callmthd(before, **kwargs)
+        self._init_basic_graph(**kwargs)
+        kwargs.pop('fmt')
+        self._init_history(kwargs.pop('history'), nlines=1)
+        self._init_bins(kwargs.pop('bins'), kwargs.pop('hrange'),
+                        kwargs.pop('decay'), kwargs.pop('window'))
+        # one filled step-polygon for all bars, whose heights are
+        # written in place
+        n = self.nbins
+        xy = np.zeros((2*n+2, 2))
+        xy[:, 0] = np.repeat(self._edges, 2)
+        self._plot, = self.ax.fill(xy[:, 0], xy[:, 1],
+                                   facecolor=kwargs.pop('color'),
+                                   edgecolor=kwargs.pop('edgecolor'))
+        self._heights = self._plot.get_path().vertices[1:2*n+1, 1]
+        self._dirty = True
+        self._push_counts()
+        self._scale_axes(force=True)
+        self._callmthd(after, **kwargs)
+
+    def _init_bins(self, bins, hrange, decay, window):
+        """
+        Sets the bin edges and the counters, keeps the counts on reinit
+        if the bins did not change
+        """
+        if np.size(bins) == 1:
+            edges = np.linspace(hrange[0], hrange[1], int(bins)+1)
+            self._uniform = True
+        else:
+            edges = np.asarray(bins, dtype=float)
+            self._uniform = False
+        keep = getattr(self, '_edges', None) is not None \
+                    and self._edges.size == edges.size \
+                    and (self._edges == edges).all() \
+                    and self._decay == decay and self._nwindow == window
+        self._edges = edges
+        self._decay = None if decay is None else float(decay)
+        self._nwindow = None if window is None else int(window)
+        if keep:
+            return
+        self._counts = np.zeros(self.nbins)
+        self._tlast = time.time()
+        if self._nwindow is not None:
+            # bin index of the last values, -1 for out of range
+            self._ring = np.full(self._nwindow, -1, dtype=np.intp)
+            self._ringpos = 0
+
+    @property
+    def nbins(self):
+        """
+        The number of bins. Read-only.
+        """
+        return self._edges.size - 1
+
+    @nbins.setter
+    def nbins(self, value):
+        print("Read-only.")
+
+    @property
+    def edges(self):
+        """
+        The bin edges. Read-only.
+        """
+        return self._edges.copy()
+
+    @edges.setter
+    def edges(self, value):
+        print("Read-only.")
+
+    @property
+    def decay(self):
+        """
+        The half-life (seconds) of the counts, or ``None``. Read-only.
+        """
+        return self._decay
+
+    @decay.setter
+    def decay(self, value):
+        print("Read-only.")
+
+    @property
+    def window(self):
+        """
+        The number of last values counted, or ``None``. Read-only.
+        """
+        return self._nwindow
+
+    @window.setter
+    def window(self, value):
+        print("Read-only.")
+
+    def _bin_index(self, values):
+        """
+        Returns the bin index of each value, -1 if out of range
+        """
+        edges = self._edges
+        n = self.nbins
+        if self._uniform:
+            idx = np.floor((values - edges[0]) * (n/(edges[-1] - edges[0])))
+            idx = idx.astype(np.intp)
+        else:
+            idx = np.searchsorted(edges, values, side='right') - 1
+        # right-most edge is included, as in np.histogram
+        idx[values == edges[-1]] = n - 1
+        idx[(idx < 0) | (idx >= n)] = -1
+        return idx
+
+    def _apply_decay(self):
+        if self._decay is None:
+            return
+        t = time.time()
+        self._counts *= 0.5**((t - self._tlast)/self._decay)
+        self._tlast = t
+
+    def add_data(self, values):
+        """
+        Counts a batch of new values (number or vector) into the
+        histogram
+        """
+        values = np.asarray(values, dtype=float).ravel()
+        if values.size == 0:
+            return
+        idx = self._bin_index(values)
+        n = self.nbins
+        self._apply_decay()
+        if self._nwindow is not None:
+            w = self._nwindow
+            if idx.size >= w:
+                self._ring[:] = idx[-w:]
+                self._ringpos = 0
+                self._counts[:] = np.bincount(self._ring[self._ring >= 0],
+                                              minlength=n)
+            else:
+                pos = (self._ringpos + np.arange(idx.size)) % w
+                old = self._ring[pos]
+                self._counts -= np.bincount(old[old >= 0], minlength=n)
+                self._ring[pos] = idx
+                self._ringpos = (self._ringpos + idx.size) % w
+                self._counts += np.bincount(idx[idx >= 0], minlength=n)
+        else:
+            self._counts += np.bincount(idx[idx >= 0], minlength=n)
+        self._dirty = True
+
+    def clear(self):
+        """
+        Resets all counts to zero
+        """
+        self._counts[:] = 0
+        if self._nwindow is not None:
+            self._ring[:] = -1
+        self._dirty = True
+
+    def get_data(self):
+        """
+        Returns the bin counts
+        """
+        self._apply_decay()
+        return self._counts.copy()
+
+    def set_data(self, counts):
+        """
+        Sets the bin counts
+        """
+        self._counts[:] = counts
+        self._dirty = True
+
+    def get_xydata(self):
+        """
+        Returns the bin centers and the bin counts
+        """
+        return 0.5*(self._edges[1:] + self._edges[:-1]), self.get_data()
+
+    def set_xydata(self, x, y):
+        """
+        Not available for a histogram, use
+        :py:func:`~joystick.histogram.Histogram.add_data`
+        """
+        print("{}Use 'add_data' to fill a histogram{}" \
+            .format(core.font.red, core.font.normal))
+
+    def _push_counts(self):
+        """
+        Writes the bar heights in place in the polygon
+        """
+        if not self.visible or not (self._dirty or self._decay is not None):
+            return
+        self._apply_decay()
+        self._heights[:] = np.repeat(self._counts, 2)
+        self._plot.stale = True
+        self._dirty = False
+
+    def _get_xydata_minmax(self):
+        return self._edges[0], self._edges[-1], 0., self._counts.max()
@@ -0,0 +1,181 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+###############################################################################
+#  
+#  JOYSTICK - Real-time plotting and logging while console controlling
+#  Copyright (C) 2016  Guillaume Schworer
+#  
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#  
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#  
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#  
+#  For any information, bug report, idea, donation, hug, beer, please contact
+#    guillaume.schworer@gmail.com
+#
+###############################################################################
+
+from . import core
+np = core.np
+
+
+__all__ = ['TieredHistory']
+
+
+class _Tier(object):
+    """
+    A fixed-capacity buffer of rows, always contiguous in memory: it is
+    twice the capacity and shifted back by half when full, such that
+    appending is amortized O(1) and reading is a view
+    """
+    def __init__(self, capacity, ncols):
+        self.capacity = int(capacity)
+        self._buf = np.empty((2*self.capacity, ncols))
+        self._start = 0
+        self._end = 0
+
+    def __len__(self):
+        return self._end - self._start
+
+    @property
+    def data(self):
+        return self._buf[self._start:self._end]
+
+    def append(self, rows):
+        rows = rows[-self.capacity:]
+        n = rows.shape[0]
+        if self._end + n > self._buf.shape[0]:
+            keep = min(self.capacity - n, len(self))
+            self._buf[:keep] = self._buf[self._end-keep:self._end]
+            self._start, self._end = 0, keep
+        self._buf[self._end:self._end+n] = rows
+        self._end += n
+        self._start = max(self._start, self._end - self.capacity)
+
+
+class TieredHistory(object):
+    def __init__(self, nfull=10000, ntiers=4, factor=10, ntier=None):
+        """
+        A fixed-memory history of (x, y) data points, with x increasing:
+        the most recent ``nfull`` points are kept at full resolution,
+        and every group of ``factor`` points (or buckets) of a tier is
+        summarized as a (x, min, max, mean) bucket in the next tier, up
+        to ``ntiers`` coarser tiers.
+
+        Tier ``k`` covers ``ntier * factor**k`` data-points, e.g. with
+        the defaults, 10000 points at full-rate and 1e8 points of min/
+        max/mean summary for less than 2MB.
+
+        Args:
+          * nfull (int) [optional]: the number of full-resolution points
+          * ntiers (int) [optional]: the number of coarser tiers
+          * factor (int) [optional]: the number of points (or buckets)
+            of a tier summarized in one bucket of the next tier
+          * ntier (int or None) [optional]: the number of buckets of the
+            coarser tiers, ``None`` for ``nfull``
+        """
+        self._factor = max(int(factor), 2)
+        ntier = nfull if ntier is None else ntier
+        self._params = dict(nfull=nfull, ntiers=ntiers, factor=factor,
+                            ntier=ntier)
+        # columns: x, min, max, mean
+        self._tiers = [_Tier(nfull, 4)]
+        self._tiers += [_Tier(ntier, 4) for i in range(int(ntiers))]
+        # incomplete groups waiting for the next tier
+        self._carry = [np.empty((0, 4)) for item in self._tiers]
+
+    @property
+    def ntiers(self):
+        """
+        The number of tiers, full-resolution included. Read-only.
+        """
+        return len(self._tiers)
+
+    @ntiers.setter
+    def ntiers(self, value):
+        print("Read-only.")
+
+    def __len__(self):
+        return len(self._tiers[0])
+
+    def empty_like(self):
+        """
+        Returns a new empty history with the same parameters
+        """
+        return TieredHistory(**self._params)
+
+    def append(self, x, y):
+        """
+        Appends the x and y data-points (scalars or 1-dim vectors)
+        """
+        x = np.atleast_1d(np.asarray(x, dtype=float))
+        y = np.atleast_1d(np.asarray(y, dtype=float))
+        rows = np.column_stack((x, y, y, y))
+        for ith, tier in enumerate(self._tiers):
+            tier.append(rows)
+            if ith == len(self._tiers) - 1:
+                break
+            rows = np.concatenate((self._carry[ith], rows))
+            cut = rows.shape[0] - rows.shape[0] % self._factor
+            self._carry[ith] = rows[cut:]
+            if cut == 0:
+                break
+            groups = rows[:cut].reshape((-1, self._factor, 4))
+            rows = np.column_stack((groups[:, 0, 0],
+                                    groups[:, :, 1].min(axis=1),
+                                    groups[:, :, 2].max(axis=1),
+                                    groups[:, :, 3].mean(axis=1)))
+
+    def tier(self, ith):
+        """
+        Returns the (x, min, max, mean) columns of the ``ith`` tier,
+        0 is full-resolution (min = max = mean)
+        """
+        data = self._tiers[int(ith)].data
+        return data[:, 0], data[:, 1], data[:, 2], data[:, 3]
+
+    def select(self, xmin=None, xmax=None, npts=2000):
+        """
+        Returns the index of the finest tier that covers the x-range
+        (xmin, xmax) with at most ``npts`` points or buckets in it, and
+        the slice of that range. ``None`` means unbounded.
+        """
+        for ith, tier in enumerate(self._tiers):
+            x = tier.data[:, 0]
+            if x.size == 0:
+                continue
+            last = ith == len(self._tiers) - 1
+            # this tier does not reach back to xmin
+            if xmin is not None and x[0] > xmin and not last:
+                continue
+            start = 0 if xmin is None else np.searchsorted(x, xmin)
+            end = x.size if xmax is None \
+                         else np.searchsorted(x, xmax, side='right')
+            # include the points just outside for continuous lines
+            sl = slice(int(max(start-1, 0)), int(min(end+1, x.size)))
+            if sl.stop - sl.start <= npts or last:
+                return ith, sl
+        return 0, slice(0, 0)
+
+    def view(self, xmin=None, xmax=None, npts=2000):
+        """
+        Returns the (x, y) vectors to draw the x-range (xmin, xmax) with
+        about ``npts`` points at most: the full-resolution points if
+        possible, else the min/max envelope of the matching tier
+        """
+        ith, sl = self.select(xmin=xmin, xmax=xmax, npts=npts//2)
+        x, ymin, ymax, ymean = self.tier(ith)
+        if ith == 0:
+            return x[sl], ymean[sl]
+        # interleave min and max for a vertical stroke per bucket
+        return np.repeat(x[sl], 2), \
+               np.column_stack((ymin[sl], ymax[sl])).ravel()
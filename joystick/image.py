@@ -36,12 +36,27 @@ from .colorbarmanager import ColorbarManager
 __all__ = ['Image']
 
 
+def _nearest(e0, e1, n, i0, i1, lo, hi):
+    """
+    Screen pixels [p0, p1) within [lo, hi] whose nearest data-pixel,
+    along an image of n pixels from screen coordinate e0 to e1, is in
+    [i0, i1), and these data-pixels
+    """
+    p = np.arange(int(np.floor(lo)), int(np.ceil(hi)))
+    idx = np.floor((p + 0.5 - e0)*n/(e1 - e0)).astype(int)
+    keep = np.flatnonzero((idx >= i0) & (idx < i1))
+    if keep.size == 0:
+        return 0, 0, idx[:0]
+    return p[keep[0]], p[keep[-1]] + 1, idx[keep[0]:keep[-1]+1]
+
+
 class Image(ColorbarManager, Frame):
     def __init__(self, name, freq_up=1, pos=(50, 50), size=(400, 400),
                  screen_relative=False, background="black", foreground='green',
                  cmap='gist_earth', vmin=None, vmax=None, unitperpx=1.,
                  axrect=(0.1, 0.1, 0.9, 0.9), grid=None, centerorig=True,
-                 cm_bounds=(None, None),
+                 cm_bounds=(None, None), autoscale='exact', nsample=10000,
+                 percentiles=(1., 99.), smoothing=0., ctol=0.,
                  **kwargs):
         """
         Initialises an image-frame.
@@ -70,9 +85,26 @@ class Image(ColorbarManager, Frame):
           * vmax (float or None): the value corresponding to the max of
             the colorbar, or ``None`` for auto-scaling
           * cm_bounds: DEPRECATED
+          * autoscale (str) [optional]: the policy to auto-scale the
+            colorbar (``vmin`` or ``vmax`` being ``None``), in
+            ``core.AUTOSCALE_POLICIES``: ``'exact'`` min/max of the
+            image, ``'subsample'`` min/max of a strided subsample of
+            about ``nsample`` pixels, ``'percentile'`` ``percentiles``
+            of such subsample, robust to hot pixels
+          * nsample (int) [optional]: the number of pixels of the
+            subsample
+          * percentiles (tuple of 2 floats) [optional]: the (low, high)
+            percentiles of the ``'percentile'`` policy
+          * smoothing (float) [optional]: in [0, 1], the weight of the
+            previous bounds when auto-scaling, for smooth changes
+          * ctol (float) [optional]: the relative change of the
+            auto-scaled bounds below which they are not re-applied
 
         Kwargs:
           * aspect: see ``plt.imshow``, default 'auto'
+          * render (str): ``'thread'`` or ``'process'`` to rasterize the
+            figure in a background thread or in a worker process, see
+            :py:class:`~joystick.frame.Frame`
           * origin: see ``plt.imshow``, default 'lower'
           * Any non-abbreviated parameter accepted by ``figure.add_axes``
             and ``plt.imshow``
@@ -93,6 +125,11 @@ class Image(ColorbarManager, Frame):
         kwargs['axrect'] = axrect
         kwargs['grid'] = grid
         kwargs['centerorig'] = centerorig
+        kwargs['autoscale'] = autoscale
+        kwargs['nsample'] = nsample
+        kwargs['percentiles'] = percentiles
+        kwargs['smoothing'] = smoothing
+        kwargs['ctol'] = ctol
         self._kwargs = kwargs
         # call mummy init
         super(Image, self).__init__(**self._kwargs)
@@ -107,6 +144,9 @@ class Image(ColorbarManager, Frame):
         before, after = self._extract_callit('init')
         self._callmthd(before, **kwargs)
         self._everset = False
+        # regions updated in place since the last drawing
+        self._regions = []
+        self._needs_full = True
         axrect = tuple(kwargs.pop('axrect')[:4])
         self._fig = core.mat.figure.Figure()
         self.ax = self._fig.add_axes(axrect[:2] + (axrect[2]-axrect[0],
@@ -114,6 +154,7 @@ class Image(ColorbarManager, Frame):
                                      **core.axkwargs(kwargs))
         self._canvas = FigureCanvasTkAgg(self._fig, master=self._window)
         self._canvas.show()
+        self._init_renderer()
         self._canvas.get_tk_widget().pack(side=tkinter.TOP,
                                           fill=tkinter.BOTH,
                                           expand=True)
@@ -123,8 +164,14 @@ class Image(ColorbarManager, Frame):
         grid = kwargs.pop('grid')
         if grid not in [None, False]:
             self.ax.grid(color=grid, lw=1)
-        self.reset_image(data=[[0, 0],[0, 0]], **kwargs)
+        self.reset_image(data=self._initial_data(), **kwargs)
         self._callmthd(after, **kwargs)
+
+    def _initial_data(self):
+        """
+        The data the image is created with
+        """
+        return [[0, 0],[0, 0]]
     
     @property
     def cm_bounds(self):
@@ -156,6 +203,10 @@ class Image(ColorbarManager, Frame):
             extent = [-extent[1], extent[1], -extent[0], extent[0]]
         else:
             extent = None
+        # replaces the image, not stacks another one
+        if getattr(self, '_plot', None) is not None \
+                and self._plot.axes is self.ax:
+            self._plot.remove()
         self._plot = self.ax.imshow(data, cmap=self._cmap, norm=self._norm,
                                     origin=kwargs.get('origin', 'lower'),
                                     aspect=kwargs.get('aspect', 'auto'),
@@ -164,6 +215,7 @@ class Image(ColorbarManager, Frame):
                                     extent=extent, **core.linekwargs(kwargs))
         self._reset_colorbar(**kwargs)
         self._everset = True
+        self._needs_full = True
 
     def reinit(self, **kwargs):
         """
@@ -179,13 +231,136 @@ class Image(ColorbarManager, Frame):
         # ya own reinit
         self._init_base(**self._kwargs)
 
+    @core.locked
     def show(self):
         """
-        Updates the image
+        Updates the image. Only the regions updated with
+        :py:func:`~joystick.image.Image.update_region` are re-drawn if
+        nothing else changed since the last update
         """
-        if self.visible:
-            self._canvas.draw()
+        if not self.visible:
+            return
+        if self._needs_full or not self._regions \
+                or self._renderer is not None \
+                or not hasattr(self._canvas, 'blit') \
+                or not self._regions_drawable():
+            self._draw()
+        else:
+            self._draw_regions()
+        self._needs_full = False
+        self._regions = []
+
+    def _update_scalarmappable(self):
+        """
+        New colorbar bounds or colormap, the whole image is re-drawn
+        """
+        self._needs_full = True
+        super(Image, self)._update_scalarmappable()
+
+    @core.locked
+    def update_region(self, row, col, block):
+        """
+        Writes the 2d-array block in the image, in place, with its first
+        element at index (row, col) of the image (the block is cut if it
+        overflows the image). At the next update, only the pixels of the
+        block are colormapped and copied to the screen, unless the
+        whole image must be re-drawn (e.g. new colorbar bounds)
+        """
+        if not (self.visible and self._everset):
+            return
+        block = np.asarray(block)
+        data = self._plot.get_array()
+        r0, c0 = max(int(row), 0), max(int(col), 0)
+        r1 = min(int(row) + block.shape[0], data.shape[0])
+        c1 = min(int(col) + block.shape[1], data.shape[1])
+        if r1 <= r0 or c1 <= c0:
+            return
+        data[r0:r1, c0:c1] = block[r0-int(row):r1-int(row),
+                                   c0-int(col):c1-int(col)]
+        self._plot.stale = True
+        self._regions.append((r0, r1, c0, c1))
+
+    def _regions_drawable(self):
+        """
+        Whether the updated regions can be written alone in the last
+        drawing: the image is opaque, only the grid lines and the spines
+        are drawn over it, and a full drawing would resample it to the
+        nearest pixel too (no antialiasing when it is shrunk or
+        slightly magnified)
+        """
+        if self._plot.get_alpha() is not None:
+            return False
+        ax = self.ax
+        if ax.lines or ax.patches or ax.collections or ax.texts \
+                or ax.artists or ax.tables or len(ax.images) != 1 \
+                or ax.get_legend() is not None:
+            return False
+        interp = self._plot.get_interpolation()
+        if interp in ['nearest', 'none']:
+            return True
+        if interp not in ['antialiased', 'auto']:
+            return False
+        # matplotlib keeps the nearest pixel when the image is magnified
+        # by more than 3, or exactly by 1 or 2
+        data = self._plot.get_array()
+        left, right, bottom, top = self._plot.get_extent()
+        (x0, y0), (x1, y1) = self.ax.transData.transform([(left, bottom),
+                                                          (right, top)])
+        for disp, n in [(abs(x1 - x0), data.shape[1]),
+                        (abs(y1 - y0), data.shape[0])]:
+            if not (disp > 3*n or disp == n or disp == 2*n):
+                return False
+        return True
+
+    def _draw_regions(self):
+        """
+        Colormaps the updated regions only, writes them in the last
+        drawing of the figure (nearest pixel) and copies them to the
+        screen
+        """
+        buf = np.asarray(self._canvas.buffer_rgba())
+        height = buf.shape[0]
+        data = self._plot.get_array()
+        nrows, ncols = data.shape[:2]
+        # display coordinates of the image edges
+        left, right, bottom, top = self._plot.get_extent()
+        if self._plot.origin != 'lower':
+            bottom, top = top, bottom
+        (x0, y0), (x1, y1) = self.ax.transData.transform([(left, bottom),
+                                                          (right, top)])
+        ax0, ay0, ax1, ay1 = self.ax.bbox.extents
+        bg = np.array(core.mat.colors.to_rgba(self.ax.get_facecolor()))*255
+        bboxes = []
+        for r0, r1, c0, c1 in self._regions:
+            px0, px1, cols = _nearest(x0, x1, ncols, c0, c1, ax0, ax1)
+            py0, py1, rows = _nearest(y0, y1, nrows, r0, r1, ay0, ay1)
+            if px1 <= px0 or py1 <= py0:
+                continue
+            rgba = self._plot.to_rgba(data[r0:r1, c0:c1], bytes=True)
+            rgba = rgba[rows - r0][:, cols - c0].astype(float)
+            # bad values are transparent, over the axes background
+            alpha = rgba[..., 3:]/255.
+            rgba = rgba*alpha + bg*(1 - alpha)
+            # screen y goes up, buffer rows go down
+            buf[height-py1:height-py0, px0:px1] = rgba[::-1]
+            bboxes.append(core.mat.transforms.Bbox.from_extents(
+                                                    px0, py0, px1, py1))
+        # the grid and the spines are over the image: drawn again,
+        # they must not darken their antialiased edges out of the regions
+        saved = buf.copy()
+        for artist in self.ax.get_xgridlines() + self.ax.get_ygridlines() \
+                + list(self.ax.spines.values()):
+            if artist.get_visible():
+                self.ax.draw_artist(artist)
+        for bbox in bboxes:
+            px0, py0, px1, py1 = bbox.extents.astype(int)
+            saved[height-py1:height-py0, px0:px1] = \
+                buf[height-py1:height-py0, px0:px1]
+        buf[...] = saved
+        for bbox in bboxes:
+            self._canvas.blit(bbox)
 
+    @core.locked
     def set_data(self, data):
         """
         Sets the image. If the data shape does not corerspond to the
@@ -198,6 +373,7 @@ class Image(ColorbarManager, Frame):
             else:
                 if not np.allclose(old_data, data):
                     self._plot.set_data(data)
+                    self._needs_full = True
 
     def get_data(self):
         """
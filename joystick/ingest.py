@@ -0,0 +1,359 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+###############################################################################
+#  
+#  JOYSTICK - Real-time plotting and logging while console controlling
+#  Copyright (C) 2016  Guillaume Schworer
+#  
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#  
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#  
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#  
+#  For any information, bug report, idea, donation, hug, beer, please contact
+#    guillaume.schworer@gmail.com
+#
+###############################################################################
+
+import errno
+import socket
+import struct
+import select
+from threading import Thread
+import traceback
+
+from . import core
+np = core.np
+
+
+__all__ = ['IngestServer', 'IngestClient', 'encode_array']
+
+
+# magic, dtype code, unused, channel, count
+HEADER = struct.Struct('<2sBBHI')
+
+MAGIC = b'JK'
+
+
+def encode_array(channel, data):
+    """
+    Returns the bytes of the message carrying the 1-dim array ``data``
+    on ``channel``, as understood by
+    :py:class:`~joystick.ingest.IngestServer`: a 10-byte little-endian
+    header (b'JK', dtype code as in
+    :py:data:`~joystick.core.INGEST_DTYPES`, 0, channel id as uint16,
+    element count as uint32) followed by the raw array bytes
+    """
+    data = np.ascontiguousarray(data).ravel()
+    dtype = data.dtype.newbyteorder('<').str[1:]
+    if dtype not in core.INGEST_DTYPES:
+        raise ValueError("dtype shall be in {}".format(core.INGEST_DTYPES))
+    return HEADER.pack(MAGIC, core.INGEST_DTYPES.index(dtype), 0,
+                       int(channel), data.size) \
+           + data.astype('<' + dtype, copy=False).tobytes()
+
+
+class IngestClient(object):
+    def __init__(self, host='127.0.0.1', port=None, udp=False):
+        """
+        Sends arrays to a :py:class:`~joystick.ingest.IngestServer`
+
+        Args:
+          * host (str) [optional]: the address of the server
+          * port (int): the port of the server
+          * udp (bool) [optional]: if ``True``, sends datagrams
+        """
+        self._addr = (host, int(port))
+        self._udp = bool(udp)
+        if self._udp:
+            self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        else:
+            self._sock = socket.create_connection(self._addr)
+            self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def send(self, channel, data):
+        """
+        Sends the 1-dim array ``data`` on ``channel``
+        """
+        msg = encode_array(channel, data)
+        if self._udp:
+            self._sock.sendto(msg, self._addr)
+        else:
+            self._sock.sendall(msg)
+
+    def close(self):
+        """
+        Closes the connection
+        """
+        self._sock.close()
+
+
+class _Connection(object):
+    """
+    The receiving buffer of a connection
+    """
+    def __init__(self, sock, bufsize):
+        self.sock = sock
+        self.buf = bytearray(bufsize)
+        self.view = memoryview(self.buf)
+        self.size = 0
+
+    def grow(self, total):
+        """
+        Reallocates the buffer for a message of total bytes; arrays
+        already delivered may still look at the old one
+        """
+        buf = bytearray(max(total, 2*len(self.buf)))
+        buf[:self.size] = self.view[:self.size]
+        self.buf = buf
+        self.view = memoryview(self.buf)
+
+
+class IngestServer(object):
+    def __init__(self, host='127.0.0.1', port=0, udp=False,
+                 bufsize=1048576, timeout=0.1, rcvbuf=None):
+        """
+        A local server receiving numeric arrays from remote producers,
+        to feed them into frames of a running joystick.
+
+        Each message is made of a header (channel id, dtype and count)
+        followed by the raw array bytes, see
+        :py:func:`~joystick.ingest.encode_array` and
+        :py:class:`~joystick.ingest.IngestClient`. Arrays are decoded
+        without copy with ``np.frombuffer``, and all arrays received in
+        a single read on a same channel are delivered as one batch to
+        the callback registered with
+        :py:func:`~joystick.ingest.IngestServer.register`.
+
+        The array given to the callback looks into the receiving buffer
+        and is only valid during the callback: copy it to keep it (e.g.
+        :py:func:`~joystick.core.add_datapoint` already does).
+
+        Args:
+          * host (str) [optional]: the address to listen on
+          * port (int) [optional]: the port to listen on, 0 to pick a
+            free one, see :py:func:`~joystick.ingest.IngestServer.address`
+          * udp (bool) [optional]: if ``True``, receives datagrams
+            instead of TCP connections
+          * bufsize (int) [optional]: initial size of the receiving
+            buffer of each connection; with ``udp``, the size of the
+            buffer the pending datagrams are read into (at least 64kB)
+          * timeout (float) [optional]: the polling timeout of the
+            serving thread (sec)
+          * rcvbuf (int or None) [optional]: the size of the kernel
+            receiving buffer of the socket (``SO_RCVBUF``), ``None`` to
+            keep the OS default
+        """
+        self._udp = bool(udp)
+        self._bufsize = int(bufsize)
+        self.timeout = float(timeout)
+        self._callbacks = {}
+        self._conns = {}
+        self._running = False
+        self._thread = None
+        if self._udp:
+            self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            # datagrams of a batch are read one after the other
+            self._udpbuf = bytearray(max(self._bufsize, 2*65536))
+            self._udpview = memoryview(self._udpbuf)
+        else:
+            self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if rcvbuf is not None:
+            self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF,
+                                  int(rcvbuf))
+        self._sock.bind((host, int(port)))
+        if not self._udp:
+            self._sock.listen(8)
+        self._sock.setblocking(False)
+        self.nerrors = 0
+
+    @property
+    def address(self):
+        """
+        The (host, port) the server listens on. Read-only.
+        """
+        return self._sock.getsockname()
+
+    @address.setter
+    def address(self, value):
+        print("Read-only.")
+
+    @property
+    def running(self):
+        """
+        Returns ``True`` if the serving thread is running. Read-only.
+        """
+        return self._running
+
+    @running.setter
+    def running(self, value):
+        print("Read-only.")
+
+    def register(self, channel, callback):
+        """
+        Registers ``callback`` to be called with the arrays received on
+        ``channel``. Use ``None`` as channel to receive all channels
+        without a dedicated callback, in which case the callback is
+        called as ``callback(channel, data)``
+        """
+        self._callbacks[channel if channel is None else int(channel)] = \
+                                                                callback
+
+    def _dispatch(self, batches):
+        for channel, arrays in batches.items():
+            data = arrays[0] if len(arrays) == 1 else np.concatenate(arrays)
+            try:
+                if channel in self._callbacks:
+                    self._callbacks[channel](data)
+                elif None in self._callbacks:
+                    self._callbacks[None](channel, data)
+            except Exception:
+                traceback.print_exc()
+
+    def _decode(self, buf, size):
+        """
+        Decodes all complete messages of buf[:size].
+        Returns the {channel: [arrays]} batches and the number of bytes
+        consumed, or -1 for the latter if the stream is corrupted
+        """
+        batches = {}
+        pos = 0
+        while size - pos >= HEADER.size:
+            magic, code, _, channel, count = HEADER.unpack_from(buf, pos)
+            if magic != MAGIC or code >= len(core.INGEST_DTYPES):
+                self.nerrors += 1
+                return batches, -1
+            dtype = np.dtype('<' + core.INGEST_DTYPES[code])
+            total = HEADER.size + count*dtype.itemsize
+            if size - pos < total:
+                break
+            batches.setdefault(channel, []).append(
+                np.frombuffer(buf, dtype=dtype, count=count,
+                              offset=pos+HEADER.size))
+            pos += total
+        return batches, pos
+
+    def _read_tcp(self, conn):
+        """
+        Reads all available bytes of a connection, delivers the
+        complete messages. Returns ``False`` if the connection is over
+        """
+        nbytes = conn.sock.recv_into(conn.view[conn.size:])
+        if nbytes == 0:
+            return False
+        conn.size += nbytes
+        batches, pos = self._decode(conn.buf, conn.size)
+        if pos < 0:
+            return False
+        self._dispatch(batches)
+        # keep the incomplete message at the start of the buffer
+        conn.size -= pos
+        if pos > 0 and conn.size > 0:
+            conn.buf[:conn.size] = bytes(conn.view[pos:pos+conn.size])
+        # make room for a message larger than the buffer
+        total = len(conn.buf) + 1
+        if conn.size >= HEADER.size:
+            _, code, _, _, count = HEADER.unpack_from(conn.buf, 0)
+            total = HEADER.size + count \
+                        * np.dtype(core.INGEST_DTYPES[code]).itemsize
+        if total > len(conn.buf):
+            conn.grow(total)
+        return True
+
+    def _read_udp(self):
+        """
+        Reads all pending datagrams, delivers their messages in batches
+        """
+        view = self._udpview
+        pending = True
+        while pending:
+            batches = {}
+            size = 0
+            # room for the largest datagram
+            while size + 65536 <= len(view):
+                try:
+                    nbytes = self._sock.recv_into(view[size:])
+                except socket.error as e:
+                    if e.args[0] not in (errno.EAGAIN, errno.EWOULDBLOCK):
+                        raise
+                    pending = False
+                    break
+                new, pos = self._decode(view[size:size+nbytes], nbytes)
+                for channel, arrays in new.items():
+                    batches.setdefault(channel, []).extend(arrays)
+                size += nbytes
+            self._dispatch(batches)
+
+    def _close(self, sock):
+        self._conns.pop(sock.fileno(), None)
+        sock.close()
+
+    def _serve(self):
+        """
+        The function looping in the serving thread
+        """
+        while self._running:
+            socks = [self._sock] + [item.sock for item
+                                    in self._conns.values()]
+            try:
+                ready = select.select(socks, [], [], self.timeout)[0]
+            except (OSError, select.error, ValueError):
+                continue  # a socket was closed meanwhile
+            for sock in ready:
+                if sock is self._sock and not self._udp:
+                    newsock = self._sock.accept()[0]
+                    newsock.setblocking(False)
+                    self._conns[newsock.fileno()] = _Connection(newsock,
+                                                            self._bufsize)
+                elif self._udp:
+                    try:
+                        self._read_udp()
+                    except socket.error:
+                        pass
+                else:
+                    conn = self._conns.get(sock.fileno())
+                    try:
+                        alive = self._read_tcp(conn)
+                    except socket.error:
+                        alive = False
+                    if not alive:
+                        self._close(sock)
+
+    def start(self):
+        """
+        Starts serving in a daemon-thread, if not already running
+        """
+        if self._running:
+            return
+        self._running = True
+        self._thread = Thread(target=self._serve)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stops serving, keeps the connections open
+        """
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(2*self.timeout)
+            self._thread = None
+
+    def close(self):
+        """
+        Stops serving and closes all sockets
+        """
+        self.stop()
+        for conn in list(self._conns.values()):
+            self._close(conn.sock)
+        self._sock.close()
@@ -45,11 +45,15 @@ class Joystick(object):
         self._callmthd(before, **kwargs)
         self._dead = False
         self._frames = []
+        self._process_loops = []
+        self._async_tasks = []
         self._running = False
         self._callmthd(after, **kwargs)
 
     _extract_callit = core.extract_callit
     _get_infinite_loop_fcts = core.get_infinite_loop_fcts
+    _get_process_loop_fcts = core.get_process_loop_fcts
+    _get_async_loop_fcts = core.get_async_loop_fcts
     _callmthd = core.callmthd
 
     @property
@@ -98,10 +102,32 @@ class Joystick(object):
         self._callmthd(before, **kwargs)
         # start the functions with infinite loop decorator
         self._callmthd(self._get_infinite_loop_fcts(), **kwargs)
+        # start the child processes with process loop decorator
+        self._callmthd(self._get_process_loop_fcts(), **kwargs)
+        # schedule the coroutines with async loop decorator
+        self._callmthd(self._get_async_loop_fcts(), **kwargs)
         self._push_running_to_all_frames()
         self.start_frames()
         self._callmthd(after, **kwargs)
 
+    def _stop_process_loops(self):
+        """
+        Stops all child processes launched by the functions decorated
+        with :py:func:`~joystick.deco.deco_process_loop`
+        """
+        for item in self._process_loops:
+            item.stop()
+        self._process_loops = []
+
+    def _cancel_async_loops(self):
+        """
+        Cancels all coroutines scheduled by the methods decorated
+        with :py:func:`~joystick.deco.deco_async_loop`
+        """
+        for item in self._async_tasks:
+            item.cancel()
+        self._async_tasks = []
+
     def start_frames(self):
         """
         Turns on the updating of all frames, keeps the simulation
@@ -123,6 +149,8 @@ class Joystick(object):
         before, after = self._extract_callit('stop')
         self._callmthd(before, **kwargs)
         self._push_running_to_all_frames()
+        self._stop_process_loops()
+        self._cancel_async_loops()
         self._callmthd(after, **kwargs)
 
     def stop_frames(self):
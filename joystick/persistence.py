@@ -0,0 +1,207 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+###############################################################################
+#  
+#  JOYSTICK - Real-time plotting and logging while console controlling
+#  Copyright (C) 2016  Guillaume Schworer
+#  
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#  
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#  
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#  
+#  For any information, bug report, idea, donation, hug, beer, please contact
+#    guillaume.schworer@gmail.com
+#
+###############################################################################
+
+from . import core
+np = core.np
+time = core.time
+from .image import Image
+
+
+__all__ = ['Persistence']
+
+
+class Persistence(Image):
+    def __init__(self, name, freq_up=1, pos=(50, 50), size=(400, 400),
+                 screen_relative=False, nrows=200, ncols=400,
+                 xrange=(0., 1.), yrange=(-1., 1.), decay=None, log=False,
+                 cmap='inferno', vmin=None, vmax=None,
+                 axrect=(0.1, 0.1, 0.9, 0.9), grid=None, **kwargs):
+        """
+        Initialises a persistence-frame, like the phosphor of an analog
+        oscilloscope: sweeps (e.g. from a
+        :py:class:`~joystick.trigger.Trigger`) pushed with
+        :py:func:`~joystick.persistence.Persistence.add_sweeps` are
+        rasterized into a 2d hit-count image, which optionally fades
+        with time. The cost of a display update does not depend on the
+        number of sweeps accumulated.
+
+        Args:
+          * name (str): the frame name
+          * freq_up (float or None): the frequency of update of the frame,
+            between 1e-3 and 1e3 Hz, or ``None`` for no update
+          * pos (px or %) [optional]: left-top corner position of the
+            frame, see ``screen_relative``
+          * size (px or %) [optional]: width-height dimension of the
+            frame, see ``screen_relative``
+          * screen_relative (bool) [optional]: set to ``True`` to give
+            ``pos`` and ``size`` as a % of the screen size, or ``False``
+            to give then as pixels
+          * nrows (int) [optional]: the number of pixels along y
+          * ncols (int) [optional]: the number of pixels along x
+          * xrange (tuple of 2 floats) [optional]: the x-values of the
+            first and last samples of the sweeps, e.g. the first and
+            last elements of :py:func:`~joystick.trigger.Trigger.time`
+          * yrange (tuple of 2 floats) [optional]: the (min, max) y-values
+            displayed, values outside are clipped
+          * decay (float or None) [optional]: if not ``None``, the
+            half-life (seconds) of the hit-counts
+          * log (bool) [optional]: if ``True``, shows log(1 + counts)
+          * cmap (str or colormap): the colormap of the image
+          * vmin (float or None): the value corresponding to the min of
+            the colorbar, or ``None`` for auto-scaling
+          * vmax (float or None): the value corresponding to the max of
+            the colorbar, or ``None`` for auto-scaling
+          * axrect (list of 4 floats) [optional]: the axes bounds (l,b,w,h)
+            as in ``plt.figure.add_axes(rect=(l,b,w,h))``
+          * grid (color or None) [optional]: the grid color, or no grid
+            if ``None``
+
+        Kwargs:
+          * See :py:class:`~joystick.image.Image`
+        """
+        kwargs['nrows'] = nrows
+        kwargs['ncols'] = ncols
+        kwargs['xrange'] = xrange
+        kwargs['yrange'] = yrange
+        kwargs['decay'] = decay
+        kwargs['log'] = log
+        super(Persistence, self).__init__(name=name, freq_up=freq_up,
+                 pos=pos, size=size, screen_relative=screen_relative,
+                 cmap=cmap, vmin=vmin, vmax=vmax, axrect=axrect, grid=grid,
+                 centerorig=False, **kwargs)
+        self._preupdate_fcts.insert(0, '_push_counts')
+
+    def _init_base(self, **kwargs):
+        """
+        Separate function from __init__ for re-initialization purpose
+        """
+        shape = (int(kwargs.get('nrows')), int(kwargs.get('ncols')))
+        # keep the counts on reinit if the shape did not change
+        if getattr(self, '_counts', None) is None \
+                or self._counts.shape != shape:
+            self._counts = np.zeros(shape)
+            self._nsweeps = 0
+        self._xrange = tuple(map(float, kwargs.get('xrange')[:2]))
+        self._yrange = tuple(map(float, kwargs.get('yrange')[:2]))
+        decay = kwargs.get('decay')
+        self._decay = None if decay is None else float(decay)
+        self._log = bool(kwargs.get('log'))
+        self._tlast = time.time()
+        self._dirty = True
+        super(Persistence, self)._init_base(**kwargs)
+        self._plot.set_extent(self._xrange + self._yrange)
+        self._push_counts()
+
+    def _initial_data(self):
+        return self._counts
+
+    @property
+    def nsweeps(self):
+        """
+        The number of sweeps accumulated since the last clear.
+        Read-only.
+        """
+        return self._nsweeps
+
+    @nsweeps.setter
+    def nsweeps(self, value):
+        print("Read-only.")
+
+    def _apply_decay(self):
+        if self._decay is None:
+            return
+        t = time.time()
+        self._counts *= 0.5**((t - self._tlast)/self._decay)
+        self._tlast = t
+
+    def add_sweeps(self, sweeps):
+        """
+        Accumulates one sweep (1d-vector) or several sweeps (2d-array of
+        shape (n, npts)) into the hit-counts. The samples of a sweep are
+        spread evenly over ``xrange``, each line segment between two
+        consecutive samples lights the pixels it crosses
+        """
+        sweeps = np.asarray(sweeps, dtype=float)
+        if sweeps.ndim == 1:
+            sweeps = sweeps[None, :]
+        nsw, npts = sweeps.shape
+        if nsw == 0 or npts < 2:
+            return
+        nrows, ncols = self._counts.shape
+        if npts <= ncols:
+            # linear interpolation to one segment per column
+            pos = np.linspace(0, npts - 1, ncols + 1)
+            i0 = np.minimum(pos.astype(int), npts - 2)
+            frac = pos - i0
+            sweeps = sweeps[:, i0]*(1 - frac) + sweeps[:, i0+1]*frac
+            npts = ncols + 1
+        ymin, ymax = self._yrange
+        rows = np.clip(((sweeps - ymin)*(nrows/(ymax - ymin))).astype(int),
+                       0, nrows - 1)
+        # each segment lights a vertical run of pixels in one column
+        r0 = np.minimum(rows[:, :-1], rows[:, 1:])
+        r1 = np.maximum(rows[:, :-1], rows[:, 1:])
+        cols = np.broadcast_to((np.arange(npts - 1)*ncols)//(npts - 1),
+                               r0.shape)
+        # runs as +1/-1 steps of a difference image, integrated along y
+        stride = nrows + 1
+        steps = np.bincount(np.r_[(cols*stride + r0).ravel(),
+                                  (cols*stride + r1 + 1).ravel()],
+                            weights=np.r_[np.ones(r0.size),
+                                          -np.ones(r0.size)],
+                            minlength=ncols*stride)
+        hits = np.cumsum(steps.reshape(ncols, stride), axis=1)[:, :nrows]
+        self._apply_decay()
+        self._counts += hits.T
+        self._nsweeps += nsw
+        self._dirty = True
+
+    def clear(self):
+        """
+        Resets all hit-counts to zero
+        """
+        self._counts[:] = 0
+        self._nsweeps = 0
+        self._dirty = True
+
+    def _push_counts(self):
+        """
+        Sets the hit-counts to the image, once per update
+        """
+        if not self.visible or not (self._dirty or self._decay is not None):
+            return
+        self._apply_decay()
+        self._plot.set_data(np.log1p(self._counts) if self._log
+                            else self._counts)
+        self._needs_full = True
+        self._dirty = False
+
+    def set_data(self, data):
+        """
+        Sets the hit-counts
+        """
+        self._counts[:] = data
+        self._dirty = True
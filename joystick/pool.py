@@ -0,0 +1,236 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+###############################################################################
+#  
+#  JOYSTICK - Real-time plotting and logging while console controlling
+#  Copyright (C) 2016  Guillaume Schworer
+#  
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#  
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#  
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#  
+#  For any information, bug report, idea, donation, hug, beer, please contact
+#    guillaume.schworer@gmail.com
+#
+###############################################################################
+
+from threading import Thread, Lock
+import traceback
+try:
+    import Queue as queue
+except ImportError:
+    import queue
+try:
+    from concurrent.futures import Future
+except ImportError:  # python 2 without the 'futures' backport
+    Future = None
+
+from . import core
+
+
+__all__ = ['ThreadPool', 'PoolFull', 'get_thread_pool', 'set_thread_pool']
+
+
+class PoolFull(Exception):
+    """
+    Raised when submitting a job to a full
+    :py:class:`~joystick.pool.ThreadPool` whose policy is ``'reject'``
+    """
+    pass
+
+
+class ThreadPool(object):
+    def __init__(self, max_workers=core.POOL_MAX_WORKERS,
+                 max_queue=core.POOL_MAX_QUEUE, policy='block'):
+        """
+        A pool of daemon-threads with a bounded submission queue.
+        Threads are only created when jobs are submitted, up to
+        ``max_workers``.
+
+        Args:
+          * max_workers (int) [optional]: the maximum number of threads
+          * max_queue (int or None) [optional]: the maximum number of
+            jobs waiting for a free thread, ``None`` for no limit
+          * policy (str) [optional]: what to do when submitting a job
+            to a full queue, see :py:data:`~joystick.core.POOL_POLICIES`:
+            ``'block'`` waits for some room, ``'drop'`` returns an
+            already cancelled future, ``'reject'`` raises
+            :py:class:`~joystick.pool.PoolFull`
+        """
+        if Future is None:
+            raise ImportError("ThreadPool requires concurrent.futures, "\
+                              "try 'pip install futures'")
+        self._max_workers = max(int(max_workers), 1)
+        self._queue = queue.Queue(maxsize=0 if max_queue is None\
+                                            else max(int(max_queue), 1))
+        self.policy = policy
+        self._threads = []
+        self._lock = Lock()
+        self._shutdown = False
+
+    @property
+    def policy(self):
+        """
+        The full-queue policy, see
+        :py:data:`~joystick.core.POOL_POLICIES`
+        """
+        return self._policy
+
+    @policy.setter
+    def policy(self, value):
+        value = str(value).lower()
+        if value not in core.POOL_POLICIES:
+            raise ValueError("'policy' parameter shall be in " \
+                             " {}".format(core.POOL_POLICIES))
+        self._policy = value
+
+    @property
+    def max_workers(self):
+        """
+        The maximum number of threads. Read-only.
+        """
+        return self._max_workers
+
+    @max_workers.setter
+    def max_workers(self, value):
+        print("Read-only.")
+
+    @property
+    def pending(self):
+        """
+        The number of jobs waiting for a free thread. Read-only.
+        """
+        return self._queue.qsize()
+
+    @pending.setter
+    def pending(self, value):
+        print("Read-only.")
+
+    def submit(self, func, *args, **kwargs):
+        """
+        Schedules ``func(*args, **kwargs)`` and returns a
+        ``concurrent.futures.Future`` to wait on or cancel the job
+        """
+        return self._submit(func, args, kwargs)
+
+    def _submit(self, func, args=(), kwargs=None, policy=None):
+        if self._shutdown:
+            raise RuntimeError("Cannot submit to a shut down pool")
+        policy = self.policy if policy is None else str(policy).lower()
+        if policy not in core.POOL_POLICIES:
+            raise ValueError("'policy' parameter shall be in " \
+                             " {}".format(core.POOL_POLICIES))
+        fut = Future()
+        item = (fut, func, args, {} if kwargs is None else kwargs)
+        if policy == 'block':
+            self._queue.put(item)
+        else:
+            try:
+                self._queue.put_nowait(item)
+            except queue.Full:
+                if policy == 'reject':
+                    raise PoolFull("Thread pool queue is full "\
+                                   "({:d} jobs)".format(self._queue.maxsize))
+                fut.cancel()
+                fut.set_running_or_notify_cancel()
+                return fut
+        self._spawn_worker()
+        return fut
+
+    def _spawn_worker(self):
+        """
+        Starts a new thread if all existing ones are busy and the
+        maximum is not reached yet
+        """
+        with self._lock:
+            if len(self._threads) >= self._max_workers:
+                return
+            if self._queue.qsize() == 0 and len(self._threads) > 0:
+                return
+            loopy = Thread(target=self._work)
+            loopy.daemon = True
+            loopy.start()
+            self._threads.append(loopy)
+
+    def _work(self):
+        """
+        The function looping in each thread of the pool
+        """
+        while True:
+            try:
+                item = self._queue.get(timeout=0.1)
+            except queue.Empty:
+                if self._shutdown:  # all submitted jobs are done
+                    return
+                continue
+            if item is None:  # shutdown sentinel
+                return
+            fut, func, args, kwargs = item
+            if not fut.set_running_or_notify_cancel():
+                continue
+            try:
+                fut.set_result(func(*args, **kwargs))
+            except BaseException as e:
+                # same console feedback as with bare threads
+                traceback.print_exc()
+                fut.set_exception(e)
+
+    def shutdown(self, wait=True):
+        """
+        Stops all threads of the pool once the jobs already submitted
+        are done. Waits for them if ``wait`` is ``True``
+        """
+        with self._lock:
+            self._shutdown = True
+            threads = list(self._threads)
+        # the threads also stop by themselves once the queue is empty,
+        # sentinels only speed it up and must not block on a full queue
+        for item in threads:
+            try:
+                self._queue.put_nowait(None)
+            except queue.Full:
+                break
+        if wait:
+            for item in threads:
+                item.join()
+
+
+_THREAD_POOL = None
+
+
+def get_thread_pool():
+    """
+    Returns the pool shared by all functions decorated with
+    :py:func:`~joystick.deco.deco_thread_it`, creates it if needed
+    """
+    global _THREAD_POOL
+    if _THREAD_POOL is None:
+        _THREAD_POOL = ThreadPool()
+    return _THREAD_POOL
+
+
+def set_thread_pool(max_workers=core.POOL_MAX_WORKERS,
+                    max_queue=core.POOL_MAX_QUEUE, policy='block'):
+    """
+    Replaces the pool shared by all functions decorated with
+    :py:func:`~joystick.deco.deco_thread_it`. Jobs already submitted
+    to the previous pool will still complete.
+    See :py:class:`~joystick.pool.ThreadPool` for the parameters.
+    """
+    global _THREAD_POOL
+    old = _THREAD_POOL
+    _THREAD_POOL = ThreadPool(max_workers=max_workers, max_queue=max_queue,
+                              policy=policy)
+    if old is not None:
+        old.shutdown(wait=False)
+    return _THREAD_POOL
@@ -0,0 +1,189 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+###############################################################################
+#  
+#  JOYSTICK - Real-time plotting and logging while console controlling
+#  Copyright (C) 2016  Guillaume Schworer
+#  
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#  
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#  
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#  
+#  For any information, bug report, idea, donation, hug, beer, please contact
+#    guillaume.schworer@gmail.com
+#
+###############################################################################
+
+import multiprocessing
+from threading import Thread
+import traceback
+try:
+    import Queue as queue
+except ImportError:
+    import queue
+
+from . import core
+np = core.np
+
+
+__all__ = ['ProcessLoop']
+
+
+def _child_loop(target, raw, dtype, shape, nslots, wait_time, free, ready,
+                stop):
+    """
+    The looping function, runs in the child process
+    """
+    # the decorated function, not its wrapper
+    func = getattr(getattr(target[0], target[1]), '_process_target')
+    bufs = np.frombuffer(raw, dtype=dtype).reshape((nslots,) + shape)
+    try:
+        while not stop.is_set():
+            try:
+                slot = free.get(timeout=0.1)
+            except queue.Empty:  # the parent is late on consuming data
+                continue
+            n = func(bufs[slot])
+            ready.put((slot, n))
+            if wait_time not in [None, False]:
+                stop.wait(wait_time)
+    except KeyboardInterrupt:
+        pass
+    except Exception:
+        traceback.print_exc()
+    finally:
+        # tells the parent that no more data will come
+        ready.put(None)
+
+
+class ProcessLoop(object):
+    def __init__(self, obj, name, callback, shape, dtype=float, nslots=2,
+                 wait_time=0.5, copy=True):
+        """
+        Runs the function decorated with
+        :py:func:`~joystick.deco.deco_process_loop` in an infinite loop
+        in a child process, and hands the results over to the
+        ``callback`` method of ``obj`` in the parent process.
+
+        Data travel through ``nslots`` shared-memory numpy buffers of
+        shape ``shape``. The child process fills a free buffer in place,
+        the index of which is sent to the parent through a queue; the
+        buffer is given back to the child once ``callback`` returns.
+
+        Args:
+          * obj (Joystick): the instance owning the decorated method
+          * name (str): the name of the decorated method
+          * callback (str): the name of the ``obj`` method to be called
+            in the parent with the data array as argument
+          * shape (int or tuple of int): the shape of the data buffer
+          * dtype (numpy dtype) [optional]: the type of the data buffer
+          * nslots (int) [optional]: the number of buffers, i.e. how
+            far the child process can get ahead of the parent
+          * wait_time (float or None) [optional]: the time to sleep
+            between two calls of the decorated method
+          * copy (bool) [optional]: if ``False``, ``callback`` is given
+            a view on the shared buffer, which it must not keep after
+            returning
+        """
+        self._obj = obj
+        self._name = str(name)
+        self._callback = str(callback)
+        self._shape = tuple(map(int, np.atleast_1d(shape)))
+        self._dtype = np.dtype(dtype)
+        self._nslots = max(int(nslots), 1)
+        self._wait_time = wait_time
+        self._copy = bool(copy)
+        self._proc = None
+        self._receiver = None
+        nbytes = int(np.prod(self._shape)) * self._dtype.itemsize
+        self._raw = multiprocessing.RawArray('b', nbytes * self._nslots)
+        self._bufs = np.frombuffer(self._raw, dtype=self._dtype)\
+                                    .reshape((self._nslots,) + self._shape)
+
+    @property
+    def running(self):
+        """
+        Returns ``True`` if the child process is alive. Read-only.
+        """
+        return self._proc is not None and self._proc.is_alive()
+
+    @running.setter
+    def running(self, value):
+        print("Read-only.")
+
+    def start(self):
+        """
+        Starts the child process and the receiving thread, if not
+        already running
+        """
+        if self.running:
+            return
+        self._stop = multiprocessing.Event()
+        self._free = multiprocessing.Queue()
+        self._ready = multiprocessing.Queue()
+        for slot in range(self._nslots):
+            self._free.put(slot)
+        self._proc = multiprocessing.Process(target=_child_loop,
+                        args=((type(self._obj), self._name), self._raw,
+                              self._dtype, self._shape, self._nslots,
+                              self._wait_time, self._free, self._ready,
+                              self._stop))
+        self._proc.daemon = True
+        self._proc.start()
+        self._receiver = Thread(target=self._receive)
+        self._receiver.daemon = True
+        self._receiver.start()
+
+    def _receive(self):
+        """
+        The function looping in the parent thread, dispatching data
+        """
+        while True:
+            try:
+                item = self._ready.get(timeout=0.2)
+            except queue.Empty:
+                if self._proc.is_alive():
+                    continue
+                return  # child died without notice
+            if item is None:
+                return
+            slot, n = item
+            data = self._bufs[slot]
+            if n is not None:
+                data = data[..., :int(n)]
+            if self._copy:
+                data = data.copy()
+                self._free.put(slot)
+            try:
+                getattr(self._obj, self._callback)(data)
+            except Exception:
+                traceback.print_exc()
+            if not self._copy:
+                self._free.put(slot)
+
+    def stop(self, timeout=1.):
+        """
+        Stops the child process, kills it if it is not done after
+        ``timeout`` seconds
+        """
+        if self._proc is None:
+            return
+        self._stop.set()
+        self._proc.join(timeout)
+        if self._proc.is_alive():
+            self._proc.terminate()
+            self._proc.join()
+        if self._receiver is not None:
+            self._receiver.join(timeout)
+        self._proc = None
+        self._receiver = None
@@ -0,0 +1,732 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+###############################################################################
+#  
+#  JOYSTICK - Real-time plotting and logging while console controlling
+#  Copyright (C) 2016  Guillaume Schworer
+#  
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#  
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#  
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#  
+#  For any information, bug report, idea, donation, hug, beer, please contact
+#    guillaume.schworer@gmail.com
+#
+###############################################################################
+
+import atexit
+import multiprocessing
+import pickle
+from threading import Thread, Event, Lock
+import traceback
+try:
+    from multiprocessing import shared_memory, resource_tracker
+except ImportError:  # python < 3.8
+    shared_memory = None
+
+from . import core
+np = core.np
+
+
+__all__ = ['ThreadRenderer', 'ProcessRenderer', 'RenderFarm',
+           'get_render_farm', 'set_render_farm']
+
+
+class ThreadRenderer(object):
+    def __init__(self, canvas, lock):
+        """
+        Renders the figure of a canvas in a daemon-thread, so that the
+        Tk thread only copies the finished pixels to the screen. Two
+        Agg renderers are used in turn: one being copied, the other one
+        being drawn.
+
+        The thread draws its own copy of the figure, so that the frame
+        is only held while the data of the artists are copied. The copy
+        is made again when the style of the figure changes, see
+        :py:class:`~joystick.render.ProcessRenderer`.
+
+        Args:
+          * canvas (FigureCanvasTkAgg): the canvas of the frame
+          * lock (RLock): the lock of the frame, held while the data of
+            the figure are copied
+        """
+        self._canvas = canvas
+        self._lock = lock
+        self._figure = None
+        self._signature = None
+        self._cmaps = {}
+        self._renderers = [None, None]
+        # index of the renderer to draw next
+        self._next = 0
+        self._done = None
+        self._busy = False
+        self._stopped = False
+        self._event = Event()
+        self._thread = Thread(target=self._work)
+        self._thread.daemon = True
+        self._thread.start()
+
+    @property
+    def running(self):
+        """
+        ``True`` if the rendering thread is alive. Read-only.
+        """
+        return self._thread.is_alive()
+
+    @running.setter
+    def running(self, value):
+        print("Read-only.")
+
+    def request(self):
+        """
+        Called from the Tk thread: shows the last finished drawing, if
+        any, and asks for a new one if none is in progress
+        """
+        done, self._done = self._done, None
+        if done is not None:
+            # the canvas blits from its own renderer, which may also be
+            # used by Tk to redraw after e.g. a resize
+            renderer = self._canvas.get_renderer()
+            if (renderer.width, renderer.height) \
+                    == (done.width, done.height):
+                np.asarray(renderer.buffer_rgba())[...] = \
+                    np.asarray(done.buffer_rgba())
+                self._canvas.blit()
+        if not self._busy:
+            self._busy = True
+            self._event.set()
+
+    def _get_renderer(self, w, h, dpi):
+        """
+        Returns the renderer to draw next, at the size of the figure
+        """
+        renderer = self._renderers[self._next]
+        if renderer is None or (renderer.width, renderer.height) \
+                != (w, h) or renderer.dpi != dpi:
+            renderer = core.mat.backends.backend_agg.RendererAgg(w, h, dpi)
+            self._renderers[self._next] = renderer
+        return renderer
+
+    def _snapshot(self):
+        """
+        Copies the figure if its style changed, and returns the calls
+        setting the current data on the copy, with the size of the
+        figure. Runs holding the lock of the frame
+        """
+        fig = self._canvas.figure
+        artists = _data_artists(fig)
+        signature = _signature(fig, artists)
+        if signature != self._signature:
+            self._figure = pickle.loads(pickle.dumps(
+                                            fig, pickle.HIGHEST_PROTOCOL))
+            core.mat.backends.backend_agg.FigureCanvasAgg(self._figure)
+            self._signature = signature
+            self._cmaps = {}
+        w, h = map(int, fig.bbox.size)
+        return _data_calls(artists, _copy, self._cmaps), w, h, fig.dpi
+
+    def _work(self):
+        """
+        Draws the figure each time it is requested
+        """
+        while True:
+            self._event.wait()
+            self._event.clear()
+            if self._stopped:
+                return
+            try:
+                with self._lock:
+                    calls, w, h, dpi = self._snapshot()
+                # the frame is free while drawing
+                _apply(self._figure, calls, w, h, dpi)
+                renderer = self._get_renderer(w, h, dpi)
+                renderer.clear()
+                self._figure.draw(renderer)
+                self._next = 1 - self._next
+                self._done = renderer
+            except Exception:
+                traceback.print_exc()
+            finally:
+                self._busy = False
+
+    def stop(self):
+        """
+        Stops the rendering thread
+        """
+        self._stopped = True
+        self._event.set()
+
+
+class _Shared(object):
+    """
+    Stands for an array shipped through shared memory, by its index in
+    the layout of the job, and the index of its mask if any
+    """
+    def __init__(self, idx, mask=None):
+        self.idx = idx
+        self.mask = mask
+
+    def get(self, arrays):
+        if self.mask is None:
+            return arrays[self.idx]
+        return np.ma.array(arrays[self.idx], mask=arrays[self.mask])
+
+
+def _data_artists(fig):
+    """
+    Returns the axes of the figure and the artists holding its data, in
+    the same order for the figure and its copy in a worker process
+    """
+    res = []
+    for ax in fig.axes:
+        res.append(ax)
+        for item in (ax.lines, ax.patches, ax.images, ax.collections,
+                     ax.texts):
+            res += list(item)
+    return res
+
+
+def _rgba(colors):
+    """
+    Colors as a hashable tuple
+    """
+    if colors is None or isinstance(colors, str):
+        return colors
+    return tuple(np.ravel(colors).tolist())
+
+
+def _style(item):
+    """
+    Returns the style of an artist, i.e. what the worker process does
+    not receive at each job, as a comparable tuple
+    """
+    mpl = core.mat
+    res = [type(item), id(item), item.get_alpha(), item.get_zorder(),
+           item.get_label()]
+    if isinstance(item, mpl.axes.Axes):
+        legend = item.get_legend()
+        res += [item.get_title(), item.get_xlabel(), item.get_ylabel(),
+                item.get_xscale(), item.get_yscale(), item.axison,
+                _rgba(item.get_facecolor()), id(legend),
+                None if legend is None
+                    else tuple(txt.get_text() for txt in legend.get_texts())]
+        for axis in (item.xaxis, item.yaxis):
+            res += [id(axis.get_major_formatter()),
+                    id(axis.get_major_locator()),
+                    id(axis.get_minor_formatter()),
+                    id(axis.get_minor_locator())]
+    elif isinstance(item, mpl.lines.Line2D):
+        res += [_rgba(item.get_color()), item.get_linewidth(),
+                item.get_linestyle(), item.get_drawstyle(),
+                str(item.get_marker()), item.get_markersize(),
+                _rgba(item.get_markerfacecolor()),
+                _rgba(item.get_markeredgecolor())]
+    elif isinstance(item, mpl.patches.Patch):
+        res += [_rgba(item.get_facecolor()), _rgba(item.get_edgecolor()),
+                item.get_linewidth(), item.get_linestyle(), item.get_fill()]
+    elif isinstance(item, mpl.image.AxesImage):
+        res += [item.get_interpolation(), item.origin]
+    elif isinstance(item, mpl.collections.Collection):
+        res += [_rgba(item.get_linewidths()), str(item.get_linestyles())]
+        if not isinstance(item, mpl.collections.PathCollection):
+            # the colors of the scatter plots are shipped at each job
+            res += [_rgba(item.get_facecolor()), _rgba(item.get_edgecolor())]
+    elif isinstance(item, mpl.text.Text):
+        res += [_rgba(mpl.colors.to_rgba(item.get_color())),
+                hash(item.get_fontproperties()), item.get_rotation(),
+                item.get_horizontalalignment(),
+                item.get_verticalalignment()]
+    return tuple(res)
+
+
+def _signature(fig, artists):
+    """
+    Returns what changes when the figure must be sent again to the
+    worker process: the artists added or removed, and their style
+    """
+    res = [_style(item) for item in artists]
+    res.append(_rgba(fig.get_facecolor()))
+    res += [(txt.get_text(), _rgba(txt.get_color())) for txt in fig.texts]
+    res += [id(item) for item in fig.legends]
+    return res
+
+
+def _copy(a):
+    """
+    Copies an array of the figure, for a drawing in another thread
+    """
+    if np.ma.isMaskedArray(a):
+        return np.ma.copy(a)
+    return np.array(a)
+
+
+def _colormap(idx, item, cmaps):
+    """
+    Returns the calls setting the color bounds of the artist, and
+    its colormap if it changed since the last job
+    """
+    calls = [(idx, 'set_clim', item.get_clim())]
+    if cmaps.get(idx) is not item.get_cmap():
+        cmaps[idx] = item.get_cmap()
+        calls.append((idx, 'set_cmap', [item.get_cmap()]))
+    return calls
+
+
+def _data_calls(artists, share, cmaps):
+    """
+    Returns the method calls setting the data of the artists on a copy
+    of their figure, as (artist index, method name, arguments). The
+    arrays are passed through share, the colormaps already set on the
+    copy are kept in cmaps
+    """
+    calls = []
+    for idx, item in enumerate(artists):
+        if isinstance(item, core.mat.axes.Axes):
+            calls += [(idx, 'set_xlim', item.get_xlim()),
+                      (idx, 'set_ylim', item.get_ylim())]
+        elif isinstance(item, core.mat.lines.Line2D):
+            calls.append((idx, 'set_data',
+                          [share(d) for d in item.get_data(orig=True)]))
+        elif isinstance(item, core.mat.patches.Polygon):
+            calls.append((idx, 'set_xy', [share(item.get_xy())]))
+        elif isinstance(item, core.mat.image.AxesImage):
+            calls += [(idx, 'set_data', [share(item.get_array())]),
+                      (idx, 'set_extent', [item.get_extent()]),
+                      (idx, 'set_alpha', [item.get_alpha()])]
+            calls += _colormap(idx, item, cmaps)
+        elif isinstance(item, core.mat.collections.PathCollection):
+            a = item.get_array()
+            calls += [(idx, 'set_offsets', [share(item.get_offsets())]),
+                      (idx, 'set_sizes', [share(item.get_sizes())]),
+                      (idx, 'set_edgecolor', [share(item.get_edgecolor())])]
+            if a is None:
+                calls.append((idx, 'set_facecolor',
+                              [share(item.get_facecolor())]))
+            else:
+                calls.append((idx, 'set_array', [share(a)]))
+            calls += _colormap(idx, item, cmaps)
+        elif isinstance(item, core.mat.text.Text):
+            calls += [(idx, 'set_text', [item.get_text()]),
+                      (idx, 'set_position', [item.get_position()])]
+        calls.append((idx, 'set_visible', [item.get_visible()]))
+    return calls
+
+
+def _apply(fig, calls, w, h, dpi, get=None):
+    """
+    Sets the data and the size on the copy of a figure. ``get`` returns
+    the value an argument of the calls stands for, if any
+    """
+    artists = _data_artists(fig)
+    for idx, meth, args in calls:
+        if get is not None:
+            args = [get(item) for item in args]
+        getattr(artists[idx], meth)(*args)
+    fig.dpi = dpi
+    fig.set_size_inches(w / float(dpi), h / float(dpi))
+
+
+def _attach(name):
+    """
+    Opens an existing shared-memory block
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # python < 3.13
+        shm = shared_memory.SharedMemory(name=name)
+        if multiprocessing.get_start_method() == 'fork':
+            # a forked worker has its own resource tracker, which would
+            # unlink the block when the worker exits
+            resource_tracker.unregister(shm._name, 'shared_memory')
+        return shm
+
+
+def _farm_worker(jobs, done):
+    """
+    The looping function of a worker process of a
+    :py:class:`~joystick.render.RenderFarm`: keeps a copy of the figures
+    of its frames, applies their data and draws them
+    """
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    figs = {}
+    # shared-memory blocks opened, by name, and their names by frame
+    shms = {}
+    names = {}
+
+    def use(fid, keep):
+        """
+        Closes the blocks of the frame that are not in keep
+        """
+        for name in names.pop(fid, []):
+            if name not in keep and name in shms:
+                shms.pop(name).close()
+        if keep:
+            names[fid] = keep
+        for name in keep:
+            if name not in shms:
+                shms[name] = _attach(name)
+
+    while True:
+        try:
+            job = jobs.get()
+        except KeyboardInterrupt:
+            continue
+        if job is None:
+            break
+        fid, kind = job[:2]
+        if kind == 'figure':
+            try:
+                figs[fid] = pickle.loads(job[2])
+                FigureCanvasAgg(figs[fid])
+            except Exception:
+                traceback.print_exc()
+            continue
+        elif kind == 'remove':
+            figs.pop(fid, None)
+            use(fid, [])
+            continue
+        # 'draw'
+        inname, layout, calls, outname, w, h, dpi = job[2:]
+        ok = False
+        try:
+            fig = figs[fid]
+            use(fid, [inname, outname])
+            # copies, the block is re-written for the next job
+            arrays = [np.ndarray(shape, dtype=dtype, buffer=shms[inname].buf,
+                                 offset=offset).copy()
+                      for offset, dtype, shape in layout]
+            _apply(fig, calls, w, h, dpi,
+                   lambda item: item.get(arrays)
+                   if isinstance(item, _Shared) else item)
+            fig.canvas.draw()
+            out = np.ndarray((h, w, 4), dtype=np.uint8,
+                             buffer=shms[outname].buf)
+            out[...] = np.asarray(fig.canvas.buffer_rgba())[:h, :w]
+            ok = True
+        except Exception:
+            traceback.print_exc()
+        finally:
+            done.put((fid, ok))
+    for fid in list(names):
+        use(fid, [])
+
+
+class RenderFarm(object):
+    def __init__(self, nworkers=None):
+        """
+        A pool of worker processes drawing the figures of the frames
+        with ``render='process'``, each worker owning a copy of the
+        figures of a subset of the frames. Workers are started at the
+        first frame added.
+
+        Args:
+          * nworkers (int or None) [optional]: the number of worker
+            processes, ``None`` for the number of CPUs minus one
+        """
+        if nworkers is None:
+            nworkers = multiprocessing.cpu_count() - 1
+        self._nworkers = max(int(nworkers), 1)
+        self._procs = []
+        self._jobs = []
+        self._frames = {}
+        self._count = [0] * self._nworkers
+        self._next_id = 0
+        self._lock = Lock()
+        self._receiver = None
+
+    @property
+    def nworkers(self):
+        """
+        The number of worker processes. Read-only.
+        """
+        return self._nworkers
+
+    @nworkers.setter
+    def nworkers(self, value):
+        print("Read-only.")
+
+    @property
+    def running(self):
+        """
+        ``True`` if the worker processes are alive. Read-only.
+        """
+        return len(self._procs) > 0 \
+                and all(item.is_alive() for item in self._procs)
+
+    @running.setter
+    def running(self, value):
+        print("Read-only.")
+
+    def start(self):
+        """
+        Starts the worker processes and the receiving thread, if not
+        already running
+        """
+        if self._procs:
+            return
+        self._done = multiprocessing.Queue()
+        for ith in range(self._nworkers):
+            jobs = multiprocessing.Queue()
+            proc = multiprocessing.Process(target=_farm_worker,
+                                           args=(jobs, self._done))
+            proc.daemon = True
+            proc.start()
+            self._jobs.append(jobs)
+            self._procs.append(proc)
+        self._receiver = Thread(target=self._receive)
+        self._receiver.daemon = True
+        self._receiver.start()
+        atexit.register(self.shutdown)
+
+    def _receive(self):
+        """
+        The function looping in the parent thread, dispatching the
+        finished drawings to their renderers
+        """
+        while True:
+            item = self._done.get()
+            if item is None:
+                return
+            fid, ok = item
+            renderer = self._frames.get(fid)
+            if renderer is not None:
+                renderer._finished(ok)
+
+    def _add(self, renderer):
+        """
+        Registers a renderer on the least busy worker, returns its id
+        """
+        with self._lock:
+            self.start()
+            fid = self._next_id
+            self._next_id += 1
+            worker = self._count.index(min(self._count))
+            self._count[worker] += 1
+            self._frames[fid] = renderer
+        return fid, worker
+
+    def _remove(self, fid, worker):
+        """
+        Unregisters a renderer, its worker forgets its figure and closes
+        its shared-memory blocks
+        """
+        with self._lock:
+            if self._frames.pop(fid, None) is None:
+                return
+            self._count[worker] -= 1
+        self._send(worker, (fid, 'remove'))
+
+    def _send(self, worker, job):
+        if self._procs:
+            self._jobs[worker].put(job)
+
+    def shutdown(self, timeout=1.):
+        """
+        Stops the worker processes, kills them if they are not done
+        after ``timeout`` seconds
+        """
+        if not self._procs:
+            return
+        for jobs in self._jobs:
+            jobs.put(None)
+        for proc in self._procs:
+            proc.join(timeout)
+            if proc.is_alive():
+                proc.terminate()
+                proc.join()
+        self._done.put(None)
+        self._receiver.join(timeout)
+        for renderer in list(self._frames.values()):
+            renderer._release()
+        self._procs = []
+        self._jobs = []
+        self._frames = {}
+        self._count = [0] * self._nworkers
+        self._receiver = None
+
+
+_RENDER_FARM = None
+
+
+def get_render_farm():
+    """
+    Returns the farm shared by all frames with ``render='process'``,
+    creates it if needed
+    """
+    global _RENDER_FARM
+    if _RENDER_FARM is None:
+        _RENDER_FARM = RenderFarm()
+    return _RENDER_FARM
+
+
+def set_render_farm(nworkers=None):
+    """
+    Replaces the farm shared by all frames with ``render='process'``,
+    the frames already using the previous one keep it.
+    See :py:class:`~joystick.render.RenderFarm` for the parameters.
+    """
+    global _RENDER_FARM
+    _RENDER_FARM = RenderFarm(nworkers=nworkers)
+    return _RENDER_FARM
+
+
+class ProcessRenderer(object):
+    def __init__(self, canvas, lock, farm=None):
+        """
+        Renders the figure of a canvas in a worker process of a
+        :py:class:`~joystick.render.RenderFarm`, so that the Tk thread
+        only copies the finished pixels to the screen.
+
+        The figure is sent to the worker once, and again whenever
+        artists are added or removed or their style changes (colors,
+        line widths and styles, markers, fonts, legends, titles, labels,
+        scales, tick formatters and locators). At each update, only the
+        data of its artists (lines, polygons, images, collections, texts
+        and axes limits) are shipped, through a shared-memory block; the
+        pixels come back through another one. Changes made inside an
+        existing object (e.g. the format of a tick formatter, or the
+        tick parameters) are not seen until the figure is sent again.
+
+        Args:
+          * canvas (FigureCanvasTkAgg): the canvas of the frame
+          * lock (RLock): the lock of the frame, held while the data of
+            the figure are collected
+          * farm (RenderFarm or None) [optional]: the farm to draw in,
+            default is :py:func:`~joystick.render.get_render_farm`
+        """
+        if shared_memory is None:
+            raise ImportError("render='process' requires python >= 3.8")
+        self._canvas = canvas
+        self._lock = lock
+        self._farm = get_render_farm() if farm is None else farm
+        self._in = None
+        self._out = None
+        self._outsize = None
+        self._signature = None
+        self._cmaps = {}
+        self._busy = False
+        self._done = False
+        self._fid, self._worker = self._farm._add(self)
+
+    @property
+    def running(self):
+        """
+        ``True`` if the worker processes of the farm are alive.
+        Read-only.
+        """
+        return self._farm.running
+
+    @running.setter
+    def running(self, value):
+        print("Read-only.")
+
+    def request(self):
+        """
+        Called from the Tk thread: shows the last finished drawing, if
+        any, and sends a new job if none is in progress
+        """
+        # read before _done, which the receiver sets first
+        busy = self._busy
+        if self._done:
+            self._done = False
+            renderer = self._canvas.get_renderer()
+            h, w = self._outsize
+            if (renderer.width, renderer.height) == (w, h):
+                np.asarray(renderer.buffer_rgba())[...] = np.ndarray(
+                    (h, w, 4), dtype=np.uint8, buffer=self._out.buf)
+                self._canvas.blit()
+        if busy:
+            return
+        fig = self._canvas.figure
+        w, h = map(int, fig.bbox.size)
+        with self._lock:
+            artists = _data_artists(fig)
+            signature = _signature(fig, artists)
+            if signature != self._signature:
+                self._farm._send(self._worker, (self._fid, 'figure',
+                            pickle.dumps(fig, pickle.HIGHEST_PROTOCOL)))
+                self._signature = signature
+                self._cmaps = {}
+            calls, arrays = self._collect(artists)
+            layout, size = [], 0
+            for item in arrays:
+                layout.append((size, item.dtype.str, item.shape))
+                # 8-bytes aligned
+                size += -(-item.nbytes // 8) * 8
+            if self._in is None or self._in.size < size:
+                self._in = self._new_shm(self._in, 2 * size)
+            for (offset, dtype, shape), item in zip(layout, arrays):
+                np.ndarray(shape, dtype=dtype, buffer=self._in.buf,
+                           offset=offset)[...] = item
+        if self._outsize != (h, w):
+            self._out = self._new_shm(self._out, h * w * 4)
+            self._outsize = (h, w)
+        self._busy = True
+        self._farm._send(self._worker, (self._fid, 'draw', self._in.name,
+                         layout, calls, self._out.name, w, h, fig.dpi))
+
+    def _collect(self, artists):
+        """
+        Returns the method calls setting the data of the artists, as
+        (artist index, method name, arguments), and the arrays to be
+        shipped through shared memory
+        """
+        arrays = []
+
+        def share(a):
+            a = np.asanyarray(a)
+            if a.dtype.hasobject:
+                return a
+            mask = None
+            if np.ma.is_masked(a):
+                arrays.append(np.ascontiguousarray(np.ma.getmaskarray(a)))
+                mask = len(arrays) - 1
+            arrays.append(np.ascontiguousarray(np.ma.getdata(a)))
+            return _Shared(len(arrays) - 1, mask)
+
+        return _data_calls(artists, share, self._cmaps), arrays
+
+    @staticmethod
+    def _new_shm(old, size):
+        """
+        Creates a shared-memory block, releases the old one. The worker
+        keeps the old one open until its next job
+        """
+        if old is not None:
+            old.close()
+            old.unlink()
+        return shared_memory.SharedMemory(create=True, size=max(size, 1))
+
+    def _finished(self, ok):
+        """
+        Called from the receiving thread of the farm when the drawing
+        is done
+        """
+        self._done = ok
+        self._busy = False
+
+    def _release(self):
+        for item in (self._in, self._out):
+            if item is not None:
+                item.close()
+                item.unlink()
+        self._in = None
+        self._out = None
+        self._outsize = None
+
+    def stop(self):
+        """
+        Unregisters the frame from the farm
+        """
+        self._farm._remove(self._fid, self._worker)
+        self._release()
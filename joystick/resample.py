@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+###############################################################################
+#  
+#  JOYSTICK - Real-time plotting and logging while console controlling
+#  Copyright (C) 2016  Guillaume Schworer
+#  
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#  
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#  
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#  
+#  For any information, bug report, idea, donation, hug, beer, please contact
+#    guillaume.schworer@gmail.com
+#
+###############################################################################
+
+from . import core
+np = core.np
+
+
+__all__ = ['Aligner']
+
+
+class Aligner(object):
+    def __init__(self, nchannels, step, method='interp', t0=None):
+        """
+        Resamples several asynchronous channels (different or irregular
+        sample rates) onto a common regular time grid, incrementally:
+        each call to :py:func:`~joystick.resample.Aligner.align` only
+        computes the grid points that became available since the last
+        call, for all channels at once.
+
+        The result can directly be given to a
+        :py:class:`~joystick.graphmulti.GraphMulti` with a shared x-axis:
+
+        >>> grid, values = self.aligner.align()
+        >>> self.t = self.mygraph.add_datapoint(self.t, grid)
+        >>> self.v = np.hstack((self.v, values))[:, -self.mygraph.xnptsmax:]
+        >>> self.mygraph.set_xydata(self.t, self.v)
+
+        Args:
+          * nchannels (int): the number of channels
+          * step (float): the time interval of the common grid
+          * method (str) [optional]: ``'interp'`` for linear
+            interpolation, ``'hold'`` to take the last value
+          * t0 (float or None) [optional]: the first time of the grid,
+            default is the first time at which all channels have data,
+            rounded up to the grid step
+        """
+        self._nchannels = int(nchannels)
+        self._step = float(step)
+        method = str(method).lower()
+        if method not in ['interp', 'hold']:
+            raise ValueError("'method' parameter shall be in "\
+                             "['interp', 'hold']")
+        self._method = method
+        self._next = None if t0 is None else float(t0)
+        self._t = [np.empty(0) for ith in range(self._nchannels)]
+        self._v = [np.empty(0) for ith in range(self._nchannels)]
+
+    @property
+    def nchannels(self):
+        """
+        The number of channels. Read-only.
+        """
+        return self._nchannels
+
+    @nchannels.setter
+    def nchannels(self, value):
+        print("Read-only.")
+
+    def add(self, ith, t, v):
+        """
+        Appends samples (numbers or 1d-vectors, t increasing) to the
+        ``ith`` channel
+        """
+        ith = int(ith)
+        t = np.atleast_1d(np.asarray(t, dtype=float))
+        v = np.broadcast_to(np.asarray(v, dtype=float), t.shape)
+        self._t[ith] = np.r_[self._t[ith], t]
+        self._v[ith] = np.r_[self._v[ith], v]
+
+    def align(self):
+        """
+        Returns the new grid times and the (nchannels, n) array of
+        the channel values on these times; n is 0 until all channels
+        have received data past the next grid time
+        """
+        empty = (np.empty(0), np.empty((self._nchannels, 0)))
+        if any(item.size == 0 for item in self._t):
+            return empty
+        if self._next is None:
+            first = max(item[0] for item in self._t)
+            self._next = np.ceil(first/self._step)*self._step
+        # grid points covered by all channels
+        last = min(item[-1] for item in self._t)
+        n = int(np.floor((last - self._next)/self._step)) + 1
+        if n <= 0:
+            return empty
+        grid = self._next + self._step*np.arange(n)
+        # all channels at once: shift each channel (and its copy of the
+        # grid) to its own time slot, far from the others
+        ref = grid[0]
+        tfirst = np.array([item[0] for item in self._t])
+        tlast = np.array([item[-1] for item in self._t])
+        span = max(grid[-1], tlast.max()) - min(grid[0], tfirst.min()) \
+                    + 2*self._step
+        offsets = span*np.arange(self._nchannels)
+        sizes = [item.size for item in self._t]
+        t = np.concatenate(self._t) - ref \
+                + np.repeat(offsets, sizes)
+        v = np.concatenate(self._v)
+        # grid times out of the samples of a channel take its first or
+        # last value, not those of the neighbouring slot
+        g = (np.clip(grid[None, :], tfirst[:, None], tlast[:, None]) - ref
+             + offsets[:, None]).ravel()
+        if self._method == 'interp':
+            values = np.interp(g, t, v)
+        else:
+            values = v[np.maximum(np.searchsorted(t, g, side='right')-1, 0)]
+        self._next = grid[-1] + self._step
+        # only keep the samples needed for the next grid points
+        for ith in range(self._nchannels):
+            keep = max(np.searchsorted(self._t[ith], grid[-1],
+                                       side='right') - 1, 0)
+            self._t[ith] = self._t[ith][keep:]
+            self._v[ith] = self._v[ith][keep:]
+        return grid, values.reshape((self._nchannels, n))
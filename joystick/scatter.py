@@ -38,7 +38,8 @@ class Scatter(ColorbarManager, Graph):
                  screen_relative=False, xnpts=30, c='r', s=20,
                  bgcol='w', axrect=(0.1, 0.1, 0.9, 0.9), grid='k',
                  xylim=(None, None, None, None), xnptsmax=50, axmargin=(1.1, 1.1),
-                 cmap='gist_earth', vmin=None, vmax=None, **kwargs):
+                 cmap='gist_earth', vmin=None, vmax=None, xwindow=None,
+                 xretention=None, density=False, ctol=0.02, **kwargs):
                  
         """
         Initialises a graph-frame. Use
@@ -84,6 +85,21 @@ class Scatter(ColorbarManager, Graph):
             the colorbar, or ``None`` for auto-scaling
           * vmax (float or None): the value corresponding to the max of
             the colorbar, or ``None`` for auto-scaling
+          * xwindow (float or None) [optional]: if not ``None``, only the
+            markers with time within ``xwindow`` of the last time are
+            plotted, see :py:func:`~joystick.scatter.Scatter.set_xydata`
+          * xretention (float or None) [optional]: the x-span of
+            data-points to be kept, see :py:class:`~joystick.graph.Graph`
+          * density (bool or tuple of 2 int) [optional]: if not
+            ``False``, the markers are not drawn individually: the
+            number of points per pixel is shown with the colormap.
+            Give (nx, ny) to set the number of bins, default is the
+            size of the axes in pixels. Points can be added
+            incrementally with :py:func:`~joystick.scatter.Scatter.add_points`
+          * ctol (float) [optional]: the relative change of the
+            auto-scaled color bounds (``vmin`` or ``vmax`` being
+            ``None``) below which the bounds are kept, to avoid
+            re-computing the colors of all markers
 
         Kwargs:
           * Any non-abbreviated parameter accepted by ``figure.add_axes``
@@ -97,11 +113,15 @@ class Scatter(ColorbarManager, Graph):
         kwargs['cmap'] = cmap
         kwargs['vmin'] = vmin
         kwargs['vmax'] = vmax
+        kwargs['density'] = density
+        kwargs['ctol'] = ctol
         self._kwargs = kwargs
         super(Scatter, self).__init__(name=name, freq_up=freq_up, pos=pos,
                  size=size, screen_relative=screen_relative, xnpts=xnpts,
                  bgcol=bgcol, axrect=axrect, grid=grid, xylim=xylim,
-                 xnptsmax=xnptsmax, axmargin=axmargin, **self._kwargs)
+                 xnptsmax=xnptsmax, axmargin=axmargin, xwindow=xwindow,
+                 xretention=xretention, **self._kwargs)
+        self._preupdate_fcts.insert(0, '_push_density')
         self._preupdate_fcts += ['_scale_colors']
 
     def _init_base(self, **kwargs):
@@ -115,15 +135,150 @@ class Scatter(ColorbarManager, Graph):
         # record scatter specific parameters
         self._c = kwargs.pop('c')
         self._s = kwargs.pop('s')
-        self._plot = self.ax.scatter(0, 0, c=self._c, vmin=self.vmin,
-                                        vmax=self.vmax, s=self._s,
-                                        cmap=self.cmap,
-                                        **core.scatkwargs(kwargs))
+        # colors of the markers, computed for the new markers only
+        self._cvals = None
+        self._rgba = None
+        density = kwargs.pop('density')
+        self._density = density is not False and density is not None
+        if self._density:
+            self._init_density(density)
+        else:
+            self._plot = self.ax.scatter(0, 0, c=self._c, vmin=self.vmin,
+                                            vmax=self.vmax, s=self._s,
+                                            cmap=self.cmap,
+                                            **core.scatkwargs(kwargs))
         self._reset_colorbar(**kwargs)
         self._scale_axes(force=True)
         # callbacks
         self._callmthd(after, **kwargs)
 
+    def _init_density(self, density):
+        """
+        Creates the 2d-histogram of the points and its image
+        """
+        if density is True:
+            # one bin per pixel of the axes
+            w, h = self._canvas.get_width_height()
+            pos = self.ax.get_position()
+            density = (w*pos.width, h*pos.height)
+        self._nxy = (max(int(density[0]), 1), max(int(density[1]), 1))
+        self._drange = None
+        self._dcounts = np.zeros(self._nxy[0]*self._nxy[1])
+        # ring of the last points and of their flat bin index
+        self._dxy = np.zeros((max(self.xnpts, 1), 2))
+        self._didx = np.full(self._dxy.shape[0], -1, dtype=np.intp)
+        self._dpos = 0
+        self._dn = 0
+        self._ddirty = True
+        self._plot = self.ax.imshow(np.zeros(self._nxy[::-1]),
+                                    cmap=self.cmap, norm=self._norm,
+                                    origin='lower', aspect='auto',
+                                    interpolation='nearest',
+                                    extent=(0, 1, 0, 1))
+
+    @property
+    def density(self):
+        """
+        ``True`` if the scatter shows the density of points. Read-only.
+        """
+        return self._density
+
+    @density.setter
+    def density(self, value):
+        print("Read-only.")
+
+    def _bin_points(self, xy):
+        """
+        Returns the flat bin index of the points, -1 if out of the bins
+        range
+        """
+        nx, ny = self._nxy
+        xmin, xmax, ymin, ymax = self._drange
+        ix = np.floor((xy[:, 0] - xmin)*(nx/(xmax - xmin))).astype(np.intp)
+        iy = np.floor((xy[:, 1] - ymin)*(ny/(ymax - ymin))).astype(np.intp)
+        out = (ix < 0) | (ix >= nx) | (iy < 0) | (iy >= ny)
+        return np.where(out, -1, iy*nx + ix)
+
+    def _rebin(self):
+        """
+        Sets the range of the bins from xylim or from the points, and
+        bins all points again
+        """
+        xy = self._dxy[:self._dn]
+        lims = list(self.xylim[:4])
+        if xy.shape[0] > 0:
+            # some slack, to avoid re-binning as the cloud grows
+            lo, hi = xy.min(axis=0), xy.max(axis=0)
+            span = np.maximum(hi - lo, self._minmini)*0.1
+            auto = [lo[0]-span[0], hi[0]+span[0], lo[1]-span[1], hi[1]+span[1]]
+        else:
+            auto = [0., 1., 0., 1.]
+        rng = [auto[ith] if lims[ith] is None else lims[ith]
+               for ith in range(4)]
+        rng[1] = max(rng[1], rng[0] + self._minmini)
+        rng[3] = max(rng[3], rng[2] + self._minmini)
+        self._drange = tuple(rng)
+        self._didx[:self._dn] = self._bin_points(xy)
+        self._didx[self._dn:] = -1
+        idx = self._didx[:self._dn]
+        self._dcounts = np.bincount(idx[idx >= 0],
+                            minlength=self._dcounts.size).astype(float)
+        self._ddirty = True
+
+    def add_points(self, x, y):
+        """
+        Adds points (numbers or vectors) to a density scatter, the
+        oldest ones are dropped to keep the last
+        :py:func:`~joystick.graph.Graph.xnpts`. Only the new and dropped
+        points are binned, unless the new ones fall out of the range of
+        the bins with some axes limits free (see
+        :py:func:`~joystick.graph.Graph.xylim`)
+        """
+        if not self._density:
+            print("{}Not a density scatter, see 'density' parameter{}" \
+            .format(core.font.red, core.font.normal))
+            return
+        xy = np.column_stack((np.atleast_1d(x), np.atleast_1d(y)))\
+                    .astype(float)
+        cap, k = self._dxy.shape[0], xy.shape[0]
+        if k == 0:
+            return
+        if k >= cap:
+            self._dxy[:] = xy[-cap:]
+            self._dpos = 0
+            self._dn = cap
+            self._rebin()
+            return
+        pos = (self._dpos + np.arange(k)) % cap
+        old = self._didx[pos]
+        self._dxy[pos] = xy
+        self._dpos = (self._dpos + k) % cap
+        self._dn = min(self._dn + k, cap)
+        if self._drange is None:
+            self._rebin()
+            return
+        idx = self._bin_points(xy)
+        if (idx < 0).any() and None in self.xylim[:4]:
+            self._rebin()
+            return
+        self._didx[pos] = idx
+        n = self._dcounts.size
+        self._dcounts -= np.bincount(old[old >= 0], minlength=n)
+        self._dcounts += np.bincount(idx[idx >= 0], minlength=n)
+        self._ddirty = True
+
+    def _push_density(self):
+        """
+        Sets the 2d-histogram to the image, if points were added
+        """
+        if not (self.visible and self._density and self._ddirty):
+            return
+        if self._drange is None:
+            self._rebin()
+        self._plot.set_data(self._dcounts.reshape(self._nxy[::-1]))
+        self._plot.set_extent(self._drange)
+        self._ddirty = False
+
     @property
     def s(self):
         """
@@ -133,6 +288,10 @@ class Scatter(ColorbarManager, Graph):
 
     @s.setter
     def s(self, value):
+        if self._density:
+            print("{}No marker size in a density scatter{}" \
+            .format(core.font.red, core.font.normal))
+            return
         if not hasattr(value, '__iter__'):
             self._s = value
             self._plot.set_sizes([self._s])
@@ -148,14 +307,21 @@ class Scatter(ColorbarManager, Graph):
 
     @c.setter
     def c(self, value):
+        if self._density:
+            print("{}No marker color in a density scatter, see 'cmap'{}" \
+            .format(core.font.red, core.font.normal))
+            return
         if not hasattr(value, '__iter__'):
             self._c = np.asarray(value)
+            self._cvals = self._rgba = None
             self._plot.set_array(self._c)
             self._update_scalarmappable()
         if not (self.running and self._mummy_running):
             self.show()
 
     def _get_xydata_minmax(self):
+        if self._density:
+            return self._drange
         res = self._plot.get_offsets()
         if (0 if res is None else np.size(res)) == 0:
             return self.get_xylim()
@@ -163,10 +329,59 @@ class Scatter(ColorbarManager, Graph):
 
     def get_data(self):
         """
-        Returns the color-encoded values of the markers
+        Returns the color-encoded values of the markers, or the number
+        of points per bin for a density scatter
         """
+        if self._density:
+            return self._dcounts
+        if self._cvals is not None:
+            return self._cvals
         return self._plot.get_array()
 
+    def _update_scalarmappable(self):
+        """
+        Re-computes the colors of all markers
+        """
+        if getattr(self, '_rgba', None) is not None:
+            self._rgba = self._plot.to_rgba(self._cvals)
+            self._plot.set_facecolors(self._rgba)
+        else:
+            super(Scatter, self)._update_scalarmappable()
+
+    def _count_new(self, c):
+        """
+        Returns the number of values at the end of c that are new
+        compared to the previous color values, assuming that the
+        markers kept are shifted to the start; or ``None`` if c does
+        not follow the previous values
+        """
+        old = self._cvals
+        if old is None or old.size == 0 or c.size == 0:
+            return None
+        m = min(old.size, c.size)
+        # a few candidate positions of the last previous value
+        for j in np.flatnonzero(c[:m] == old[-1])[::-1][:3]:
+            if np.array_equal(c[:j+1], old[old.size-j-1:]):
+                return c.size - j - 1
+        return None
+
+    def _set_colors(self, c):
+        """
+        Sets the color-encoded values of the markers, colormaps only
+        the new ones
+        """
+        k = self._count_new(c)
+        if k is None or self._rgba is None:
+            self._plot.set_array(None)
+            rgba = self._plot.to_rgba(c)
+        elif k == 0:
+            rgba = self._rgba[self._rgba.shape[0]-c.size:]
+        else:
+            rgba = np.concatenate((self._rgba[self._rgba.shape[0]-c.size+k:],
+                                   self._plot.to_rgba(c[-k:])))
+        self._cvals, self._rgba = c, rgba
+        self._plot.set_facecolors(rgba)
+
     def set_data(self, value):
         """
         Sets the color-encoded values of the markers
@@ -175,28 +390,43 @@ class Scatter(ColorbarManager, Graph):
 
     def get_xydata(self):
         """
-        Returns the (x, y, c, s) data of the scatter points
+        Returns the (x, y, c, s) data of the scatter points, or the
+        (x, y) of the points for a density scatter
         """
+        if self._density:
+            xy = np.roll(self._dxy[:self._dn], -self._dpos, axis=0) \
+                    if self._dn == self._dxy.shape[0] else self._dxy[:self._dn]
+            return xy[:, 0], xy[:, 1]
         res = self._plot.get_offsets()
         sz = self._plot.get_sizes()
         cl = self.get_data()
         return res[:,0], res[:,1], sz, cl
 
-    def set_xydata(self, x, y, c=None, s=None):
+    @core.locked
+    def set_xydata(self, x, y, c=None, s=None, t=None):
         """
         Sets the x, y, c and s data of the markers.
         Only the last :py:func:`~joystick.graph.Scatter.xnpts`
-        data-points will be displayed
+        data-points will be displayed, or, if
+        :py:func:`~joystick.graph.Graph.xwindow` is not ``None``, those
+        with time ``t`` (increasing vector, default is x) within
+        ``xwindow`` of the last time. For a density scatter, c and s
+        are ignored and all points are binned again, see
+        :py:func:`~joystick.scatter.Scatter.add_points`
         """
         if not self.visible:
             return
-        xy = np.asarray([x,y]).T
-        if self.xnpts is not None:
-            self._plot.set_offsets(xy[-self.xnpts:])
-            if c is not None:
-                self._plot.set_array(np.asarray(c)[-self.xnpts:])
-                self._update_scalarmappable()
-            if s is not None:
-                self.set_data(s)
-        else:
-            self._plot.set_offsets(xy)
+        x, y = np.asarray(x), np.asarray(y)
+        sl = self._visible_slice(x if t is None else np.asarray(t))
+        if self._density:
+            xy = np.column_stack((x[sl], y[sl]))[-self._dxy.shape[0]:]
+            self._dn = xy.shape[0]
+            self._dxy[:self._dn] = xy
+            self._dpos = self._dn % self._dxy.shape[0]
+            self._rebin()
+            return
+        self._plot.set_offsets(np.column_stack((x[sl], y[sl])))
+        if c is not None:
+            self._set_colors(np.asarray(c, dtype=float)[sl])
+        if s is not None:
+            self._plot.set_sizes(np.asarray(s)[sl])
@@ -0,0 +1,318 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+###############################################################################
+#  
+#  JOYSTICK - Real-time plotting and logging while console controlling
+#  Copyright (C) 2016  Guillaume Schworer
+#  
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#  
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#  
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#  
+#  For any information, bug report, idea, donation, hug, beer, please contact
+#    guillaume.schworer@gmail.com
+#
+###############################################################################
+
+import os
+import errno
+import select
+from threading import Thread
+import warnings
+import traceback
+
+from . import core
+np = core.np
+time = core.time
+
+
+__all__ = ['Source', 'TailSource', 'parse_text', 'parse_binary']
+
+
+def _count_values(text, nlines):
+    """
+    Returns the number of whitespace-separated values that all the
+    ``nlines`` complete lines of the text hold, or ``None`` if they do
+    not all hold the same number
+    """
+    c = np.frombuffer(text.encode('ascii', 'replace'), dtype=np.uint8)
+    space = (c == 32) | (c == 9) | (c == 13) | (c == 10)
+    # first character of each value
+    start = ~space
+    start[1:] &= space[:-1]
+    counts = np.bincount(np.cumsum(c == 10)[start], minlength=nlines+1)
+    if nlines == 0 or counts[nlines] != 0 \
+            or (counts[:nlines] != counts[0]).any():
+        return None
+    return counts[0]
+
+
+def parse_text(block, ncols=1, sep=None, dtype=float):
+    """
+    Parses a bytes-block of complete text lines of ``ncols`` numeric
+    values separated by ``sep`` (whitespace if ``None``) in one
+    vectorized call. Lines that do not hold exactly ``ncols`` values
+    are skipped.
+    Returns a (nlines, ncols) array
+    """
+    text = block.decode('ascii', 'replace')
+    if sep is not None:
+        text = text.replace(sep, ' ')
+    nlines = text.count('\n')
+    with warnings.catch_warnings():
+        # older numpy warn on non-numeric data, newer raise
+        warnings.simplefilter('ignore')
+        data = None
+        if _count_values(text, nlines) == ncols:
+            try:
+                data = np.fromstring(text, dtype=dtype, sep=' ')
+            except ValueError:
+                pass
+        if data is not None and data.size == nlines*ncols:
+            return data.reshape((nlines, ncols))
+        # some lines are malformed, go the slow way
+        rows = []
+        for line in text.splitlines():
+            try:
+                row = np.fromstring(line, dtype=dtype, sep=' ')
+            except ValueError:
+                continue
+            if row.size == ncols:
+                rows.append(row)
+    if len(rows) == 0:
+        return np.empty((0, ncols), dtype=dtype)
+    return np.vstack(rows)
+
+
+def parse_binary(block, ncols=1, dtype=float):
+    """
+    Decodes a bytes-block of complete binary records of ``ncols``
+    values of type ``dtype``, without copy.
+    Returns a (nrecords, ncols) read-only view of the block, to be
+    copied if modified
+    """
+    return np.frombuffer(block, dtype=dtype).reshape((-1, ncols))
+
+
+class Source(object):
+    def __init__(self, fd, callback, ncols=1, sep=None, dtype=float,
+                 binary=False, chunk=65536, timeout=0.1):
+        """
+        A non-blocking, buffered reader of numeric data from a
+        file-descriptor (serial port, pipe, pseudo-terminal, socket),
+        delivering it in batches.
+
+        All available bytes are read at once and all complete lines (or
+        records if ``binary``) are parsed in a single vectorized call,
+        such that there is no per-line python overhead. Incomplete lines
+        are kept for the next read.
+
+        Use :py:func:`~joystick.source.Source.start` to read in a
+        daemon-thread, or call :py:func:`~joystick.source.Source.poll`
+        yourself, e.g. in a method decorated with
+        :py:func:`~joystick.deco.deco_infinite_loop`.
+
+        Args:
+          * fd (int or object with fileno()): the file-descriptor to
+            read from, e.g. a ``serial.Serial`` or ``subprocess.stdout``
+          * callback (callable): called with each batch of data, a
+            (n, ncols) array, e.g. to push it to a frame
+          * ncols (int) [optional]: the number of values per line
+          * sep (str or None) [optional]: the values separator, or
+            ``None`` for whitespace
+          * dtype (numpy dtype) [optional]: the type of the values
+          * binary (bool) [optional]: if ``True``, the data is made of
+            raw records of ``ncols`` values of type ``dtype`` instead of
+            text lines
+          * chunk (int) [optional]: the size in bytes of each read
+          * timeout (float) [optional]: the maximum time (sec) to wait
+            for data in :py:func:`~joystick.source.Source.poll`
+        """
+        self._fd = fd if isinstance(fd, int) else fd.fileno()
+        self.callback = callback
+        self._ncols = int(ncols)
+        self._sep = sep
+        self._dtype = np.dtype(dtype)
+        self._binary = bool(binary)
+        self._recsize = self._ncols*self._dtype.itemsize
+        self._chunk = int(chunk)
+        self.timeout = float(timeout)
+        self._pending = b''
+        self._running = False
+        self._thread = None
+        self.eof = False
+        self._set_nonblocking()
+
+    def _set_nonblocking(self):
+        try:
+            import fcntl
+        except ImportError:  # not posix, reads may block up to chunk
+            return
+        flags = fcntl.fcntl(self._fd, fcntl.F_GETFL)
+        fcntl.fcntl(self._fd, fcntl.F_SETFL, flags | os.O_NONBLOCK)
+
+    @property
+    def running(self):
+        """
+        Returns ``True`` if the reading thread is running. Read-only.
+        """
+        return self._running
+
+    @running.setter
+    def running(self, value):
+        print("Read-only.")
+
+    def _wait(self):
+        """
+        Waits until data is available, at most ``timeout`` seconds
+        """
+        select.select([self._fd], [], [], self.timeout)
+
+    def _read_available(self):
+        """
+        Returns all bytes available without blocking
+        """
+        chunks = []
+        while True:
+            try:
+                chunk = os.read(self._fd, self._chunk)
+            except (OSError, IOError) as e:
+                if e.errno in (errno.EAGAIN, errno.EWOULDBLOCK):
+                    break
+                if e.errno == errno.EIO:  # pseudo-terminal closed
+                    self.eof = True
+                    break
+                raise
+            if not chunk:
+                self.eof = True
+                break
+            chunks.append(chunk)
+            if len(chunk) < self._chunk:
+                break
+        return b''.join(chunks)
+
+    def _split(self, block):
+        """
+        Returns the complete part of block, keeps the rest pending
+        """
+        block = self._pending + block
+        if self._binary:
+            cut = len(block) - len(block) % self._recsize
+        else:
+            cut = block.rfind(b'\n') + 1
+        self._pending = block[cut:]
+        return block[:cut]
+
+    def _parse(self, block):
+        if self._binary:
+            return parse_binary(block, ncols=self._ncols, dtype=self._dtype)
+        return parse_text(block, ncols=self._ncols, sep=self._sep,
+                          dtype=self._dtype)
+
+    def poll(self):
+        """
+        Waits for data (at most ``timeout`` seconds), reads and parses
+        all of it and sends it to the callback.
+        Returns the number of lines or records delivered
+        """
+        self._wait()
+        block = self._split(self._read_available())
+        if not block:
+            return 0
+        data = self._parse(block)
+        if data.shape[0] > 0:
+            self.callback(data)
+        return data.shape[0]
+
+    def _loop(self):
+        """
+        The function looping in the reading thread
+        """
+        while self._running:
+            try:
+                self.poll()
+            except Exception:
+                traceback.print_exc()
+                self._running = False
+            if self.eof:
+                self._running = False
+
+    def start(self):
+        """
+        Starts reading in a daemon-thread, if not already running
+        """
+        if self._running:
+            return
+        self._running = True
+        self._thread = Thread(target=self._loop)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stops the reading thread
+        """
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(2*self.timeout)
+            self._thread = None
+
+
+class TailSource(Source):
+    def __init__(self, path, callback, ncols=1, sep=None, dtype=float,
+                 binary=False, chunk=65536, timeout=0.1, from_start=False):
+        """
+        Same as :py:class:`~joystick.source.Source`, reading the data
+        appended to a growing file (like ``tail -f``). If the file is
+        truncated, reading starts again from its beginning.
+
+        Args:
+          * path (str): the path of the file
+          * from_start (bool) [optional]: if ``True``, the data already
+            in the file is delivered as well
+
+        See :py:class:`~joystick.source.Source` for the other
+        parameters.
+        """
+        self._path = path
+        self._file = open(path, 'rb')
+        if not from_start:
+            self._file.seek(0, os.SEEK_END)
+        super(TailSource, self).__init__(fd=self._file, callback=callback,
+                 ncols=ncols, sep=sep, dtype=dtype, binary=binary,
+                 chunk=chunk, timeout=timeout)
+
+    def _set_nonblocking(self):
+        # regular files never block
+        pass
+
+    def _wait(self):
+        # regular files are always ready, check for new data instead
+        pos = self._file.tell()
+        size = os.fstat(self._fd).st_size
+        if size < pos:  # truncated
+            self._file.seek(0)
+            self._pending = b''
+        elif size == pos:
+            time.sleep(self.timeout)
+
+    def _read_available(self):
+        # end of file only means no new data yet
+        return self._file.read()
+
+    def close(self):
+        """
+        Stops reading and closes the file
+        """
+        self.stop()
+        self._file.close()
@@ -0,0 +1,264 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+###############################################################################
+#  
+#  JOYSTICK - Real-time plotting and logging while console controlling
+#  Copyright (C) 2016  Guillaume Schworer
+#  
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#  
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#  
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#  
+#  For any information, bug report, idea, donation, hug, beer, please contact
+#    guillaume.schworer@gmail.com
+#
+###############################################################################
+
+from . import core
+np = core.np
+from .graph import Graph
+
+
+__all__ = ['Spectrum']
+
+
+# window functions by name, as given to np
+WINDOWS = {'hann': np.hanning,
+           'hanning': np.hanning,
+           'hamming': np.hamming,
+           'blackman': np.blackman,
+           'bartlett': np.bartlett,
+           'boxcar': np.ones}
+
+
+class Spectrum(Graph):
+    def __init__(self, name, freq_up=1, pos=(50, 50), size=(400, 400),
+                 screen_relative=False, nfft=1024, overlap=0.5,
+                 window='hann', fs=1., navg=8, db=True, fmt="b-",
+                 bgcol='w', axrect=(0.1, 0.1, 0.9, 0.9), grid='k',
+                 xylim=(None, None, None, None), axmargin=(1., 1.1),
+                 **kwargs):
+        """
+        Initialises a spectrum-frame, showing the power spectral density
+        of a data stream. Use
+        :py:func:`~joystick.spectrum.Spectrum.add_data` to push new
+        samples: only the segments of ``nfft`` samples completed by the
+        new samples are Fourier-transformed, and the ``navg`` last ones
+        are averaged (Welch's method). The cost of an update does not
+        depend on the quantity of data already received.
+
+        Args:
+          * name (str): the frame name
+          * freq_up (float or None): the frequency of update of the frame,
+            between 1e-3 and 1e3 Hz, or ``None`` for no update
+          * pos (px or %) [optional]: left-top corner position of the
+            frame, see ``screen_relative``
+          * size (px or %) [optional]: width-height dimension of the
+            frame, see ``screen_relative``
+          * screen_relative (bool) [optional]: set to ``True`` to give
+            ``pos`` and ``size`` as a % of the screen size, or ``False``
+            to give then as pixels
+          * nfft (int) [optional]: the number of samples of a segment
+          * overlap (float) [optional]: the overlap fraction of two
+            consecutive segments, in [0, 1)
+          * window (str or vector) [optional]: the window function, in
+            ``WINDOWS`` or given as a vector of ``nfft`` elements
+          * fs (float) [optional]: the sampling frequency
+          * navg (int) [optional]: the number of last segments averaged
+          * db (bool) [optional]: if ``True``, shows the density in dB
+          * fmt (str) [optional]: the format of the line as in
+            ``plt.plot(x, y, fmt)``
+          * bgcol (color) [optional]: the background color of the graph
+          * axrect (list of 4 floats) [optional]: the axes bounds (l,b,w,h)
+            as in ``plt.figure.add_axes(rect=(l,b,w,h))``
+          * grid (color or None) [optional]: the grid color, or no grid if
+            ``None``
+          * xylim (list of 4 floats or None) [optional]: the values of the
+            axes limits (xmin, xmax, ymin, ymax), where any value can take
+            ``None`` to be recalculated according to the data at each update
+          * axmargin (tuple of 2 floats) [optional]: a expand factor to
+            increase the (x, y) axes limits when they are automatically
+            calculated from the data (i.e. some xylim is ``None``)
+
+        Kwargs:
+          * Any non-abbreviated parameter accepted by ``figure.add_axes``
+            (eg. ``xlabel``, ``ylabel``, ``title``, ``aspect``) and ``plt.plot``
+          * Will be passed to the optional custom methods decorated
+            with :py:func:`~joystick.deco.deco_callit`
+        """
+        kwargs['nfft'] = nfft
+        kwargs['overlap'] = overlap
+        kwargs['window'] = window
+        kwargs['fs'] = fs
+        kwargs['navg'] = navg
+        kwargs['db'] = db
+        self._kwargs = kwargs
+        super(Spectrum, self).__init__(name=name, freq_up=freq_up,
+                 pos=pos, size=size, screen_relative=screen_relative,
+                 xnpts=1, fmt=fmt, bgcol=bgcol, axrect=axrect, grid=grid,
+                 xylim=xylim, xnptsmax=1, axmargin=axmargin, **self._kwargs)
+        self._preupdate_fcts.insert(0, '_push_spectrum')
+
+    def _init_base(self, **kwargs):
+        """
+        Separate function from __init__ for re-initialization purpose
+        """
+        before, after = self._extract_callit('init')
+        self._callmthd(before, **kwargs)
+        self._init_basic_graph(**kwargs)
+        self._init_history(kwargs.pop('history'), nlines=1)
+        self._init_spectrum(kwargs.pop('nfft'), kwargs.pop('overlap'),
+                            kwargs.pop('window'), kwargs.pop('fs'),
+                            kwargs.pop('navg'), kwargs.pop('db'))
+        # the frequency axis is set once
+        self._plot, = self.ax.plot(self._freqs, np.zeros(self._freqs.size),
+                                   kwargs.pop('fmt'),
+                                   **core.linekwargs(kwargs))
+        self._dirty = True
+        self._push_spectrum()
+        self._scale_axes(force=True)
+        self._callmthd(after, **kwargs)
+
+    def _init_spectrum(self, nfft, overlap, window, fs, navg, db):
+        """
+        Caches the window function, the frequency axis and the density
+        scaling, creates the segment buffers
+        """
+        self._nfft = int(nfft)
+        overlap = float(overlap)
+        if not 0 <= overlap < 1:
+            raise ValueError("'overlap' parameter shall be in [0, 1)")
+        self._step = max(int(round(self._nfft*(1 - overlap))), 1)
+        if isinstance(window, str):
+            if window.lower() not in WINDOWS:
+                raise ValueError("'window' parameter shall be in {}"\
+                                 .format(sorted(WINDOWS)))
+            self._win = WINDOWS[window.lower()](self._nfft)
+        else:
+            self._win = np.asarray(window, dtype=float)
+            if self._win.size != self._nfft:
+                raise ValueError("'window' shall have nfft elements")
+        self._fs = float(fs)
+        self._db = bool(db)
+        self._freqs = np.fft.rfftfreq(self._nfft, 1./self._fs)
+        # one-sided power spectral density
+        self._scale = np.full(self._freqs.size,
+                              2./(self._fs*(self._win**2).sum()))
+        self._scale[0] *= 0.5
+        if self._nfft % 2 == 0:
+            self._scale[-1] *= 0.5
+        self._navg = max(int(navg), 1)
+        self._psds = np.zeros((self._navg, self._freqs.size))
+        self._ipsd = 0
+        self._nsegs = 0
+        self._pending = np.empty(0)
+
+    @property
+    def freqs(self):
+        """
+        The frequency axis. Read-only.
+        """
+        return self._freqs.copy()
+
+    @freqs.setter
+    def freqs(self, value):
+        print("Read-only.")
+
+    @property
+    def nsegs(self):
+        """
+        The number of segments transformed so far. Read-only.
+        """
+        return self._nsegs
+
+    @nsegs.setter
+    def nsegs(self, value):
+        print("Read-only.")
+
+    def add_data(self, values):
+        """
+        Appends new samples (number or vector) to the stream, and
+        transforms the segments they complete
+        """
+        pending = np.r_[self._pending, np.asarray(values, dtype=float).ravel()]
+        if pending.size < self._nfft:
+            self._pending = pending
+            return
+        nseg = (pending.size - self._nfft)//self._step + 1
+        # only the last navg segments contribute to the average
+        skip = max(nseg - self._navg, 0)
+        segs = np.lib.stride_tricks.as_strided(
+                        pending[skip*self._step:],
+                        shape=(nseg - skip, self._nfft),
+                        strides=(self._step*pending.strides[0],
+                                 pending.strides[0]))
+        psd = np.abs(np.fft.rfft(segs*self._win, axis=1))**2 * self._scale
+        pos = (self._ipsd + np.arange(psd.shape[0])) % self._navg
+        self._psds[pos] = psd
+        self._ipsd = (self._ipsd + psd.shape[0]) % self._navg
+        self._nsegs += nseg
+        # keep the samples from the start of the next segment
+        self._pending = pending[nseg*self._step:].copy()
+        self._dirty = True
+
+    def clear(self):
+        """
+        Drops all segments and pending samples
+        """
+        self._psds[:] = 0
+        self._ipsd = 0
+        self._nsegs = 0
+        self._pending = np.empty(0)
+        self._dirty = True
+
+    def get_data(self):
+        """
+        Returns the power spectral density, averaged over the last
+        ``navg`` segments
+        """
+        n = min(self._nsegs, self._navg)
+        if n == 0:
+            return np.zeros(self._freqs.size)
+        return self._psds[:n].mean(axis=0)
+
+    def get_xydata(self):
+        """
+        Returns the frequency axis and the power spectral density as
+        displayed (dB or linear)
+        """
+        return self._freqs, self._plot.get_ydata()
+
+    def set_xydata(self, x, y):
+        """
+        Not available for a spectrum, use
+        :py:func:`~joystick.spectrum.Spectrum.add_data`
+        """
+        print("{}Use 'add_data' to feed a spectrum{}" \
+            .format(core.font.red, core.font.normal))
+
+    def _push_spectrum(self):
+        """
+        Sets the averaged density to the line, if new segments were
+        transformed
+        """
+        if not (self.visible and self._dirty):
+            return
+        y = self.get_data()
+        if self._db:
+            y = 10*np.log10(np.maximum(y, 1e-300)) if self._nsegs > 0 else y
+        self._plot.set_ydata(y)
+        self._dirty = False
+
+    def _get_xydata_minmax(self):
+        y = self._plot.get_ydata()
+        return self._freqs[0], self._freqs[-1], np.min(y), np.max(y)
@@ -0,0 +1,274 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+###############################################################################
+#  
+#  JOYSTICK - Real-time plotting and logging while console controlling
+#  Copyright (C) 2016  Guillaume Schworer
+#  
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#  
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#  
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#  
+#  For any information, bug report, idea, donation, hug, beer, please contact
+#    guillaume.schworer@gmail.com
+#
+###############################################################################
+
+import os
+import tempfile
+import weakref
+
+from . import core
+np = core.np
+
+
+__all__ = ['SpillBuffer']
+
+
+def _remove(path):
+    """
+    Deletes the temporary spill file, if still there
+    """
+    if os.path.exists(path):
+        os.remove(path)
+
+
+class SpillBuffer(object):
+    def __init__(self, path=None, hot=100000, block=None, dtype=float,
+                 ncols=1, tcol=0):
+        """
+        An append-only data buffer of unlimited length and constant RAM
+        usage: the most recent ``hot`` rows are kept in memory, older
+        rows are spilled to a memory-mapped file by blocks of ``block``
+        rows.
+
+        It can be used in place of the numpy vector returned by
+        :py:func:`~joystick.core.add_datapoint` (it records without
+        limit, so ``xnptsmax`` shall not be given):
+
+        >>> self.ydata = SpillBuffer(hot=10000)
+        >>> self.ydata = self.mygraph.add_datapoint(self.ydata, new_data)
+        >>> self.mygraph.set_xydata(self.xdata[-500:], self.ydata[-500:])
+
+        Indexing and slicing (negative indices included) return numpy
+        arrays, reading the spilled part from disk only if needed.
+
+        Args:
+          * path (str or None) [optional]: the file to spill to, a
+            temporary file is created (and deleted at closing, or when
+            the buffer is garbage-collected) if ``None``. Any existing
+            file is overwritten
+          * hot (int) [optional]: the number of rows kept in memory
+          * block (int or None) [optional]: the number of rows spilled
+            at once, ``None`` for ``hot//4``
+          * dtype (numpy dtype) [optional]: the type of the data
+          * ncols (int) [optional]: the number of values per row; with 1,
+            the buffer behaves like a 1-dim vector
+          * tcol (int) [optional]: the column holding the increasing
+            time, for :py:func:`~joystick.spill.SpillBuffer.time_range`
+        """
+        self._hot = max(int(hot), 1)
+        self._block = max(int(self._hot//4 if block is None else block), 1)
+        self._dtype = np.dtype(dtype)
+        self._ncols = int(ncols)
+        self._tcol = int(tcol)
+        self._tmp = path is None
+        self._finalizer = None
+        if self._tmp:
+            fd, path = tempfile.mkstemp(suffix='.spill')
+            os.close(fd)
+            if hasattr(weakref, 'finalize'):  # python >= 3.4
+                self._finalizer = weakref.finalize(self, _remove, path)
+        self._path = path
+        # RAM tail
+        self._ram = np.empty((self._hot + self._block, self._ncols),
+                             dtype=self._dtype)
+        self._nram = 0
+        # disk part
+        self._nspilled = 0
+        self._disk = None
+        self._grow_disk(4*self._block)
+
+    @property
+    def path(self):
+        """
+        The path of the spill file. Read-only.
+        """
+        return self._path
+
+    @path.setter
+    def path(self, value):
+        print("Read-only.")
+
+    @property
+    def hot(self):
+        """
+        The number of rows kept in memory. Read-only.
+        """
+        return self._hot
+
+    @hot.setter
+    def hot(self, value):
+        print("Read-only.")
+
+    @property
+    def nspilled(self):
+        """
+        The number of rows spilled to disk. Read-only.
+        """
+        return self._nspilled
+
+    @nspilled.setter
+    def nspilled(self, value):
+        print("Read-only.")
+
+    def _grow_disk(self, nrows):
+        """
+        Extends the spill file to hold nrows rows and maps it again
+        """
+        if self._disk is not None:
+            self._disk.flush()
+            self._disk = None
+        with open(self._path, 'r+b' if self._nspilled > 0 else 'wb') as f:
+            f.truncate(nrows * self._ncols * self._dtype.itemsize)
+        self._disk = np.memmap(self._path, dtype=self._dtype, mode='r+',
+                               shape=(nrows, self._ncols))
+
+    def __len__(self):
+        return self._nspilled + self._nram
+
+    @property
+    def shape(self):
+        if self._ncols == 1:
+            return (len(self),)
+        return (len(self), self._ncols)
+
+    @property
+    def size(self):
+        return len(self) * self._ncols
+
+    def _spill(self):
+        """
+        Moves the oldest blocks of the RAM tail to disk
+        """
+        nblocks = (self._nram - self._hot) // self._block
+        if nblocks <= 0:
+            return
+        n = nblocks * self._block
+        if self._nspilled + n > self._disk.shape[0]:
+            self._grow_disk(max(2*self._disk.shape[0], self._nspilled + n))
+        self._disk[self._nspilled:self._nspilled+n] = self._ram[:n]
+        self._nspilled += n
+        self._ram[:self._nram-n] = self._ram[n:self._nram]
+        self._nram -= n
+
+    def append(self, data):
+        """
+        Appends data (a number, a 1-dim vector or, with several
+        columns, a row or (n, ncols) array)
+        """
+        data = np.asarray(data, dtype=self._dtype).reshape((-1, self._ncols))
+        while data.shape[0] > 0:
+            n = min(data.shape[0], self._ram.shape[0] - self._nram)
+            self._ram[self._nram:self._nram+n] = data[:n]
+            self._nram += n
+            data = data[n:]
+            self._spill()
+        return self
+
+    def add_datapoint(self, new_data):
+        """
+        Appends new_data and returns the buffer itself, see
+        :py:func:`~joystick.core.add_datapoint`
+        """
+        return self.append(new_data)
+
+    def _rows(self, start, stop):
+        """
+        Returns rows start to stop (positive, stop excluded)
+        """
+        parts = []
+        if start < self._nspilled:
+            parts.append(self._disk[start:min(stop, self._nspilled)])
+        if stop > self._nspilled:
+            parts.append(self._ram[max(start-self._nspilled, 0):
+                                   stop-self._nspilled])
+        if len(parts) == 0:
+            return np.empty((0, self._ncols), dtype=self._dtype)
+        elif len(parts) == 1:
+            return np.array(parts[0])
+        return np.concatenate(parts)
+
+    def _out(self, rows):
+        return rows[:, 0] if self._ncols == 1 else rows
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            start, stop, step = idx.indices(len(self))
+            if step < 0 or stop <= start:
+                return self._out(self._rows(0, len(self))[idx])
+            return self._out(self._rows(start, stop)[::step])
+        idx = int(idx)
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError("index out of range")
+        return self._out(self._rows(idx, idx+1))[0]
+
+    def __array__(self, dtype=None, copy=None):
+        # reads the whole buffer, disk included
+        ret = self[:]
+        return ret if dtype is None else ret.astype(dtype)
+
+    def time_index(self, t, side='left'):
+        """
+        Returns the row index where time ``t`` would be inserted, as in
+        ``np.searchsorted``, in O(log n) reads
+        """
+        if self._nspilled > 0 and \
+                self._disk[self._nspilled-1, self._tcol] >= t:
+            return int(np.searchsorted(
+                            self._disk[:self._nspilled, self._tcol], t,
+                            side=side))
+        return self._nspilled + int(np.searchsorted(
+                            self._ram[:self._nram, self._tcol], t,
+                            side=side))
+
+    def time_range(self, tmin=None, tmax=None):
+        """
+        Returns the rows with time in [tmin, tmax], ``None`` meaning
+        unbounded
+        """
+        start = 0 if tmin is None else self.time_index(tmin)
+        stop = len(self) if tmax is None \
+                         else self.time_index(tmax, side='right')
+        return self._out(self._rows(start, stop))
+
+    def flush(self):
+        """
+        Writes the spilled data to disk
+        """
+        self._disk.flush()
+
+    def close(self):
+        """
+        Flushes and releases the spill file, deletes it if temporary
+        """
+        if self._disk is None:
+            return
+        self._disk.flush()
+        self._disk = None
+        if self._finalizer is not None:
+            self._finalizer()
+        elif self._tmp:
+            _remove(self._path)
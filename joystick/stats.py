@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+###############################################################################
+#  
+#  JOYSTICK - Real-time plotting and logging while console controlling
+#  Copyright (C) 2016  Guillaume Schworer
+#  
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#  
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#  
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#  
+#  For any information, bug report, idea, donation, hug, beer, please contact
+#    guillaume.schworer@gmail.com
+#
+###############################################################################
+
+from . import core
+np = core.np
+
+
+__all__ = ['RollingStats']
+
+
+class RollingStats(object):
+    def __init__(self, window):
+        """
+        Rolling mean and standard deviation over the last ``window``
+        values, maintained incrementally with Welford's update (the
+        value leaving the window is removed as the new one is added).
+        A batch of values is processed with vectorized cumulative sums,
+        its cost does not depend on ``window``.
+
+        Args:
+          * window (int): the number of values in the rolling window
+        """
+        self._wsize = int(window)
+        if self._wsize < 1:
+            raise ValueError("'window' must be a positive integer")
+        self._ring = np.zeros(self._wsize)
+        self._pos = 0
+        self._count = 0
+        self._mean = 0.
+        self._m2 = 0.
+
+    @property
+    def window(self):
+        """
+        The number of values in the rolling window. Read-only.
+        """
+        return self._wsize
+
+    @window.setter
+    def window(self, value):
+        print("Read-only.")
+
+    @property
+    def count(self):
+        """
+        The number of values currently in the window. Read-only.
+        """
+        return self._count
+
+    @count.setter
+    def count(self, value):
+        print("Read-only.")
+
+    @property
+    def mean(self):
+        """
+        The current rolling mean. Read-only.
+        """
+        return self._mean
+
+    @mean.setter
+    def mean(self, value):
+        print("Read-only.")
+
+    @property
+    def std(self):
+        """
+        The current rolling standard deviation. Read-only.
+        """
+        return np.sqrt(self._m2/self._count) if self._count > 0 else 0.
+
+    @std.setter
+    def std(self, value):
+        print("Read-only.")
+
+    def append(self, values):
+        """
+        Adds a batch of values (number or vector) to the window.
+        Returns the rolling mean and standard deviation after each of
+        the values, as two vectors
+        """
+        x = np.atleast_1d(np.asarray(values, dtype=float)).ravel()
+        k, w, c = x.size, self._wsize, self._count
+        if k == 0:
+            return np.empty(0), np.empty(0)
+        # value leaving the window as each new value comes in, taken
+        # from the oldest values of the window then from the batch
+        out = c + np.arange(k) >= w
+        nout = int(out.sum())
+        nold = min(c, nout)
+        seq = np.r_[self._ring[(self._pos - c + np.arange(nold)) % w],
+                    x[:nout-nold]]
+        rem = np.zeros(k)
+        rem[out] = seq
+        n = np.minimum(c + np.arange(1, k+1), w).astype(float)
+        # means from cumulative sums of the deviations to the current
+        # mean, whose sum over the window is 0
+        ref = self._mean
+        sums = np.cumsum(x - ref) - np.cumsum(np.where(out, rem-ref, 0.))
+        means = sums/n + ref
+        prev = np.r_[self._mean, means[:-1]]
+        # Welford increments of the sum of squared deviations
+        incr = np.where(out, (x - rem)*(x - means + rem - prev),
+                        (x - prev)*(x - means))
+        m2 = np.maximum(self._m2 + np.cumsum(incr), 0.)
+        # update the state
+        last = x[-w:]
+        self._ring[(self._pos + k - last.size + np.arange(last.size)) % w] \
+                = last
+        self._pos = (self._pos + k) % w
+        self._count = int(n[-1])
+        self._mean = means[-1]
+        self._m2 = m2[-1]
+        return means, np.sqrt(m2/n)
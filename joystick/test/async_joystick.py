@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+###############################################################################
+#  
+#  JOYSTICK - Real-time plotting and logging while console controlling
+#  Copyright (C) 2016  Guillaume Schworer
+#  
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#  
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#  
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#  
+#  For any information, bug report, idea, donation, hug, beer, please contact
+#    guillaume.schworer@gmail.com
+#
+###############################################################################
+
+
+# python >= 3.5 only, imported by test_async_loop at run-time
+import asyncio
+import threading
+
+from ..joystick import Joystick
+from ..deco import deco_async_loop, deco_callit
+
+
+class test_async(Joystick):
+    _async_loop = deco_async_loop()
+    _callit = deco_callit()
+
+    @_callit('before', 'init')
+    def _init_data(self, *args, **kwargs):
+        self.threads = set()
+        self.ticks = 0
+        self.cancelled = False
+        self.spins = [0, 0]
+
+    @_async_loop(wait_time=0.01)
+    async def _tick(self):
+        self.threads.add(threading.current_thread().ident)
+        self.ticks += 1
+
+    @_async_loop()
+    async def _spin_a(self):
+        self.spins[0] += 1
+
+    @_async_loop()
+    async def _spin_b(self):
+        self.spins[1] += 1
+
+    @_async_loop()
+    async def _wait_forever(self):
+        try:
+            await asyncio.sleep(3600)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
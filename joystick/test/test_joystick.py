@@ -26,15 +26,34 @@
 
 
 import numpy as np
+import sys
 import time
+import threading
+import os
+import tempfile
 
 from ..joystick import Joystick
-from ..deco import deco_infinite_loop, deco_callit
+from ..deco import deco_infinite_loop, deco_callit, deco_thread_it, \
+                   deco_process_loop
+from ..pool import ThreadPool, PoolFull
+from ..source import Source, TailSource, parse_text
+from ..ingest import IngestServer, IngestClient
+from ..history import TieredHistory
+from ..spill import SpillBuffer
+from ..resample import Aligner
+from ..stats import RollingStats
+from ..trigger import Trigger
 from ..graph import Graph
 from ..image import Image
 from ..text import Text
 from ..graphmulti import GraphMulti
 from ..scatter import Scatter
+from ..histogram import Histogram
+from ..waterfall import Waterfall
+from ..spectrum import Spectrum
+from ..persistence import Persistence
+from ..colorbarmanager import ColorbarManager
+from ..render import ThreadRenderer, ProcessRenderer, RenderFarm
 from .. import core
 
 
@@ -57,13 +76,21 @@ def _generate_fake_data_base(self):
     t = np.round(self.xdata-self._t0, 1)
     # push new data to the graph
     self.mygraph.set_xydata(t, self.ydata1)
+    self.mygraph.add_stats(t[-1], self.ydata1[-1])
     self.mmgraph.set_xydata([t, t], [self.ydata1, self.ydata1**2])
     self.myscat.set_xydata(self.ydata1, self.ydata1**2, c=self.ydata1)
+    self.myhist.add_data(np.random.randn(1000))
+    self.mywater.add_rows(np.random.random((5, 64)))
+    self.myspec.add_data(np.sin(np.arange(1000)*0.3) + np.random.random(1000))
+    self.mydens.add_points(np.random.randn(5000), np.random.randn(5000))
+    self.mypers.add_sweeps(np.sin(np.linspace(0, 6, 100))
+                           + 0.1*np.random.randn(20, 100))
 
 
 def _generate_fake_image_base(self):
     data = np.random.random((10,10))**3
     self.myimg.set_data(data)
+    self.myimg.update_region(2, 3, np.random.random((4, 4)))
     self.mytext.add_text('Updated graph, mean: {:.3f}'.format(data.mean()))
 
 
@@ -78,7 +105,8 @@ def _build_frames_base(self):
     self.mygraph = self.add_frame(
                     Graph(name="Graph", size=(500, 500),
                           pos=(50, 50), fmt="go-", xnpts=15,
-                          freq_up=7, bgcol="y", xylim=(0,10,0,1)))
+                          freq_up=7, bgcol="y", xylim=(0,10,0,1),
+                          stats=5))
     self.myimg = self.add_frame(
                     Image(name="Image", size=(100, 100), pos=(50, 600),
                           axrect=(0,0,1,1), freq_up=3,
@@ -87,6 +115,27 @@ def _build_frames_base(self):
                     Scatter(name="scatter", size=(500, 500), pos=(600, 350),
                                xnpts=15, freq_up=7, bgcol="k", cmap='Reds',
                                s=80, xylim=(0,10,0,1), grid='w'))
+    self.myhist = self.add_frame(
+                    Histogram(name="Histogram", size=(300, 300),
+                              pos=(600, 600), freq_up=3, bins=30,
+                              hrange=(-3, 3), decay=5,
+                              render="thread"))
+    self.mywater = self.add_frame(
+                    Waterfall(name="Waterfall", size=(300, 300),
+                              pos=(300, 600), freq_up=3, nrows=50,
+                              ncols=64))
+    self.myspec = self.add_frame(
+                    Spectrum(name="Spectrum", size=(300, 300),
+                             pos=(900, 600), freq_up=3, nfft=128,
+                             render="process"))
+    self.mypers = self.add_frame(
+                    Persistence(name="Persistence", size=(300, 300),
+                                pos=(900, 300), freq_up=3, nrows=50,
+                                ncols=100, yrange=(-1.5, 1.5), decay=2))
+    self.mydens = self.add_frame(
+                    Scatter(name="Density", size=(300, 300), pos=(600, 900),
+                            xnpts=100000, xnptsmax=100000, freq_up=3,
+                            density=True))
 
 class test(Joystick):
     _infinite_loop = deco_infinite_loop()
@@ -113,6 +162,18 @@ class test(Joystick):
     def _generate_fake_image(self):
         _generate_fake_image_base(self)
 
+class test_process(Joystick):
+    _process_loop = deco_process_loop()
+
+    @_process_loop(wait_time=0.01, shape=(2, 10), callback='_got_data')
+    def _generate_fake_data(out):
+        out[0] = np.arange(10)
+        out[1] = np.random.random(10)
+        return 5
+
+    def _got_data(self, data):
+        self.data = data
+
 def test_create():
     t = test()
     time.sleep(1)
@@ -144,3 +205,536 @@ def test_play():
     t.myimg.vmax = 0.75
     t.stop()
     t.exit()
+
+def test_thread_it():
+    @deco_thread_it
+    def double(x):
+        time.sleep(0.01)
+        return 2*x
+    futs = [double(i) for i in range(20)]
+    assert [item.result() for item in futs] == list(range(0, 40, 2))
+    pool = ThreadPool(max_workers=1, max_queue=1, policy='reject')
+    @deco_thread_it(pool=pool)
+    def sleepy():
+        time.sleep(0.2)
+    sleepy()
+    time.sleep(0.05)
+    sleepy()
+    try:
+        sleepy()
+    except PoolFull:
+        pass
+    else:
+        raise AssertionError("PoolFull not raised")
+    pool.policy = 'drop'
+    assert sleepy().cancelled()
+    try:
+        pool._submit(sleepy, policy='ignore')
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("ValueError not raised")
+    # shutting down with a full queue does not block
+    pool.shutdown(wait=False)
+    pool.shutdown()
+
+def test_process_loop():
+    t = test_process()
+    t.start()
+    time.sleep(1)
+    t.stop()
+    assert t.data.shape == (2, 5)
+    assert (t.data[0] == np.arange(5)).all()
+    t.exit()
+
+def test_async_loop():
+    if sys.version_info < (3, 5):
+        return
+    from .async_joystick import test_async
+    from ..asyncloop import get_async_loop
+    t = test_async()
+    t.start()
+    time.sleep(0.5)
+    t.stop()
+    time.sleep(0.1)
+    ticks = t.ticks
+    assert ticks > 5
+    # loops without wait_time do not starve each other
+    assert min(t.spins) > 100
+    # all coroutines are awaited on the shared loop thread
+    idents = []
+    get_async_loop().call_soon_threadsafe(
+        lambda: idents.append(threading.current_thread().ident))
+    time.sleep(0.1)
+    assert t.threads == set(idents)
+    assert threading.current_thread().ident not in t.threads
+    assert t.cancelled and t._async_tasks == []
+    time.sleep(0.1)
+    assert t.ticks == ticks
+    t.exit()
+
+def test_source():
+    master, slave = os.openpty()
+    got = []
+    src = Source(master, got.append, ncols=2, sep=',', timeout=0.05)
+    src.start()
+    os.write(slave, b'1,2\n3,4\nbad\n5,')
+    os.write(slave, b'6\n')
+    time.sleep(0.5)
+    src.stop()
+    os.close(slave)
+    os.close(master)
+    assert (np.vstack(got) == [[1, 2], [3, 4], [5, 6]]).all()
+    fd, path = tempfile.mkstemp()
+    os.write(fd, b'0 0\n')
+    got = []
+    src = TailSource(path, got.append, ncols=2, timeout=0.05)
+    os.write(fd, b'7 8\n')
+    assert src.poll() == 1
+    os.close(fd)
+    src.close()
+    os.remove(path)
+    assert (got[0] == [[7, 8]]).all()
+    # a short and a long line do not shift the next ones
+    data = parse_text(b'1 2\n3\n4 5 6\n7 8\n', ncols=2)
+    assert (data == [[1, 2], [7, 8]]).all()
+
+def test_ingest():
+    for udp in [False, True]:
+        got = []
+        srv = IngestServer(udp=udp, bufsize=64)
+        srv.register(2, lambda data: got.append(data.copy()))
+        srv.start()
+        client = IngestClient(port=srv.address[1], udp=udp)
+        client.send(2, np.arange(5, dtype='f4'))
+        client.send(2, np.arange(100, dtype='i8'))
+        client.send(7, np.arange(3))
+        time.sleep(0.5)
+        client.close()
+        srv.close()
+        got = np.concatenate(got)
+        assert got.size == 105
+        assert (got[5:] == np.arange(100)).all()
+    # pending datagrams are delivered in one batch
+    got = []
+    srv = IngestServer(udp=True)
+    srv.register(1, lambda data: got.append(data.copy()))
+    client = IngestClient(port=srv.address[1], udp=True)
+    for i in range(50):
+        client.send(1, np.arange(10))
+    srv.start()
+    time.sleep(0.3)
+    client.close()
+    srv.close()
+    assert len(got) == 1 and got[0].size == 500
+
+def test_history():
+    hist = TieredHistory(nfull=100, ntiers=2, factor=10)
+    x = np.arange(5000.)
+    hist.append(x, x)
+    assert len(hist) == 100
+    assert hist.select(4950, 5000, npts=100)[0] == 0
+    assert hist.select(4000, 5000, npts=200)[0] == 1
+    x, y = hist.view(0, 5000, npts=200)
+    assert x.size <= 200
+    assert y.min() == 0 and y.max() == 4999
+
+def test_spill():
+    buf = SpillBuffer(hot=100, block=10)
+    for i in range(50):
+        buf = core.add_datapoint(buf, np.arange(i*37, (i+1)*37))
+    assert len(buf) == 50*37
+    assert buf.nspilled > 0
+    assert (buf[:] == np.arange(50*37)).all()
+    assert (buf[-5:] == np.arange(50*37-5, 50*37)).all()
+    assert (buf.time_range(10, 20) == np.arange(10, 21)).all()
+    try:
+        core.add_datapoint(buf, 1., xnptsmax=10)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("ValueError not raised")
+    buf.close()
+    assert not os.path.exists(buf.path)
+    # the temporary file is deleted without close
+    buf = SpillBuffer(hot=10, block=5)
+    buf.append(np.arange(100))
+    path = buf.path
+    del buf
+    assert not os.path.exists(path)
+
+def test_xydatapoint():
+    x = np.arange(10.)
+    x, y = core.add_xydatapoint(x, x, [10, 11], [10, 11], span=3.)
+    assert (x == [8, 9, 10, 11]).all() and (y == x).all()
+    x, y = core.add_xydatapoint(x, y, 12, 12, xnptsmax=2)
+    assert (x == [11, 12]).all()
+    # appended in place to the same storage, older vectors unchanged
+    x2, y2 = core.add_xydatapoint(x, y, 13, 13)
+    x3, y3 = core.add_xydatapoint(x, y, 14, 14)
+    assert x2.base is x.base and x3.base is not x.base
+    assert (x2 == [11, 12, 13]).all() and (x3 == [11, 12, 14]).all()
+    for i in range(1000):
+        x2, y2 = core.add_xydatapoint(x2, y2, 15+i, 15+i, span=10.)
+    assert (x2 == np.arange(1004, 1015)).all() and (y2 == x2).all()
+    assert x2.base.size < 100
+    assert core.window_start(np.array([0, 1, 5, 6]), 4.5) == 2
+
+def test_uniformx():
+    ux = core.UniformX(start=10, step=0.5)
+    assert (ux.values(2, 5) == [11, 11.5, 12]).all()
+    assert ux.extent(2, 5) == (11, 12)
+    assert ux.window_start(100, 2.) == 95
+
+def test_aligner():
+    al = Aligner(2, 1.)
+    al.add(0, [0, 2, 4], [0, 2, 4])
+    al.add(1, np.arange(0, 3.5, 0.5), 1)
+    t, v = al.align()
+    assert (t == [0, 1, 2, 3]).all()
+    assert (v[0] == t).all() and (v[1] == 1).all()
+    assert al.align()[0].size == 0
+    # grid starting before the samples of the channels
+    for method in ['interp', 'hold']:
+        al = Aligner(2, 1., method=method, t0=0.)
+        al.add(0, np.arange(10., 20.), 1.)
+        al.add(1, np.arange(10., 20.), 100.)
+        t, v = al.align()
+        assert (v[0] == 1).all() and (v[1] == 100).all()
+    al = Aligner(1, 1., method='hold')
+    al.add(0, [0, 1.5, 3], [1, 2, 3])
+    assert (al.align()[1] == [[1, 1, 2, 3]]).all()
+
+def test_rolling_stats():
+    x = np.random.random(100)
+    rs = RollingStats(10)
+    mean, std = rs.append(x[:37])
+    mean2, std2 = rs.append(x[37:])
+    assert np.allclose(mean2[-1], x[-10:].mean())
+    assert np.allclose(std2[-1], x[-10:].std())
+    assert np.allclose(mean[5], x[:6].mean())
+    assert rs.count == 10
+
+def test_trigger():
+    x = np.sin(2*np.pi*np.arange(1000)/100.)
+    tr = Trigger(level=0.5, pre=10, post=40, mode='normal')
+    sweeps = np.concatenate([tr.push(x[i:i+77]) for i in range(0, 1000, 77)])
+    assert sweeps.shape == (9, 50)
+    assert np.allclose(sweeps, sweeps[0])
+    assert sweeps[0, 9] < 0.5 <= sweeps[0, 10]
+    tr = Trigger(level=0.5, pre=10, post=40, holdoff=250, mode='single')
+    assert tr.push(x).shape[0] == 1 and not tr.armed
+    # disarmed: the crossings are ignored, the buffer does not grow
+    for i in range(100):
+        assert tr.push(x).shape[0] == 0
+    assert tr._buf.size <= tr.npts
+    # re-armed: only the new crossings trigger
+    tr.arm()
+    y = np.r_[np.zeros(30), np.ones(70)]
+    sweeps = tr.push(y)
+    assert sweeps.shape[0] == 1 and not tr.armed
+    assert (sweeps[0] == y[20:70]).all()
+    tr = Trigger(level=2, pre=10, post=40, mode='auto')
+    assert tr.push(x[:60]).shape[0] == 1
+
+def _headless(cls):
+    """
+    A frame without window nor figure, to test its numeric core
+    """
+    return cls.__new__(cls)
+
+def test_histogram_counts():
+    x = np.random.randn(1000)
+    for bins in [20, np.linspace(-3, 3, 21)**3/9.]:
+        h = _headless(Histogram)
+        h._init_bins(bins, (-3, 3), None, 50)
+        edges = h.edges
+        for i, j in [(0, 7), (7, 30), (30, 130), (130, 977), (977, 1000)]:
+            h.add_data(x[i:j])
+            expected = np.histogram(x[max(j-50, 0):j], bins=edges)[0]
+            assert (h.get_data() == expected).all()
+    h = _headless(Histogram)
+    h._init_bins(10, (-3, 3), 2., None)
+    h.add_data(x)
+    expected = np.histogram(x, bins=h.edges)[0]
+    # one half-life later
+    h._tlast -= 2.
+    assert np.allclose(h.get_data(), 0.5*expected, rtol=1e-3)
+
+def test_spectrum_welch():
+    fs, nfft, step, navg = 1000., 256, 128, 4
+    t = np.arange(5000)/fs
+    # sine on a frequency bin, of power 2**2/2
+    x = 2*np.sin(2*np.pi*fs*32/nfft*t) + 0.01*np.random.randn(t.size)
+    sp = _headless(Spectrum)
+    sp._init_spectrum(nfft, 0.5, 'hann', fs, navg, False)
+    for i in range(0, x.size, 333):
+        sp.add_data(x[i:i+333])
+    # naive Welch on the last navg segments
+    win = np.hanning(nfft)
+    starts = np.arange(0, x.size - nfft + 1, step)[-navg:]
+    psd = np.mean([np.abs(np.fft.rfft(x[i:i+nfft]*win))**2 for i in starts],
+                  axis=0) * 2/(fs*(win**2).sum())
+    psd[[0, -1]] *= 0.5
+    assert sp.nsegs == (x.size - nfft)//step + 1
+    assert np.allclose(sp.get_data(), psd)
+    assert np.argmax(psd) == 32
+    assert np.allclose(psd.sum()*fs/nfft, 2., rtol=1e-2)
+
+def test_persistence_raster():
+    nrows, ncols = 40, 50
+    for npts in [300, 20]:
+        sweeps = np.random.randn(5, npts)
+        pers = _headless(Persistence)
+        pers._counts = np.zeros((nrows, ncols))
+        pers._nsweeps = 0
+        pers._yrange = (-2., 2.)
+        pers._decay = None
+        pers.add_sweeps(sweeps)
+        # naive: each segment lights its run of rows in its column
+        expected = np.zeros((nrows, ncols))
+        for sweep in sweeps:
+            if npts <= ncols:
+                sweep = np.interp(np.linspace(0, npts - 1, ncols + 1),
+                                  np.arange(npts), sweep)
+            rows = np.clip(((sweep + 2)*nrows/4.).astype(int), 0, nrows - 1)
+            nseg = sweep.size - 1
+            for j in range(nseg):
+                lo, hi = sorted(rows[j:j+2])
+                expected[lo:hi+1, j*ncols//nseg] += 1
+        assert (pers._counts == expected).all()
+        assert pers.nsweeps == 5
+
+def test_waterfall_ring():
+    wf = _headless(Waterfall)
+    wf._buffer = np.full((10, 3), np.nan)
+    wf._row = 0
+    wf._nfilled = 0
+    assert wf.get_data().shape == (0, 3)
+    rows = np.random.random((60, 3))
+    n = 0
+    for k in [1, 4, 3, 12, 7, 9, 24]:
+        wf.add_rows(rows[n:n+k])
+        n += k
+        assert (wf.get_data() == rows[max(n-10, 0):n]).all()
+    wf.set_data(rows[:2])
+    assert (wf.get_data() == rows[:2]).all()
+
+def test_scatter_colors():
+    sc = _headless(Scatter)
+    sc._density = False
+    sc._cvals = sc._rgba = None
+    sc._norm = core.matplotlibpyplotNormalize(0, 1)
+    sc._plot = core.mat.figure.Figure().add_subplot(111).scatter(
+                                    [0], [0], c=[0], norm=sc._norm)
+    # appended points: only the new ones are colormapped
+    c = np.random.random(20)
+    sc._set_colors(c)
+    c2 = np.r_[c[5:], np.random.random(5)]
+    assert sc._count_new(c2) == 5
+    sc._set_colors(c2)
+    assert np.allclose(sc._rgba, sc._plot.to_rgba(c2))
+    assert np.allclose(sc._plot.get_facecolor(), sc._plot.to_rgba(c2))
+    # auto-scaled bounds within ctol of the previous ones are kept
+    calls = []
+    sc._update_scalarmappable = lambda: calls.append(1)
+    sc._vmin = sc._vmax = None
+    sc._autoscale = 'exact'
+    sc._smoothing = 0.
+    sc._ctol = 0.1
+    sc._cvals = np.r_[0.05, c2[1:-1].clip(0.05, 0.95), 0.95]
+    sc._scale_colors()
+    assert calls == [] and (sc._norm.vmin, sc._norm.vmax) == (0, 1)
+    sc._cvals = np.r_[0.05, 2.]
+    sc._scale_colors()
+    assert calls == [1] and (sc._norm.vmin, sc._norm.vmax) == (0.05, 2.)
+
+class _BlitCanvas(core.mat.backends.backend_agg.FigureCanvasAgg):
+    """
+    An Agg canvas recording the boxes copied to the screen
+    """
+    def blit(self, bbox=None):
+        self.blitted.append(bbox)
+
+class _SlowLine(core.mat.lines.Line2D):
+    """
+    A line long to draw
+    """
+    drawing = threading.Event()
+
+    def draw(self, renderer):
+        _SlowLine.drawing.set()
+        time.sleep(0.5)
+        super(_SlowLine, self).draw(renderer)
+
+def _headless_image(shape, interpolation=None):
+    im = _headless(Image)
+    im._visible = True
+    im._lock = threading.RLock()
+    im._renderer = None
+    im._fig = core.mat.figure.Figure(figsize=(4, 4), dpi=100)
+    im.ax = im._fig.add_axes((0.1, 0.1, 0.8, 0.8))
+    im.ax.grid(color='w', lw=1)
+    im._canvas = _BlitCanvas(im._fig)
+    im._canvas.blitted = []
+    im._plot = im.ax.imshow(np.random.random(shape), origin='lower',
+                            aspect='auto', interpolation=interpolation,
+                            extent=[-1, 1, -1, 1])
+    im._everset = True
+    im._regions = []
+    im._needs_full = False
+    im._canvas.draw()
+    return im
+
+def test_image_regions():
+    for shape, interpolation, text, partial in [
+                                        ((20, 32), None, False, True),
+                                        ((200, 300), 'nearest', False, True),
+                                        ((200, 300), None, False, False),
+                                        ((20, 32), None, True, False)]:
+        im = _headless_image(shape, interpolation)
+        if text:
+            im.ax.text(0, 0, 'over the image')
+            im._canvas.draw()
+        im.update_region(3, 5, np.random.random((6, 9)))
+        # cut by the image and the axes edges
+        im.update_region(-2, 25, np.random.random((5, 20)))
+        # a region written while the regions are drawn waits for them
+        writers = []
+        draw_regions = im._draw_regions
+
+        def write_while_drawing():
+            writers.append(threading.Thread(target=im.update_region,
+                                            args=(0, 0, np.zeros((2, 2)))))
+            writers[0].start()
+            writers[0].join(0.1)
+            assert writers[0].is_alive()
+            draw_regions()
+        im._draw_regions = write_while_drawing
+        im.show()
+        assert (len(im._canvas.blitted) == 2) == partial
+        for item in writers:
+            item.join()
+        assert im._regions == ([(0, 2, 0, 2)] if partial else [])
+        im._regions = []
+        drawn = np.asarray(im._canvas.buffer_rgba()).copy()
+        im._canvas.draw()
+        assert (drawn == np.asarray(im._canvas.buffer_rgba())).all()
+
+def _wait_rendered(renderer, timeout=10.):
+    start = time.time()
+    while renderer._busy and time.time() - start < timeout:
+        time.sleep(0.01)
+    assert not renderer._busy
+
+def test_thread_renderer():
+    fig = core.mat.figure.Figure(figsize=(3, 3), dpi=100)
+    ax = fig.add_subplot(111)
+    line, = ax.plot(np.random.random(50))
+    canvas = _BlitCanvas(fig)
+    canvas.blitted = []
+    canvas.draw()
+    lock = threading.RLock()
+    rend = ThreadRenderer(canvas, lock)
+    assert rend.running
+    # the figure is not drawn while the frame is modified
+    with lock:
+        line.set_ydata(np.random.random(50))
+        line.set_color('r')
+        rend.request()
+        time.sleep(0.1)
+        assert rend._busy and rend._done is None
+    _wait_rendered(rend)
+    # the finished drawing is copied to the screen at the next request
+    rend.request()
+    assert len(canvas.blitted) == 1
+    drawn = np.asarray(canvas.buffer_rgba()).copy()
+    _wait_rendered(rend)
+    canvas.draw()
+    assert (drawn == np.asarray(canvas.buffer_rgba())).all()
+    # the frame is free while the thread draws
+    slow = _SlowLine([0, 1], [0, 1])
+    ax.add_line(slow)
+    rend.request()
+    assert _SlowLine.drawing.wait(5)
+    assert rend._busy
+    start = time.time()
+    with lock:
+        assert time.time() - start < 0.2
+        slow.set_ydata([1, 0])
+    _wait_rendered(rend)
+    slow.remove()
+    rend.stop()
+    rend._thread.join(5)
+    assert not rend.running
+    # Tk's own drawings of a frame canvas hold the lock too
+    frame = _headless(Graph)
+    frame._lock = lock
+    frame._canvas = canvas
+    frame._renderer = None
+    frame._render = 'tk'
+    frame._init_renderer()
+    held = threading.Event()
+
+    def hold():
+        with lock:
+            held.set()
+            time.sleep(0.3)
+    threading.Thread(target=hold).start()
+    held.wait()
+    start = time.time()
+    canvas.draw()
+    assert time.time() - start > 0.2
+    # a text frame has no figure to render elsewhere
+    try:
+        _headless(Text).render = 'thread'
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("ValueError not raised")
+
+def test_process_renderer():
+    if sys.version_info < (3, 8):
+        return
+    fig = core.mat.figure.Figure(figsize=(3, 3), dpi=100)
+    ax = fig.add_subplot(111)
+    line, = ax.plot(np.random.random(50), label='data')
+    canvas = _BlitCanvas(fig)
+    canvas.blitted = []
+    canvas.draw()
+    farm = RenderFarm(1)
+    rend = ProcessRenderer(canvas, threading.RLock(), farm=farm)
+
+    def check():
+        rend.request()
+        _wait_rendered(rend)
+        # the finished drawing is copied to the screen at the next request
+        rend.request()
+        drawn = np.asarray(canvas.buffer_rgba()).copy()
+        _wait_rendered(rend)
+        canvas.draw()
+        assert (drawn == np.asarray(canvas.buffer_rgba())).all()
+
+    try:
+        check()
+        # data
+        line.set_ydata(np.random.random(50))
+        ax.set_ylim(-1, 2)
+        check()
+        # style
+        line.set_color('r')
+        line.set_linewidth(3)
+        line.set_marker('o')
+        check()
+        ax.legend()
+        check()
+    finally:
+        rend.stop()
+        farm.shutdown()
+
+def test_hist_percentile():
+    x = np.random.random(10000)
+    x[::50] = 1e6
+    lo = ColorbarManager._hist_percentile(x, x.min(), x.max(), 1.)
+    hi = ColorbarManager._hist_percentile(x, x.min(), x.max(), 97.)
+    assert np.allclose([lo, hi], np.percentile(x, [1, 97]), atol=1e-3)
@@ -65,6 +65,8 @@ class Text(Frame):
           * scrollbar (bool) [optional]: if ``True``, a Y-scrollbar is added
 
         Kwargs:
+          * render (str): only ``'tk'``, the text has no figure to render
+            in a thread or a process
           * wrap (str): wrap mechanism (default 'word')
           * undo (bool): authorized undoing if ``True``
           * Any non-abbreviated parameter accepted by ``tkinter.Text``
@@ -129,6 +131,13 @@ class Text(Frame):
         # ya own reinit
         self._init_base(**self._kwargs)
 
+    @Frame.render.setter
+    def render(self, value):
+        # no figure to render elsewhere
+        if str(value).lower() != 'tk':
+            raise ValueError("'render' shall be 'tk' for a Text frame")
+        Frame.render.fset(self, value)
+
     def show(self):
         """
         Updates the text
@@ -0,0 +1,251 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+###############################################################################
+#  
+#  JOYSTICK - Real-time plotting and logging while console controlling
+#  Copyright (C) 2016  Guillaume Schworer
+#  
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#  
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#  
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#  
+#  For any information, bug report, idea, donation, hug, beer, please contact
+#    guillaume.schworer@gmail.com
+#
+###############################################################################
+
+from . import core
+np = core.np
+
+
+__all__ = ['Trigger']
+
+
+class Trigger(object):
+    def __init__(self, level=0., edge='rising', pre=100, post=400,
+                 holdoff=0, mode='auto', auto=None, fs=1.):
+        """
+        Oscilloscope-like trigger on a data stream. New samples are given
+        to :py:func:`~joystick.trigger.Trigger.push`, which finds the
+        threshold crossings with vectorized sign changes and returns the
+        sweeps of ``pre`` samples before and ``post`` samples after each
+        accepted crossing.
+
+        Args:
+          * level (float) [optional]: the threshold
+          * edge (str) [optional]: ``'rising'`` or ``'falling'``
+          * pre (int) [optional]: the number of samples before the
+            crossing in a sweep
+          * post (int) [optional]: the number of samples from the
+            crossing (included) in a sweep
+          * holdoff (int) [optional]: the minimum number of samples
+            between two accepted crossings
+          * mode (str) [optional]: ``'normal'`` only returns triggered
+            sweeps, ``'auto'`` also returns the last samples if no
+            crossing was found for ``auto`` samples, ``'single'``
+            returns one sweep then waits for
+            :py:func:`~joystick.trigger.Trigger.arm`
+          * auto (int or None) [optional]: the number of samples without
+            crossing before an untriggered sweep in ``'auto'`` mode,
+            default is ``pre + post``
+          * fs (float) [optional]: the sampling frequency, used for the
+            time axis of the sweeps
+        """
+        self.level = level
+        self.edge = edge
+        self.mode = mode
+        self._pre = int(pre)
+        self._post = int(post)
+        if self._pre < 0 or self._post < 1:
+            raise ValueError("'pre' shall be >= 0 and 'post' >= 1")
+        self.holdoff = holdoff
+        self._auto = self.npts if auto is None else int(auto)
+        self._fs = float(fs)
+        self._time = np.arange(-self._pre, self._post)/self._fs
+        self.reset()
+
+    def reset(self):
+        """
+        Drops the buffered samples and re-arms the trigger
+        """
+        self._buf = np.empty(0)
+        # absolute index of the first buffered sample
+        self._start = 0
+        # crossings at an absolute index below are already processed
+        self._scan = 1
+        self._last = None
+        self._lastsweep = 0
+        self._armed = True
+
+    def arm(self):
+        """
+        Re-arms the trigger, in ``'single'`` mode. Only the crossings
+        of the samples pushed from now on are looked for
+        """
+        if not self._armed:
+            self._scan = self._start + self._buf.size
+        self._armed = True
+
+    @property
+    def armed(self):
+        """
+        ``False`` once a sweep was returned in ``'single'`` mode.
+        Read-only.
+        """
+        return self._armed
+
+    @armed.setter
+    def armed(self, value):
+        print("Read-only.")
+
+    @property
+    def level(self):
+        """
+        The threshold of the trigger
+        """
+        return self._level
+
+    @level.setter
+    def level(self, value):
+        self._level = float(value)
+
+    @property
+    def edge(self):
+        """
+        The edge of the trigger, ``'rising'`` or ``'falling'``
+        """
+        return self._edge
+
+    @edge.setter
+    def edge(self, value):
+        value = str(value).lower()
+        if value not in ['rising', 'falling']:
+            raise ValueError("'edge' shall be in ['rising', 'falling']")
+        self._edge = value
+
+    @property
+    def mode(self):
+        """
+        The mode of the trigger, ``'auto'``, ``'normal'`` or
+        ``'single'``
+        """
+        return self._mode
+
+    @mode.setter
+    def mode(self, value):
+        value = str(value).lower()
+        if value not in ['auto', 'normal', 'single']:
+            raise ValueError("'mode' shall be in ['auto', 'normal', "\
+                             "'single']")
+        self._mode = value
+
+    @property
+    def holdoff(self):
+        """
+        The minimum number of samples between two accepted crossings
+        """
+        return self._holdoff
+
+    @holdoff.setter
+    def holdoff(self, value):
+        self._holdoff = max(int(value), 0)
+
+    @property
+    def npts(self):
+        """
+        The number of samples of a sweep. Read-only.
+        """
+        return self._pre + self._post
+
+    @npts.setter
+    def npts(self, value):
+        print("Read-only.")
+
+    @property
+    def time(self):
+        """
+        The time axis of the sweeps, 0 at the crossing. Read-only.
+        """
+        return self._time
+
+    @time.setter
+    def time(self, value):
+        print("Read-only.")
+
+    def _crossings(self, y):
+        """
+        Returns the indices of y where the threshold is crossed
+        """
+        above = y >= self._level
+        if self._edge == 'rising':
+            return np.flatnonzero(~above[:-1] & above[1:]) + 1
+        return np.flatnonzero(above[:-1] & ~above[1:]) + 1
+
+    def _holdoff_filter(self, idx):
+        """
+        Keeps the crossings (absolute indices, increasing) respecting
+        the holdoff; loops over the accepted crossings only
+        """
+        if self._last is not None:
+            idx = idx[idx >= self._last + max(self._holdoff, 1)]
+        if self._holdoff <= 1 or idx.size == 0:
+            return idx
+        keep = []
+        i = 0
+        while i < idx.size:
+            keep.append(i)
+            i = np.searchsorted(idx, idx[i] + self._holdoff, side='left')
+        return idx[keep]
+
+    def push(self, values):
+        """
+        Appends new samples (number or vector) and returns the sweeps
+        they complete, as a 2d-array of shape (n, npts)
+        """
+        values = np.atleast_1d(np.asarray(values, dtype=float)).ravel()
+        y = np.r_[self._buf, values]
+        end = self._start + y.size
+        sweeps = np.empty((0, self.npts))
+        # crossings with a complete sweep, not yet processed
+        lim = end - self._post
+        if self._armed and lim >= self._scan:
+            first = max(self._scan - self._start - 1, 0)
+            idx = self._crossings(y[first:lim-self._start+1]) \
+                        + first + self._start
+            idx = idx[(idx >= self._scan) & (idx - self._pre >= self._start)]
+            idx = self._holdoff_filter(idx)
+            if self._mode == 'single':
+                idx = idx[:1]
+            if idx.size > 0:
+                rel = idx - self._start
+                sweeps = y[rel[:, None] + np.arange(-self._pre, self._post)]
+                self._last = idx[-1]
+                self._lastsweep = end
+                if self._mode == 'single':
+                    self._armed = False
+            self._scan = lim + 1
+        elif not self._armed:
+            # the crossings are ignored until the trigger is re-armed
+            self._scan = max(self._scan, end)
+        if sweeps.shape[0] == 0 and self._mode == 'auto' \
+                and end - self._lastsweep >= self._auto \
+                and y.size >= self.npts:
+            # free-run, untriggered sweep
+            sweeps = y[None, -self.npts:]
+            self._lastsweep = end
+        # keep what is needed to process the next crossings
+        keep = min(max(self._scan - self._pre - 1, 0), end - self.npts)
+        keep = max(keep, self._start)
+        self._buf = y[keep-self._start:].copy()
+        self._start = keep
+        return sweeps
@@ -0,0 +1,183 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+###############################################################################
+#  
+#  JOYSTICK - Real-time plotting and logging while console controlling
+#  Copyright (C) 2016  Guillaume Schworer
+#  
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#  
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#  
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#  
+#  For any information, bug report, idea, donation, hug, beer, please contact
+#    guillaume.schworer@gmail.com
+#
+###############################################################################
+
+from . import core
+np = core.np
+from .image import Image
+
+
+__all__ = ['Waterfall']
+
+
+class Waterfall(Image):
+    def __init__(self, name, freq_up=1, pos=(50, 50), size=(400, 400),
+                 screen_relative=False, nrows=100, ncols=256,
+                 cmap='gist_earth', vmin=None, vmax=None, unitperpx=1.,
+                 axrect=(0.1, 0.1, 0.9, 0.9), grid=None, centerorig=False,
+                 **kwargs):
+        """
+        Initialises a waterfall-frame, i.e. an image scrolling one row
+        at a time, e.g. for spectrograms. Use
+        :py:func:`~joystick.waterfall.Waterfall.add_rows` to push new
+        rows: they are written in place in a circular buffer, at a cost
+        proportional to the number of columns. The rows are put back in
+        order once per update of the frame. The newest row is at the
+        top of the image (``origin='lower'``).
+
+        Args:
+          * name (str): the frame name
+          * freq_up (float or None): the frequency of update of the frame,
+            between 1e-3 and 1e3 Hz, or ``None`` for no update
+          * pos (px or %) [optional]: left-top corner position of the
+            frame, see ``screen_relative``
+          * size (px or %) [optional]: width-height dimension of the
+            frame, see ``screen_relative``
+          * screen_relative (bool) [optional]: set to ``True`` to give
+            ``pos`` and ``size`` as a % of the screen size, or ``False``
+            to give then as pixels
+          * nrows (int) [optional]: the number of rows displayed
+          * ncols (int) [optional]: the length of a row
+          * cmap (str or colormap): the colormap of the image
+          * vmin (float or None): the value corresponding to the min of
+            the colorbar, or ``None`` for auto-scaling
+          * vmax (float or None): the value corresponding to the max of
+            the colorbar, or ``None`` for auto-scaling
+          * unitperpx (float) [optional]: unit scaling
+          * axrect (list of 4 floats) [optional]: the axes bounds (l,b,w,h)
+            as in ``plt.figure.add_axes(rect=(l,b,w,h))``
+          * grid (color or None) [optional]: the grid color, or no grid
+            if ``None``
+          * centerorig (bool) [optional]: if ``True`` the coordinates origin
+            will be placed in the center of the image
+
+        Kwargs:
+          * See :py:class:`~joystick.image.Image`
+        """
+        kwargs['nrows'] = nrows
+        kwargs['ncols'] = ncols
+        super(Waterfall, self).__init__(name=name, freq_up=freq_up,
+                 pos=pos, size=size, screen_relative=screen_relative,
+                 cmap=cmap, vmin=vmin, vmax=vmax, unitperpx=unitperpx,
+                 axrect=axrect, grid=grid, centerorig=centerorig, **kwargs)
+        self._preupdate_fcts.insert(0, '_push_rows')
+
+    def _init_base(self, **kwargs):
+        """
+        Separate function from __init__ for re-initialization purpose
+        """
+        shape = (int(kwargs.get('nrows')), int(kwargs.get('ncols')))
+        # keep the rows on reinit if the shape did not change
+        if getattr(self, '_buffer', None) is None \
+                or self._buffer.shape != shape:
+            # rows not yet filled are nan, i.e. not displayed
+            self._buffer = np.full(shape, np.nan)
+            self._row = 0
+            self._nfilled = 0
+        self._display = np.full(shape, np.nan)
+        self._dirty = True
+        super(Waterfall, self)._init_base(**kwargs)
+        self._push_rows()
+
+    def _initial_data(self):
+        return self._display
+
+    @property
+    def nrows(self):
+        """
+        The number of rows displayed. Read-only.
+        """
+        return self._buffer.shape[0]
+
+    @nrows.setter
+    def nrows(self, value):
+        print("Read-only.")
+
+    @property
+    def ncols(self):
+        """
+        The length of a row. Read-only.
+        """
+        return self._buffer.shape[1]
+
+    @ncols.setter
+    def ncols(self, value):
+        print("Read-only.")
+
+    def add_rows(self, rows):
+        """
+        Appends one row (1d-vector of length ``ncols``) or several rows
+        (2d-array of shape (n, ``ncols``), oldest first) to the waterfall
+        """
+        rows = np.asarray(rows, dtype=float)
+        if rows.ndim == 1:
+            rows = rows[None, :]
+        n, k = self.nrows, rows.shape[0]
+        if k >= n:
+            self._buffer[:] = rows[-n:]
+            self._row = 0
+        else:
+            first = min(k, n - self._row)
+            self._buffer[self._row:self._row+first] = rows[:first]
+            self._buffer[:k-first] = rows[first:]
+            self._row = (self._row + k) % n
+        self._nfilled = min(self._nfilled + k, n)
+        self._dirty = True
+
+    def _push_rows(self):
+        """
+        Puts the rows of the circular buffer in order in the image, if
+        some were added since the last update
+        """
+        if not (self.visible and self._dirty):
+            return
+        n = self.nrows - self._row
+        self._display[:n] = self._buffer[self._row:]
+        self._display[n:] = self._buffer[:self._row]
+        self._plot.set_data(self._display)
+        self._needs_full = True
+        self._dirty = False
+
+    def set_data(self, data):
+        """
+        Replaces all rows with the 2d-array data, see
+        :py:func:`~joystick.waterfall.Waterfall.add_rows`
+        """
+        self._buffer[:] = np.nan
+        self._row = 0
+        self._nfilled = 0
+        self.add_rows(data)
+
+    def get_data(self):
+        """
+        Returns the rows displayed, oldest first
+        """
+        if self._nfilled == 0:
+            return np.empty((0, self.ncols))
+        # from the circular buffer, the display is only refreshed at
+        # the next update
+        n = self.nrows
+        idx = (self._row - self._nfilled + np.arange(self._nfilled)) % n
+        return self._buffer[idx]